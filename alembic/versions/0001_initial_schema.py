@@ -0,0 +1,244 @@
+"""Initial schema
+
+Databases created earlier by Base.metadata.create_all already have these
+tables; mark them as migrated with `alembic stamp 0001` instead of upgrading.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("phone_number", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column("first_name", sa.String(), nullable=True),
+        sa.Column("last_name", sa.String(), nullable=True),
+        sa.Column("role", sa.String()),
+        sa.Column("is_verified", sa.Boolean()),
+        sa.Column("total_points", sa.Integer()),
+        sa.Column("referral_code", sa.String(), nullable=True, unique=True),
+        sa.Column("hashed_password", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("last_login", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("login_count", sa.Integer()),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_phone_number", "users", ["phone_number"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "products",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("category", sa.String(), nullable=False),
+        sa.Column("subcategory", sa.String()),
+        sa.Column("brand", sa.String()),
+        sa.Column("model_number", sa.String()),
+        sa.Column("sku", sa.String(), nullable=False),
+        sa.Column("price", sa.Numeric(12, 2), nullable=False),
+        sa.Column("original_price", sa.Numeric(12, 2)),
+        sa.Column("currency", sa.String()),
+        sa.Column("stock_quantity", sa.Integer()),
+        sa.Column("min_stock_level", sa.Integer()),
+        sa.Column("weight", sa.Float()),
+        sa.Column("dimensions", postgresql.JSONB()),
+        sa.Column("specifications", postgresql.JSONB()),
+        sa.Column("features", postgresql.JSONB()),
+        sa.Column("images", postgresql.JSONB()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("is_featured", sa.Boolean()),
+        sa.Column("warranty_period", sa.Integer()),
+        sa.Column("points_reward", sa.Integer()),
+        sa.Column("retailer_id", sa.String()),
+        sa.Column("created_by", sa.String()),
+        sa.Column("total_sales", sa.Integer()),
+        sa.Column("total_revenue", sa.Numeric(14, 2)),
+        sa.Column("average_rating", sa.Float()),
+        sa.Column("review_count", sa.Integer()),
+        sa.Column("rating_total", sa.Integer()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_products_id", "products", ["id"])
+    op.create_index("ix_products_category", "products", ["category"])
+    op.create_index("ix_products_sku", "products", ["sku"], unique=True)
+    op.create_index("ix_products_is_active", "products", ["is_active"])
+    op.create_index("ix_products_retailer_id", "products", ["retailer_id"])
+
+    op.create_table(
+        "points",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column("amount", sa.Integer(), nullable=False),
+        sa.Column("source", sa.String()),
+        sa.Column("reference_id", sa.String()),
+        sa.Column("retailer_id", sa.String()),
+        sa.Column("description", sa.Text()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_points_id", "points", ["id"])
+    op.create_index("ix_points_retailer_id", "points", ["retailer_id"])
+
+    op.create_table(
+        "points_rules",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("action", sa.String(), nullable=False),
+        sa.Column("category", sa.String()),
+        sa.Column("retailer_id", sa.String()),
+        sa.Column("tier", sa.String()),
+        sa.Column("starts_at", sa.DateTime(timezone=True)),
+        sa.Column("ends_at", sa.DateTime(timezone=True)),
+        sa.Column("multiplier", sa.Float()),
+        sa.Column("bonus", sa.Integer()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_points_rules_id", "points_rules", ["id"])
+    op.create_index("ix_points_rules_is_active", "points_rules", ["is_active"])
+
+    op.create_table(
+        "qr_codes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("code", sa.String(), nullable=False),
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id")),
+        sa.Column("type", sa.String()),
+        sa.Column("points_value", sa.Integer()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("max_scans", sa.Integer()),
+        sa.Column("current_scans", sa.Integer()),
+        sa.Column("description", sa.Text()),
+        sa.Column("retailer_id", sa.String()),
+        sa.Column("valid_from", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("valid_until", sa.DateTime(timezone=True)),
+        sa.Column("last_scanned_at", sa.DateTime(timezone=True)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_qr_codes_id", "qr_codes", ["id"])
+    op.create_index("ix_qr_codes_code", "qr_codes", ["code"], unique=True)
+    op.create_index("ix_qr_codes_product_id", "qr_codes", ["product_id"])
+    op.create_index("ix_qr_codes_retailer_id", "qr_codes", ["retailer_id"])
+
+    op.create_table(
+        "qr_scans",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("qr_code_id", sa.Integer(), sa.ForeignKey("qr_codes.id"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("points_earned", sa.Integer()),
+        sa.Column("scanned_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("qr_code_id", "user_id", name="uq_qr_scans_qr_code_user"),
+    )
+    op.create_index("ix_qr_scans_id", "qr_scans", ["id"])
+    op.create_index("ix_qr_scans_user_id", "qr_scans", ["user_id"])
+
+    op.create_table(
+        "orders",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("order_number", sa.String(), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("retailer_id", sa.String()),
+        sa.Column("subtotal", sa.Numeric(14, 2), nullable=False),
+        sa.Column("tax_amount", sa.Numeric(14, 2)),
+        sa.Column("discount_amount", sa.Numeric(14, 2)),
+        sa.Column("shipping_amount", sa.Numeric(14, 2)),
+        sa.Column("total_amount", sa.Numeric(14, 2), nullable=False),
+        sa.Column("currency", sa.String()),
+        sa.Column("status", sa.String()),
+        sa.Column("payment_status", sa.String()),
+        sa.Column("payment_method", sa.String()),
+        sa.Column("shipping_address", postgresql.JSONB()),
+        sa.Column("billing_address", postgresql.JSONB()),
+        sa.Column("notes", sa.Text()),
+        sa.Column("total_points_earned", sa.Integer()),
+        sa.Column("tracking_number", sa.String()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("processed_at", sa.DateTime(timezone=True)),
+        sa.Column("shipped_at", sa.DateTime(timezone=True)),
+        sa.Column("delivered_at", sa.DateTime(timezone=True)),
+        sa.Column("cancelled_at", sa.DateTime(timezone=True)),
+        sa.Column("estimated_delivery", sa.DateTime(timezone=True)),
+        sa.Column("actual_delivery", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_orders_id", "orders", ["id"])
+    op.create_index("ix_orders_order_number", "orders", ["order_number"], unique=True)
+    op.create_index("ix_orders_retailer_id", "orders", ["retailer_id"])
+    op.create_index("ix_orders_user_id_created_at", "orders", ["user_id", "created_at"])
+
+    op.create_table(
+        "order_items",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("order_id", sa.Integer(), sa.ForeignKey("orders.id"), nullable=False),
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=False),
+        sa.Column("product_name", sa.String(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("unit_price", sa.Numeric(12, 2), nullable=False),
+        sa.Column("total_price", sa.Numeric(14, 2), nullable=False),
+        sa.Column("points_earned", sa.Integer()),
+    )
+    op.create_index("ix_order_items_id", "order_items", ["id"])
+    op.create_index("ix_order_items_order_id", "order_items", ["order_id"])
+
+    op.create_table(
+        "product_reviews",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("rating", sa.Integer(), nullable=False),
+        sa.Column("comment", sa.Text()),
+        sa.Column("verified_purchase", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("product_id", "user_id", name="uq_product_reviews_product_user"),
+    )
+    op.create_index("ix_product_reviews_id", "product_reviews", ["id"])
+    op.create_index("ix_product_reviews_user_id", "product_reviews", ["user_id"])
+
+    op.create_table(
+        "product_daily_stats",
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("units_sold", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Numeric(14, 2), nullable=False),
+        sa.Column("orders", sa.Integer(), nullable=False),
+        sa.Column("reviews", sa.Integer(), nullable=False),
+        sa.Column("rating_total", sa.Integer(), nullable=False),
+    )
+
+    op.create_table(
+        "retailer_daily_stats",
+        sa.Column("retailer_id", sa.String(), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("scans", sa.Integer(), nullable=False),
+        sa.Column("points_awarded", sa.BigInteger(), nullable=False),
+        sa.Column("orders", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Numeric(16, 2), nullable=False),
+    )
+
+    op.create_table(
+        "rollup_watermarks",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("last_id", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+def downgrade():
+    for table in (
+        "rollup_watermarks", "retailer_daily_stats", "product_daily_stats", "product_reviews",
+        "order_items", "orders", "qr_scans", "qr_codes", "points_rules", "points", "products", "users"
+    ):
+        op.drop_table(table)
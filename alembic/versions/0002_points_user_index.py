@@ -0,0 +1,33 @@
+"""Index points by user
+
+points had no index on user_id at all, so every reconciliation chunk
+(python manage.py reconcile-points) scanned the whole ledger for its
+user-id range, once per parallel chunk, and a user's transactions, their
+count and the points summary each read the whole table too. The
+(user_id, created_at) index serves the range scans and the newest-first
+history.
+
+The index is built concurrently so that upgrading a live database does
+not block writes to the ledger.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_points_user_id_created_at", "points", ["user_id", "created_at"],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_points_user_id_created_at", table_name="points", postgresql_concurrently=True, if_exists=True)
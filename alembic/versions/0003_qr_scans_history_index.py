@@ -0,0 +1,35 @@
+"""Index the scan history by user and time
+
+The scan history is served by (user_id, scanned_at), newest first without
+sorting all of a user's scans; it also covers the lookups the
+single-column user_id index was used for, which is dropped.
+
+Indexes are built concurrently so that upgrading a live database does not
+block writes to qr_scans.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_qr_scans_user_id_scanned_at", "qr_scans", ["user_id", "scanned_at"],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.drop_index("ix_qr_scans_user_id", table_name="qr_scans", postgresql_concurrently=True, if_exists=True)
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_qr_scans_user_id", "qr_scans", ["user_id"],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.drop_index("ix_qr_scans_user_id_scanned_at", table_name="qr_scans", postgresql_concurrently=True, if_exists=True)
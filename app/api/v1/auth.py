@@ -6,7 +6,7 @@ from app.schemas.auth import (
     TokenResponse, RefreshTokenRequest, AuthResponse, LogoutRequest
 )
 from app.services.auth_service import AuthService
-from app.core.security import verify_token
+from app.core.security import verify_token, get_read_db
 from app.core.database import get_db
 import logging
 
@@ -41,7 +41,7 @@ async def verify_otp(request: OTPVerifyRequest, db: Session = Depends(get_db)):
         return AuthResponse(
             success=True,
             message="OTP verified successfully",
-            data=result.dict() if hasattr(result, 'dict') else result
+            data=result.model_dump() if hasattr(result, 'model_dump') else result
         )
     except Exception as e:
         logger.error(f"Error verifying OTP: {e}")
@@ -59,7 +59,7 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
         return AuthResponse(
             success=True,
             message="Login successful",
-            data=result.dict() if hasattr(result, 'dict') else result
+            data=result.model_dump() if hasattr(result, 'model_dump') else result
         )
     except Exception as e:
         logger.error(f"Error during login: {e}")
@@ -77,7 +77,7 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
         return AuthResponse(
             success=True,
             message="Registration successful",
-            data=result.dict() if hasattr(result, 'dict') else result
+            data=result.model_dump() if hasattr(result, 'model_dump') else result
         )
     except Exception as e:
         logger.error(f"Error during registration: {e}")
@@ -97,7 +97,7 @@ async def refresh_token(request: RefreshTokenRequest, db: Session = Depends(get_
         return AuthResponse(
             success=True,
             message="Token refreshed successfully",
-            data=result.dict() if hasattr(result, 'dict') else result
+            data=result.model_dump() if hasattr(result, 'model_dump') else result
         )
     except Exception as e:
         logger.error(f"Error refreshing token: {e}")
@@ -153,7 +153,7 @@ async def logout(
 @router.get("/me")
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get current user information."""
     try:
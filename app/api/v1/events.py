@@ -0,0 +1,77 @@
+from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.background import BackgroundTask
+from app.core.config import settings
+from app.core.security import security, verify_token, get_current_admin
+from app.models.user import User
+from app.services.user_events import user_event_hub, format_sse, TooManyConnectionsError
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+async def _event_stream(queue: asyncio.Queue, expires_at: float):
+    # Reconnect after 5s, then tell the client to fetch current state once
+    yield "retry: 5000\n" + format_sse("ready", {})
+    while True:
+        remaining = expires_at - time.time()
+        if remaining <= 0:
+            # The client reconnects with a refreshed token
+            yield format_sse("token_expired", {})
+            return
+        try:
+            user_event = await asyncio.wait_for(
+                queue.get(), min(settings.EVENT_STREAM_HEARTBEAT_SECONDS, remaining)
+            )
+        except asyncio.TimeoutError:
+            yield ": ping\n\n"
+            continue
+        if user_event is None:
+            return
+        yield format_sse(user_event["type"], user_event["data"])
+
+@router.get("/stream")
+async def stream_events(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Server-sent events for the current user's order status and points changes.
+
+    The token is checked without a database session, so an open stream holds
+    no pooled connection.
+    """
+    payload = verify_token(credentials.credentials)
+    if payload.get("type") != "access" or payload.get("sub") is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user_id = int(payload["sub"])
+
+    try:
+        queue = user_event_hub.subscribe(user_id)
+    except TooManyConnectionsError:
+        logger.warning("Event stream rejected: connection limit reached")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many open event streams, retry later",
+            headers={"Retry-After": "5"}
+        )
+
+    return StreamingResponse(
+        _event_stream(queue, float(payload["exp"])),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Runs when the client disconnects too, even if the stream never started
+        background=BackgroundTask(user_event_hub.unsubscribe, user_id, queue)
+    )
+
+@router.get("/stats")
+async def get_event_stream_stats(admin: User = Depends(get_current_admin)):
+    """Event stream counters for the worker serving this request"""
+    return {
+        "success": True,
+        "message": "Event stream stats retrieved successfully",
+        "data": user_event_hub.stats()
+    }
@@ -0,0 +1,89 @@
+from typing import Optional, List, Dict, Any
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from sqlalchemy.orm import Session
+from app.core.security import get_current_reader, get_read_db
+from app.models.user import User
+from app.services.leaderboard_service import LeaderboardService
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+def _with_names(db: Session, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Attach display names to board entries with a single lookup."""
+    if not entries:
+        return entries
+    ids = [entry["user_id"] for entry in entries]
+    names = {
+        row.id: row for row in
+        db.query(User.id, User.first_name, User.last_name, User.role).filter(User.id.in_(ids))
+    }
+    for entry in entries:
+        row = names.get(entry["user_id"])
+        entry["first_name"] = row.first_name if row else None
+        entry["last_name"] = row.last_name if row else None
+        entry["role"] = row.role if row else None
+    return entries
+
+@router.get("/")
+async def get_leaderboard(
+    board: str = Query("global", description="global, weekly or monthly"),
+    retailer_id: Optional[str] = Query(None, description="Rank points earned through this retailer"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db)
+):
+    """Get the top of a points leaderboard."""
+    try:
+        leaderboard = LeaderboardService()
+        entries = leaderboard.top(board, retailer_id, limit=limit, offset=offset)
+        return {
+            "success": True,
+            "message": "Leaderboard retrieved successfully",
+            "data": {
+                "board": board,
+                "retailer_id": retailer_id,
+                "entries": _with_names(db, entries),
+                "total": leaderboard.size(board, retailer_id),
+                "limit": limit,
+                "offset": offset
+            }
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting leaderboard: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get leaderboard"
+        )
+
+@router.get("/me")
+async def get_my_rank(
+    board: str = Query("global", description="global, weekly or monthly"),
+    retailer_id: Optional[str] = Query(None, description="Rank points earned through this retailer"),
+    radius: int = Query(5, ge=0, le=25, description="Neighbours to return on each side"),
+    current_user: User = Depends(get_current_reader),
+    db: Session = Depends(get_read_db)
+):
+    """Get the current user's rank and the users around them."""
+    try:
+        leaderboard = LeaderboardService()
+        return {
+            "success": True,
+            "message": "Rank retrieved successfully",
+            "data": {
+                "board": board,
+                "retailer_id": retailer_id,
+                "rank": leaderboard.rank(current_user.id, board, retailer_id),
+                "neighbours": _with_names(db, leaderboard.around(current_user.id, board, retailer_id, radius))
+            }
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting leaderboard rank: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get leaderboard rank"
+        )
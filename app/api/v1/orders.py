@@ -1,11 +1,110 @@
-from fastapi import APIRouter
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.core.security import get_current_user, get_current_admin
+from app.models.order import OrderPlaceRequest, OrderStatusUpdate
+from app.models.user import User
+from app.services.order_service import OrderService, OutOfStockError, InvalidOrderTransitionError
+import logging
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.get("/")
-async def get_orders():
+async def get_orders(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     """Get orders list"""
+    try:
+        page = OrderService(db).list_orders(current_user.id, limit=limit, cursor=cursor)
+        return {
+            "success": True,
+            "message": "Orders retrieved successfully",
+            "data": page
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting orders: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get orders"
+        )
+
+@router.get("/{order_id}")
+async def get_order(
+    order_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get a single order with its items"""
+    order = OrderService(db).get_order(current_user.id, order_id)
+    if order is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Order not found"
+        )
+    return {
+        "success": True,
+        "message": "Order retrieved successfully",
+        "data": order
+    }
+
+@router.post("/", status_code=status.HTTP_201_CREATED)
+async def place_order(
+    request: OrderPlaceRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Place an order, reserving stock for all items."""
+    try:
+        order = OrderService(db).place_order(current_user, request)
+        return {
+            "success": True,
+            "message": "Order placed successfully",
+            "data": order
+        }
+    except OutOfStockError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "Some products are out of stock", "product_ids": e.product_ids}
+        )
+    except Exception as e:
+        logger.error(f"Error placing order: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to place order"
+        )
+
+@router.patch("/{order_id}/status")
+async def update_order_status(
+    order_id: int,
+    request: OrderStatusUpdate,
+    admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Move an order to its next status; delivery credits the order's points."""
+    try:
+        order = OrderService(db).update_status(order_id, request)
+    except InvalidOrderTransitionError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error updating order status: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to update order status"
+        )
+    if order is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Order not found"
+        )
     return {
         "success": True,
-        "orders": []
-    } 
\ No newline at end of file
+        "message": "Order status updated successfully",
+        "data": order
+    }
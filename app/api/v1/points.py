@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends
-from app.core.security import get_current_user
+from fastapi import APIRouter, HTTPException, Depends, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.security import get_current_user, get_current_reader, get_read_db
+from app.core.database import get_db
+from app.models.points import Points, PointsRedemptionRequest
 from app.models.user import User
+from app.services.points_service import PointsService, InsufficientPointsError
+import logging
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.get("/balance")
-async def get_points_balance(current_user: User = Depends(get_current_user)):
+async def get_points_balance(current_user: User = Depends(get_current_reader)):
     """Get current points balance"""
     return {
         "success": True,
@@ -14,37 +21,36 @@ async def get_points_balance(current_user: User = Depends(get_current_user)):
 
 @router.get("/transactions")
 async def get_points_transactions(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: User = Depends(get_current_reader),
+    db: Session = Depends(get_read_db),
     limit: int = 20,
     offset: int = 0,
     transaction_type: str = None
 ):
     """Get user's points transaction history."""
     try:
-        payload = verify_token(credentials.credentials)
-        if not payload:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token"
-            )
-        
-        user_id = payload.get("sub")
-        db = get_database()
-        
         # Build query
-        query = {"user_id": user_id}
+        query = db.query(Points).filter(Points.user_id == current_user.id)
         if transaction_type:
-            query["type"] = transaction_type
-        
+            query = query.filter(Points.type == transaction_type)
+
         # Get transactions with pagination
-        transactions = await db.points.find(
-            query,
-            {"_id": 0}
-        ).sort("created_at", -1).skip(offset).limit(limit).to_list(length=limit)
-        
+        transactions = [
+            {
+                "id": str(row.id),
+                "type": row.type,
+                "amount": row.amount,
+                "source": row.source,
+                "reference_id": row.reference_id,
+                "description": row.description,
+                "created_at": row.created_at
+            }
+            for row in query.order_by(Points.created_at.desc()).offset(offset).limit(limit)
+        ]
+
         # Get total count
-        total_transactions = await db.points.count_documents(query)
-        
+        total_transactions = query.count()
+
         return {
             "success": True,
             "message": "Points transactions retrieved successfully",
@@ -55,7 +61,7 @@ async def get_points_transactions(
                 "offset": offset
             }
         }
-        
+
     except Exception as e:
         logger.error(f"Error getting points transactions: {e}")
         raise HTTPException(
@@ -64,75 +70,79 @@ async def get_points_transactions(
         )
 
 @router.get("/summary")
-async def get_points_summary(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_points_summary(
+    current_user: User = Depends(get_current_reader),
+    db: Session = Depends(get_read_db)
+):
     """Get user's points summary."""
     try:
-        payload = verify_token(credentials.credentials)
-        if not payload:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token"
-            )
-        
-        user_id = payload.get("sub")
-        db = get_database()
-        
-        # Get user's current points
-        user = await db.users.find_one({"_id": user_id})
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        
         # Calculate points summary
-        pipeline = [
-            {"$match": {"user_id": user_id}},
-            {
-                "$group": {
-                    "_id": "$type",
-                    "total_amount": {"$sum": "$amount"},
-                    "count": {"$sum": 1}
-                }
-            }
-        ]
-        
-        summary_results = await db.points.aggregate(pipeline).to_list(length=None)
-        
+        summary_results = (
+            db.query(Points.type, func.sum(Points.amount), func.count(Points.id))
+            .filter(Points.user_id == current_user.id)
+            .group_by(Points.type)
+            .all()
+        )
+
         # Process summary results
         summary = {
             "total_points_earned": 0,
             "total_points_spent": 0,
             "total_points_expired": 0,
-            "current_balance": user.get("total_points", 0),
+            "current_balance": current_user.total_points or 0,
             "transaction_counts": {}
         }
-        
-        for result in summary_results:
-            transaction_type = result["_id"]
-            amount = result["total_amount"]
-            count = result["count"]
-            
+
+        for transaction_type, amount, count in summary_results:
             summary["transaction_counts"][transaction_type] = count
-            
+
             if transaction_type == "earn":
                 summary["total_points_earned"] = amount
             elif transaction_type == "spend":
                 summary["total_points_spent"] = abs(amount)
             elif transaction_type == "expire":
                 summary["total_points_expired"] = abs(amount)
-        
+
         return {
             "success": True,
             "message": "Points summary retrieved successfully",
             "data": summary
         }
-        
-    except HTTPException:
-        raise
+
     except Exception as e:
         logger.error(f"Error getting points summary: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to get points summary"
-        ) 
\ No newline at end of file
+        )
+
+@router.post("/redeem")
+async def redeem_points(
+    request: PointsRedemptionRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Redeem points for one or more items."""
+    try:
+        items = [item.model_dump() for item in request.items]
+        new_balance = PointsService(db).redeem_points(current_user.id, items)
+        return {
+            "success": True,
+            "message": "Points redeemed successfully",
+            "data": {
+                "points_spent": sum(item["points"] for item in items),
+                "items": len(items),
+                "total_points": new_balance
+            }
+        }
+    except InsufficientPointsError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Insufficient points"
+        )
+    except Exception as e:
+        logger.error(f"Error redeeming points: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to redeem points"
+        )
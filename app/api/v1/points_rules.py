@@ -0,0 +1,111 @@
+from fastapi import APIRouter, HTTPException, Depends, status
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.core.security import get_current_admin
+from app.models.points import (
+    PointsRule, PointsRuleCreate, PointsRuleUpdate, PointsRuleResponse, points_rules_adapter
+)
+from app.models.user import User
+from app.services.points_rules import notify_rules_changed
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+def _serialize(rule: PointsRule) -> dict:
+    return PointsRuleResponse.model_validate(rule).model_dump()
+
+def _commit_rule_change(db: Session) -> None:
+    db.commit()
+    try:
+        notify_rules_changed()
+    except Exception as e:
+        # Workers still pick the change up once Redis is reachable and the version moves
+        logger.error(f"Error notifying points rules change: {e}")
+
+@router.get("/")
+async def list_points_rules(
+    include_inactive: bool = False,
+    admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """List points rules."""
+    query = db.query(PointsRule)
+    if not include_inactive:
+        query = query.filter(PointsRule.is_active == True)
+    rules = query.order_by(PointsRule.id).all()
+    return {
+        "success": True,
+        "message": "Points rules retrieved successfully",
+        "data": points_rules_adapter.dump_python(points_rules_adapter.validate_python(rules, from_attributes=True))
+    }
+
+@router.post("/", status_code=status.HTTP_201_CREATED)
+async def create_points_rule(
+    request: PointsRuleCreate,
+    admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Create a points rule."""
+    try:
+        rule = PointsRule(**request.model_dump())
+        db.add(rule)
+        _commit_rule_change(db)
+        db.refresh(rule)
+        return {
+            "success": True,
+            "message": "Points rule created successfully",
+            "data": _serialize(rule)
+        }
+    except Exception as e:
+        logger.error(f"Error creating points rule: {e}")
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to create points rule"
+        )
+
+@router.patch("/{rule_id}")
+async def update_points_rule(
+    rule_id: int,
+    request: PointsRuleUpdate,
+    admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Update a points rule."""
+    rule = db.query(PointsRule).filter(PointsRule.id == rule_id).first()
+    if not rule:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Points rule not found"
+        )
+    for field, value in request.model_dump(exclude_unset=True).items():
+        setattr(rule, field, value)
+    _commit_rule_change(db)
+    db.refresh(rule)
+    return {
+        "success": True,
+        "message": "Points rule updated successfully",
+        "data": _serialize(rule)
+    }
+
+@router.delete("/{rule_id}")
+async def deactivate_points_rule(
+    rule_id: int,
+    admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Deactivate a points rule."""
+    rule = db.query(PointsRule).filter(PointsRule.id == rule_id).first()
+    if not rule:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Points rule not found"
+        )
+    rule.is_active = False
+    _commit_rule_change(db)
+    return {
+        "success": True,
+        "message": "Points rule deactivated successfully",
+        "data": None
+    }
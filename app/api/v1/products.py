@@ -1,19 +1,274 @@
-from fastapi import APIRouter
+from typing import Dict, Optional
+from fastapi import APIRouter, HTTPException, Depends, File, Header, Query, Response, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.core.security import get_current_user, get_current_admin
+from app.core.compression import choose_encoding, weak_etag
+from app.models.product import Product, ProductCreate, ProductUpdate, ProductReviewCreate
+from app.models.user import User
+from app.services.catalog_service import catalog_cache, notify_catalog_changed, notify_ratings_changed
+from app.services.stock_alerts import low_stock_notifier, crossed_low_stock
+from app.services.product_stats_service import ProductStatsService, ReviewExistsError
+from app.services.catalog_import import CatalogImportService
+import io
+import logging
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Clients must revalidate, which costs them a 304 when nothing changed
+CACHE_CONTROL = "no-cache"
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+def _cached_response(
+    body: bytes,
+    etag: str,
+    if_none_match: Optional[str],
+    encoded: Optional[Dict[str, bytes]] = None,
+    accept_encoding: Optional[str] = None
+) -> Response:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    encoding = choose_encoding(accept_encoding) if encoded else None
+    if encoding is not None and encoding in encoded:
+        # Served precompressed from the snapshot; the compression middleware leaves it alone
+        body = encoded[encoding]
+        headers["ETag"] = weak_etag(etag)
+        headers["Content-Encoding"] = encoding
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def _commit_catalog_change(db: Session) -> None:
+    db.commit()
+    try:
+        notify_catalog_changed()
+    except Exception as e:
+        logger.error(f"Error notifying catalog change: {e}")
+
 @router.get("/")
-async def get_products():
+async def get_products(
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """Get products list"""
+    snapshot = catalog_cache.current(db)
+    return _cached_response(snapshot.body, snapshot.etag, if_none_match, snapshot.encoded, accept_encoding)
+
+@router.get("/search")
+async def search_products(
+    q: str = Query("", max_length=100, description="Search text; words may be partially typed"),
+    category: Optional[str] = None,
+    brand: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """Search products with category and brand facet counts"""
+    result = catalog_cache.current(db).search_index.search(q, category, brand, limit, offset)
     return {
         "success": True,
-        "products": [
-            {
-                "id": 1,
-                "name": "Solar Panel 100W",
-                "description": "High efficiency solar panel",
-                "price": 15000,
-                "points_reward": 100
-            }
-        ]
-    } 
\ No newline at end of file
+        "message": "Products retrieved successfully",
+        "data": {
+            "query": q,
+            "total": result["total"],
+            "products": result["products"],
+            "facets": result["facets"],
+            "limit": limit,
+            "offset": offset
+        }
+    }
+
+@router.get("/{product_id}")
+async def get_product(
+    product_id: int,
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Get a single product"""
+    cached = catalog_cache.current(db).product_bodies.get(product_id)
+    if cached is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
+        )
+    body, etag, encoded = cached
+    return _cached_response(body, etag, if_none_match, encoded, accept_encoding)
+
+@router.get("/{product_id}/reviews")
+async def get_product_reviews(
+    product_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """Get a product's reviews, newest first"""
+    if product_id not in catalog_cache.current(db).by_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
+        )
+    return {
+        "success": True,
+        "message": "Reviews retrieved successfully",
+        "data": {
+            "reviews": ProductStatsService(db).list_reviews(product_id, limit=limit, offset=offset),
+            "limit": limit,
+            "offset": offset
+        }
+    }
+
+@router.post("/{product_id}/reviews", status_code=status.HTTP_201_CREATED)
+async def create_product_review(
+    product_id: int,
+    request: ProductReviewCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Review a product; each user can review a product once"""
+    if product_id not in catalog_cache.current(db).by_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
+        )
+    try:
+        review = ProductStatsService(db).add_review(current_user.id, product_id, request.rating, request.comment)
+    except ReviewExistsError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error creating review: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to create review"
+        )
+    # average_rating and review_count are part of the catalog, refreshed in batches
+    try:
+        notify_ratings_changed()
+    except Exception as e:
+        logger.error(f"Error notifying catalog change: {e}")
+    return {
+        "success": True,
+        "message": "Review created successfully",
+        "data": review
+    }
+
+@router.get("/{product_id}/stats")
+async def get_product_stats(
+    product_id: int,
+    days: int = Query(30, ge=1, le=366),
+    admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Get a product's sales and rating counters with a daily trend"""
+    stats = ProductStatsService(db).product_stats(product_id, days)
+    if stats is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
+        )
+    return {
+        "success": True,
+        "message": "Product stats retrieved successfully",
+        "data": stats
+    }
+
+@router.post("/", status_code=status.HTTP_201_CREATED)
+async def create_product(
+    request: ProductCreate,
+    admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Create a product"""
+    try:
+        product = Product(**request.model_dump(), created_by=str(admin.id))
+        db.add(product)
+        _commit_catalog_change(db)
+        return {
+            "success": True,
+            "message": "Product created successfully",
+            "data": {"id": product.id}
+        }
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A product with this SKU already exists"
+        )
+    except Exception as e:
+        logger.error(f"Error creating product: {e}")
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to create product"
+        )
+
+@router.post("/import")
+async def import_products(
+    file: UploadFile = File(..., description="CSV with a header row of product fields"),
+    admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Bulk create or update products by SKU from a CSV file"""
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        report = await run_in_threadpool(CatalogImportService(db).import_products, stream, str(admin.id))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error importing products: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to import products"
+        )
+    return {
+        "success": report["aborted"] is None,
+        "message": report["aborted"] or f"Imported {report['valid']} of {report['rows']} rows",
+        "data": report
+    }
+
+@router.patch("/{product_id}")
+async def update_product(
+    product_id: int,
+    request: ProductUpdate,
+    admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Update a product"""
+    product = db.query(Product).filter(Product.id == product_id).first()
+    if not product:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
+        )
+    try:
+        previous_quantity = product.stock_quantity or 0
+        for field, value in request.model_dump(exclude_unset=True).items():
+            setattr(product, field, value)
+        alert = {
+            "product_id": product.id,
+            "name": product.name,
+            "stock_quantity": product.stock_quantity or 0,
+            "min_stock_level": product.min_stock_level
+        }
+        _commit_catalog_change(db)
+        if crossed_low_stock(alert["stock_quantity"], alert["min_stock_level"], previous_quantity):
+            low_stock_notifier.report([alert])
+        return {
+            "success": True,
+            "message": "Product updated successfully",
+            "data": {"id": product.id}
+        }
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A product with this SKU already exists"
+        )
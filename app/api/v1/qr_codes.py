@@ -1,32 +1,32 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.core.security import verify_token
-from app.core.database import get_mongodb
-from app.models.qr_code import QRCodeScan
+from fastapi import APIRouter, HTTPException, Depends, File, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import update, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.security import get_current_user, get_current_admin, get_current_reader, get_read_db
+from app.core.database import get_db
+from app.models.qr_code import QRCode, QRScan
+from app.models.user import User
+from app.services.points_service import PointsService
+from app.services.points_rules import rules_engine, user_tier
+from app.services.catalog_service import catalog_cache
+from app.services.catalog_import import CatalogImportService
+import io
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
-security = HTTPBearer()
 
 @router.post("/scan")
 async def scan_qr_code(
     qr_data: dict,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Scan a QR code and award points."""
     try:
-        payload = verify_token(credentials.credentials)
-        if not payload:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token"
-            )
-        
-        user_id = payload.get("sub")
-        db = get_mongodb()
-        
         # Extract QR code from request
         qr_code = qr_data.get("qr_code")
         if not qr_code:
@@ -34,110 +34,116 @@ async def scan_qr_code(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="QR code is required"
             )
-        
+
         # Find QR code in database
-        qr_record = await db.qr_codes.find_one({"code": qr_code, "is_active": True})
+        qr_record = db.query(QRCode).filter(QRCode.code == qr_code, QRCode.is_active == True).first()
         if not qr_record:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Invalid QR code"
             )
-        
+
         # Check if QR code is still valid
-        now = datetime.utcnow()
-        if qr_record.get("valid_from") and now < qr_record["valid_from"]:
+        now = datetime.now(timezone.utc)
+        if qr_record.valid_from and now < qr_record.valid_from:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="QR code not yet valid"
             )
-        
-        if qr_record.get("valid_until") and now > qr_record["valid_until"]:
+
+        if qr_record.valid_until and now > qr_record.valid_until:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="QR code has expired"
             )
-        
+
         # Check if user has already scanned this QR code
-        existing_scan = await db.qr_scans.find_one({
-            "qr_code_id": str(qr_record["_id"]),
-            "user_id": user_id
-        })
-        
+        existing_scan = db.query(QRScan.id).filter(
+            QRScan.qr_code_id == qr_record.id,
+            QRScan.user_id == current_user.id
+        ).first()
+
         if existing_scan:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="QR code already scanned"
             )
-        
-        # Check if QR code has reached max scans
-        if qr_record.get("max_scans") and qr_record["current_scans"] >= qr_record["max_scans"]:
+
+        # Claim a scan slot; the conditional update matches nothing once max_scans is reached
+        claimed = db.execute(
+            update(QRCode)
+            .where(
+                QRCode.id == qr_record.id,
+                or_(QRCode.max_scans.is_(None), QRCode.current_scans < QRCode.max_scans)
+            )
+            .values(current_scans=QRCode.current_scans + 1, last_scanned_at=now)
+        ).rowcount
+
+        if not claimed:
+            db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="QR code scan limit reached"
             )
-        
-        # Award points
-        points_earned = qr_record.get("points_value", 0)
-        
-        # Update user points
-        await db.users.update_one(
-            {"_id": user_id},
-            {
-                "$inc": {"total_points": points_earned},
-                "$set": {"updated_at": now}
-            }
+
+        # Award points: the QR code's own value or the default, adjusted by the active rules
+        product = catalog_cache.current(db).by_id.get(qr_record.product_id) if qr_record.product_id else None
+        points_earned, applied_rules = rules_engine.evaluate(
+            db,
+            "scan",
+            qr_record.points_value or settings.POINTS_PER_SCAN,
+            category=product["category"] if product else None,
+            retailer_id=qr_record.retailer_id,
+            tier=user_tier(current_user.total_points),
+            at=now
         )
-        
-        # Record the scan
-        scan_data = QRCodeScan(
-            qr_code_id=str(qr_record["_id"]),
-            user_id=user_id,
-            scanned_at=now,
+
+        # Record the scan; the unique (qr_code_id, user_id) constraint catches concurrent duplicates
+        db.add(QRScan(
+            qr_code_id=qr_record.id,
+            user_id=current_user.id,
             points_earned=points_earned,
-            is_valid=True
-        )
-        
-        await db.qr_scans.insert_one(scan_data.dict())
-        
-        # Update QR code scan count
-        await db.qr_codes.update_one(
-            {"_id": qr_record["_id"]},
-            {
-                "$inc": {"current_scans": 1},
-                "$set": {"last_scanned_at": now, "updated_at": now}
-            }
+            scanned_at=now
+        ))
+        try:
+            db.flush()
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="QR code already scanned"
+            )
+
+        # Record points transaction and update the user's balance
+        total_points = PointsService(db).award_points(
+            current_user.id,
+            points_earned,
+            source="qr_scan",
+            reference_id=str(qr_record.id),
+            retailer_id=qr_record.retailer_id,
+            description=f"Points earned from scanning QR code: {qr_record.description or qr_record.code}",
+            commit=False
         )
-        
-        # Record points transaction
-        points_transaction = {
-            "user_id": user_id,
-            "type": "earn",
-            "amount": points_earned,
-            "source": "qr_scan",
-            "reference_id": str(qr_record["_id"]),
-            "reference_type": "qr_code",
-            "description": f"Points earned from scanning QR code: {qr_record.get('product_name', 'Unknown')}",
-            "created_at": now,
-            "updated_at": now
-        }
-        
-        await db.points.insert_one(points_transaction)
-        
+        db.commit()
+
         return {
             "success": True,
             "message": "QR code scanned successfully",
             "data": {
                 "points_earned": points_earned,
-                "product_name": qr_record.get("product_name"),
-                "description": qr_record.get("description"),
+                "applied_rules": list(applied_rules),
+                "total_points": total_points,
+                "product_name": product["name"] if product else None,
+                "description": qr_record.description,
                 "scanned_at": now.isoformat()
             }
         }
-        
+
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error scanning QR code: {e}")
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to scan QR code"
@@ -145,31 +151,37 @@ async def scan_qr_code(
 
 @router.get("/history")
 async def get_scan_history(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: User = Depends(get_current_reader),
+    db: Session = Depends(get_read_db),
     limit: int = 20,
     offset: int = 0
 ):
     """Get user's QR scan history."""
     try:
-        payload = verify_token(credentials.credentials)
-        if not payload:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token"
-            )
-        
-        user_id = payload.get("sub")
-        db = get_mongodb()
-        
         # Get scan history with pagination
-        scans = await db.qr_scans.find(
-            {"user_id": user_id},
-            {"_id": 0}
-        ).sort("scanned_at", -1).skip(offset).limit(limit).to_list(length=limit)
-        
+        rows = (
+            db.query(QRScan.qr_code_id, QRScan.points_earned, QRScan.scanned_at, QRCode.code, QRCode.description)
+            .join(QRCode, QRCode.id == QRScan.qr_code_id)
+            .filter(QRScan.user_id == current_user.id)
+            .order_by(QRScan.scanned_at.desc())
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+        scans = [
+            {
+                "qr_code_id": str(row.qr_code_id),
+                "code": row.code,
+                "description": row.description,
+                "points_earned": row.points_earned,
+                "scanned_at": row.scanned_at
+            }
+            for row in rows
+        ]
+
         # Get total count
-        total_scans = await db.qr_scans.count_documents({"user_id": user_id})
-        
+        total_scans = db.query(QRScan).filter(QRScan.user_id == current_user.id).count()
+
         return {
             "success": True,
             "message": "Scan history retrieved successfully",
@@ -180,10 +192,34 @@ async def get_scan_history(
                 "offset": offset
             }
         }
-        
+
     except Exception as e:
         logger.error(f"Error getting scan history: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to get scan history"
-        ) 
\ No newline at end of file
+        )
+
+@router.post("/import")
+async def import_qr_codes(
+    file: UploadFile = File(..., description="CSV with a header row of QR code fields and product_sku"),
+    admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Bulk create or update QR codes by code from a CSV file"""
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        report = await run_in_threadpool(CatalogImportService(db).import_qr_codes, stream)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error importing QR codes: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to import QR codes"
+        )
+    return {
+        "success": report["aborted"] is None,
+        "message": report["aborted"] or f"Imported {report['valid']} of {report['rows']} rows",
+        "data": report
+    }
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.core.security import get_current_admin
+from app.models.user import User
+from app.services.retailer_rollup_service import RetailerRollupService
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.get("/{retailer_id}/dashboard")
+async def get_retailer_dashboard(
+    retailer_id: str,
+    days: int = Query(90, ge=1, le=366),
+    admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Get a retailer's daily scans, points awarded, orders and revenue"""
+    try:
+        return {
+            "success": True,
+            "message": "Retailer dashboard retrieved successfully",
+            "data": RetailerRollupService(db).dashboard(retailer_id, days)
+        }
+    except Exception as e:
+        logger.error(f"Error getting retailer dashboard: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get retailer dashboard"
+        )
@@ -0,0 +1,62 @@
+from fastapi import APIRouter, HTTPException, Depends, Request, status
+from app.core.config import settings
+from app.core.security import get_current_admin
+from app.models.user import User
+from app.services.image_service import (
+    image_service, UploadTooLargeError, UnsupportedImageError, ImageQueueFullError
+)
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+SHA256_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+@router.post("/images", status_code=status.HTTP_201_CREATED)
+async def upload_image(request: Request, admin: User = Depends(get_current_admin)):
+    """Upload an image as the raw request body (Content-Type image/jpeg, image/png or image/webp).
+
+    The body is streamed to disk; WebP variants are generated in the
+    background and appear under the returned URLs once ready.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds {settings.MAX_FILE_SIZE} bytes"
+        )
+    try:
+        image = await image_service.store_upload(request.stream(), request.headers.get("content-type"))
+        return {
+            "success": True,
+            "message": "Image uploaded successfully",
+            "data": image
+        }
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except UnsupportedImageError as e:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e))
+    except ImageQueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "10"}
+        )
+    except Exception as e:
+        logger.error(f"Error uploading image: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to upload image"
+        )
+
+@router.get("/images/{sha256}")
+async def get_image_status(sha256: str, admin: User = Depends(get_current_admin)):
+    """Check whether an uploaded image's variants are ready"""
+    if not SHA256_PATTERN.match(sha256):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+    return {
+        "success": True,
+        "message": "Image status retrieved successfully",
+        "data": {"sha256": sha256, "variants_ready": image_service.variants_ready(sha256)}
+    }
@@ -0,0 +1,56 @@
+from typing import Callable, Optional
+from app.core.redis import get_redis
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+def notify_change(key: str) -> None:
+    """Bump the version counter at ``key`` so every worker sees the change."""
+    get_redis().incr(key)
+
+class ChangeWatcher:
+    """Throttled view of a Redis version counter.
+
+    Writers call ``notify_change(key)`` after committing. Readers call
+    ``refresh(rebuild)`` on their hot path: it costs a Redis GET at most once
+    per ``interval`` seconds and only calls ``rebuild`` when the version
+    moved. While one thread rebuilds, the others keep their current state.
+    ``rebuild`` receives the new version, or ``None`` when Redis is down.
+    """
+
+    def __init__(self, key: str, interval: float):
+        self.key = key
+        self.interval = interval
+        self.version: Optional[str] = None
+        self._built = False
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self, rebuild: Callable[[Optional[str]], None]) -> bool:
+        now = time.monotonic()
+        if self._built and now - self._checked_at < self.interval:
+            return False
+        # Before the first build there is nothing to serve, so wait for it
+        if not self._lock.acquire(blocking=not self._built):
+            return False
+        try:
+            if self._built and time.monotonic() - self._checked_at < self.interval:
+                return False
+            self._checked_at = now
+            try:
+                version = get_redis().get(self.key) or "0"
+            except Exception as e:
+                logger.warning(f"Could not check {self.key}: {e}")
+                if self._built:
+                    return False
+                version = None
+            if self._built and version == self.version:
+                return False
+            rebuild(version)
+            self.version = version
+            self._built = True
+            return True
+        finally:
+            self._lock.release()
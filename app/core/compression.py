@@ -0,0 +1,152 @@
+from typing import Dict, Optional
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+import gzip
+import logging
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+# Event streams must reach the client as they are written
+STREAMING_TYPES = ("text/event-stream",)
+# Payloads compressed once and served many times get the slower, smaller settings
+PRECOMPRESS_GZIP_LEVEL = 9
+PRECOMPRESS_BROTLI_QUALITY = 9
+
+def available_encodings() -> tuple:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best encoding the client accepts, brotli first, or None for the plain body."""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+    for coding in available_encodings():
+        if weights.get(coding, weights.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+def compress(body: bytes, encoding: str, precompress: bool = False) -> bytes:
+    if encoding == "br":
+        quality = PRECOMPRESS_BROTLI_QUALITY if precompress else settings.COMPRESSION_BROTLI_QUALITY
+        return brotli.compress(body, quality=quality)
+    level = PRECOMPRESS_GZIP_LEVEL if precompress else settings.COMPRESSION_GZIP_LEVEL
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+def precompress(body: bytes) -> Dict[str, bytes]:
+    """Every available encoding of ``body``, or none when it is below the compression threshold."""
+    if len(body) < settings.COMPRESSION_MIN_BYTES:
+        return {}
+    return {encoding: compress(body, encoding, precompress=True) for encoding in available_encodings()}
+
+def weak_etag(etag: str) -> str:
+    # The compressed bytes differ from the ones the strong ETag was computed on
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+class CompressionMiddleware:
+    """Compress response bodies for clients that accept gzip or brotli.
+
+    Only complete bodies of at least ``minimum_size`` bytes with a textual
+    content type are compressed; streamed responses, event streams and
+    bodies that already carry a Content-Encoding (such as the precompressed
+    catalog) pass through untouched. Bodies of COMPRESSION_OFFLOAD_BYTES or
+    more are compressed in the threadpool so the event loop keeps serving.
+    """
+
+    def __init__(self, app, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_BYTES if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def compressing_send(message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                passthrough = not self._compressible(message)
+                if passthrough:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                # Streamed or small: send as is
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            if len(body) >= settings.COMPRESSION_OFFLOAD_BYTES:
+                compressed = await run_in_threadpool(compress, body, encoding)
+            else:
+                compressed = compress(body, encoding)
+            await send({**start, "headers": self._headers(start["headers"], encoding, len(compressed))})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, compressing_send)
+
+    @staticmethod
+    def _compressible(start) -> bool:
+        if start["status"] < 200 or start["status"] in (204, 304):
+            return False
+        content_type = ""
+        for name, value in start.get("headers", []):
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value.decode("latin-1").lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith(STREAMING_TYPES)
+
+    @staticmethod
+    def _headers(headers, encoding: str, length: int) -> list:
+        result = []
+        vary = None
+        for name, value in headers:
+            if name == b"content-length":
+                continue
+            if name == b"etag":
+                value = weak_etag(value.decode("latin-1")).encode("latin-1")
+            if name == b"vary":
+                vary = value
+                continue
+            result.append((name, value))
+        vary = b"Accept-Encoding" if not vary else vary + b", Accept-Encoding"
+        result.extend([
+            (b"content-encoding", encoding.encode()),
+            (b"content-length", str(length).encode()),
+            (b"vary", vary),
+        ])
+        return result
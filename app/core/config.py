@@ -1,5 +1,5 @@
-from pydantic_settings import BaseSettings
-from typing import List, Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Dict, List, Optional
 import os
 from dotenv import load_dotenv
 
@@ -14,13 +14,41 @@ class Settings(BaseSettings):
     # Server settings
     HOST: str = "0.0.0.0"
     PORT: int = 8000
-    
+
+    # Production server (gunicorn -c gunicorn.conf.py main:app)
+    WEB_WORKERS: int = 0  # worker processes; 0 means one per CPU core
+    WEB_PRELOAD: bool = True  # import the app once in the master before forking
+    WEB_BACKLOG: int = 2048  # pending connections queued by the kernel
+    WEB_KEEPALIVE_SECONDS: int = 5  # keep idle client connections open this long
+    WEB_TIMEOUT_SECONDS: int = 60  # restart a worker that stops responding for this long
+    WEB_GRACEFUL_TIMEOUT_SECONDS: int = 30  # time a restarting worker gets to finish its requests
+    WEB_MAX_REQUESTS: int = 10000  # recycle a worker after this many requests; 0 disables
+    WEB_MAX_REQUESTS_JITTER: int = 1000  # spreads recycling so workers do not restart together
+
+    # Health probes (/health/live, /health/ready)
+    HEALTH_CHECK_SECONDS: float = 5.0  # how often each worker checks Postgres and Redis
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 2.0  # a dependency slower than this counts as down
+    HEALTH_POOL_SATURATION: float = 0.9  # share of database connections in use above which a worker is not ready
+    HEALTH_DRAIN_SECONDS: float = 5.0  # on SIGTERM, keep serving while readiness fails so the balancer moves away
+
+    # Metrics (/metrics)
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")  # bearer token scrapers send; empty serves metrics only with DEBUG
+    METRICS_DIR: str = "logs/metrics"  # where gunicorn workers share their metrics, emptied when the server starts
+    METRICS_WRITE_SECONDS: float = 5.0  # how often each worker writes its metrics there
+
     # CORS settings
     ALLOWED_HOSTS: List[str] = ["*"]
     
     # Database settings
     DATABASE_URL: str = os.getenv("DATABASE_URL", "mongodb://localhost:27017/trison")
     MONGODB_URL: str = os.getenv("MONGODB_URL", "mongodb://localhost:27017/trison")
+    # Read replicas for read-only endpoints; empty means every read uses DATABASE_URL
+    DATABASE_REPLICA_URLS: List[str] = []
+    REPLICA_MAX_LAG_SECONDS: float = 5.0  # replicas further behind are skipped
+    REPLICA_CHECK_SECONDS: float = 2.0  # how often each worker measures replica lag
+    READ_YOUR_WRITES_SECONDS: float = 10.0  # a user's reads stay on the primary this long after their write
+    # What a worker does at startup when the schema is not at the latest migration: error, warn or off
+    SCHEMA_CHECK: str = "error"
     
     # JWT settings
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
@@ -40,9 +68,61 @@ class Settings(BaseSettings):
     SENDGRID_API_KEY: str = os.getenv("SENDGRID_API_KEY", "")
     FROM_EMAIL: str = os.getenv("FROM_EMAIL", "noreply@trison.com")
     
+    # How often a worker checks whether the product catalog changed
+    CATALOG_RELOAD_SECONDS: float = 2.0
+    # Reviews reach the catalog's average_rating and review_count at most this late
+    CATALOG_RATINGS_RELOAD_SECONDS: float = 300.0
+    
+    # Idempotency-Key settings
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60  # how long completed responses are replayed
+    IDEMPOTENCY_LOCK_SECONDS: int = 30  # in-flight marker lifetime if a worker dies mid-request
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0  # how long a duplicate waits for the first request
+    
+    # Rate limiting of /api/ requests; stricter per-route limits are declared in main.py
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_IP_PER_SECOND: float = 20.0  # sustained requests per client address
+    RATE_LIMIT_IP_BURST: int = 100
+    RATE_LIMIT_USER_PER_SECOND: float = 10.0  # sustained requests per signed-in user
+    RATE_LIMIT_USER_BURST: int = 50
+    RATE_LIMIT_LOCAL_SHARE: float = 0.1  # share of a burst each worker may admit between Redis checks
+    RATE_LIMIT_LOCAL_SIZE: int = 10000  # buckets each worker keeps a local estimate for
+    
+    # Response compression
+    COMPRESSION_MIN_BYTES: int = 1024  # smaller bodies are sent as they are
+    COMPRESSION_OFFLOAD_BYTES: int = 64 * 1024  # larger bodies are compressed off the event loop
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # per-request brotli favours speed; precompressed payloads use more
+    
+    # Response cache for the GET routes declared in main.py
+    RESPONSE_CACHE_LOCAL_SIZE: int = 10000  # responses kept in each worker's memory
+    RESPONSE_CACHE_LOCAL_SECONDS: float = 30.0  # upper bound on a worker's local copy, on top of pub/sub invalidation
+    RESPONSE_CACHE_MAX_BODY: int = 256 * 1024  # larger responses are not cached
+    RESPONSE_CACHE_WAIT_SECONDS: float = 2.0  # how long a miss waits for another worker computing the same key
+    
+    # SQL instrumentation
+    SQL_SLOW_QUERY_MS: float = 250.0  # statements slower than this are logged with their parameter shape
+    SQL_REPEATED_QUERY_THRESHOLD: int = 10  # one statement run this often in a request is logged as a likely N+1
+    
+    # Event stream (/api/v1/events/stream) settings
+    EVENT_STREAM_MAX_CONNECTIONS: int = 1000  # per worker; ~33KB each, p99 fan-out 145ms at 1000 (scripts/bench_event_stream.py)
+    EVENT_STREAM_QUEUE_SIZE: int = 100  # undelivered events per connection before it is told to resync
+    EVENT_STREAM_HEARTBEAT_SECONDS: float = 15.0  # keeps proxies from closing idle streams
+    
+    # Retailer rollups (python manage.py rollup-retailers)
+    RETAILER_ROLLUP_BATCH_SIZE: int = 50000  # source rows per committed batch
+    RETAILER_ROLLUP_SETTLE_SECONDS: int = 60  # rows younger than this wait for the next run
+    
+    # Low-stock alerts
+    STOCK_ALERT_WINDOW_SECONDS: int = 60 * 60  # at most one alert per product per window
+    STOCK_ALERT_QUEUE_SIZE: int = 1000  # pending alerts per worker before new ones are dropped
+    STOCK_ALERT_EMAILS: List[str] = []  # recipients, sent through SendGrid when configured
+    
     # File upload settings
     UPLOAD_DIR: str = "uploads"
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
+    IMAGE_WORKERS: int = 2  # processes generating image variants, per worker
+    IMAGE_QUEUE_LIMIT: int = 50  # images waiting for variants before uploads are refused
+    IMAGE_MAX_PIXELS: int = 40_000_000  # decoded size a variant worker accepts, about 160MB as RGBA
     
     # QR Code settings
     QR_CODE_DIR: str = "qr_codes"
@@ -50,9 +130,11 @@ class Settings(BaseSettings):
     # Points system settings
     POINTS_PER_SCAN: int = 10
     POINTS_PER_PURCHASE: int = 100
+    # Minimum total_points for each user tier, used by the points rules engine
+    POINTS_TIERS: Dict[str, int] = {"bronze": 0, "silver": 1000, "gold": 5000, "platinum": 20000}
+    # How often a worker checks whether the points rules changed
+    POINTS_RULES_RELOAD_SECONDS: float = 1.0
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
 settings = Settings() 
\ No newline at end of file
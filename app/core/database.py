@@ -20,11 +20,15 @@ def get_db():
         db.close()
 
 async def init_db():
-    """Initialize database tables"""
+    """Check that the database schema is at the latest migration"""
+    from app.core.migrations import check_schema, SchemaOutOfDateError
+
+    if settings.SCHEMA_CHECK == "off":
+        return
     try:
-        # Create all PostgreSQL tables
-        Base.metadata.create_all(bind=engine)
-        print("PostgreSQL database tables created successfully")
-    except Exception as e:
-        print(f"Database initialization error: {e}")
-        raise e 
\ No newline at end of file
+        current, _ = check_schema()
+        print(f"PostgreSQL schema is current (revision {current})")
+    except SchemaOutOfDateError as e:
+        if settings.SCHEMA_CHECK == "error":
+            raise e
+        print(f"Warning: {e}")
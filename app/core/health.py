@@ -0,0 +1,107 @@
+from typing import Any, Dict, Optional
+from sqlalchemy import create_engine, text
+from app.core.config import settings
+from app.core.database import DATABASE_URL, engine
+import logging
+import redis
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class HealthMonitor:
+    """Cached dependency checks behind the readiness probe.
+
+    A daemon thread checks Postgres and Redis every ``interval`` seconds over
+    its own connections, with short timeouts, so a probe never waits on the
+    app's pools and a hung check shows up as a stale result. ``readiness``
+    only reads that state and the pool counters, so probes cost no I/O. A
+    worker that is shutting down reports ``draining``.
+    """
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = interval or settings.HEALTH_CHECK_SECONDS
+        timeout = settings.HEALTH_CHECK_TIMEOUT_SECONDS
+        self._engine = create_engine(
+            DATABASE_URL, pool_size=1, max_overflow=0, pool_recycle=300,
+            connect_args={"connect_timeout": max(int(timeout), 1), "options": f"-c statement_timeout={int(timeout * 1000)}"}
+        )
+        self._redis = redis.from_url(settings.REDIS_URL, socket_timeout=timeout, socket_connect_timeout=timeout)
+        self._checks: Dict[str, Dict[str, Any]] = {}
+        self._checked_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self.draining = False
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="health-monitor", daemon=True)
+            self._thread.start()
+
+    def start_draining(self) -> None:
+        if not self.draining:
+            logger.info("Worker is draining, readiness now fails")
+        self.draining = True
+
+    def stop(self) -> None:
+        self.start_draining()
+        self._stopped.set()
+
+    def readiness(self) -> Dict[str, Any]:
+        pool = self._pool_usage()
+        age = None if self._checked_at is None else time.monotonic() - self._checked_at
+        if self.draining:
+            status = "draining"
+        elif age is None:
+            status = "starting"
+        elif age > 3 * self.interval:
+            status = "stale"
+        elif not all(check["ok"] for check in self._checks.values()):
+            status = "unavailable"
+        elif pool["saturation"] is not None and pool["saturation"] >= settings.HEALTH_POOL_SATURATION:
+            status = "saturated"
+        else:
+            status = "ready"
+        return {
+            "status": status,
+            "ready": status == "ready",
+            "checks": self._checks,
+            "pool": pool,
+            "checked_seconds_ago": None if age is None else round(age, 1)
+        }
+
+    def _pool_usage(self) -> Dict[str, Any]:
+        # In-memory counters of the app's own pool
+        pool = engine.pool
+        in_use = pool.checkedout()
+        max_overflow = getattr(pool, "_max_overflow", -1)
+        capacity = pool.size() + max_overflow if max_overflow >= 0 else None
+        return {
+            "in_use": in_use,
+            "capacity": capacity,
+            "saturation": round(in_use / capacity, 2) if capacity else None
+        }
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            checks = {"postgres": self._check(self._ping_postgres), "redis": self._check(self._redis.ping)}
+            for name, check in checks.items():
+                if not check["ok"] and self._checks.get(name, {}).get("ok", True):
+                    logger.warning(f"Readiness check {name} failed: {check['error']}")
+            self._checks = checks
+            self._checked_at = time.monotonic()
+            self._stopped.wait(self.interval)
+
+    def _ping_postgres(self) -> None:
+        with self._engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    def _check(self, probe) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            probe()
+            return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+        except Exception as e:
+            return {"ok": False, "error": str(e)[:200]}
+
+health_monitor = HealthMonitor()
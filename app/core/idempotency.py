@@ -0,0 +1,213 @@
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+from typing import Iterable, Optional
+from app.core.config import settings
+from app.core.redis import get_async_redis
+from app.core.security import bearer_subject
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+# Larger responses are passed through but not stored for replay
+MAX_STORED_BODY = 1024 * 1024
+
+class IdempotencyStore:
+    """Redis records for Idempotency-Key handling.
+
+    A key is either an in-flight marker (set with NX when the first request
+    starts) or a completed response. Both carry a fingerprint of the request
+    so a key reused for a different payload is rejected instead of replayed.
+    """
+
+    def __init__(self, redis_client=None):
+        self.redis = redis_client or get_async_redis()
+
+    async def begin(self, key: str, fingerprint: str) -> bool:
+        marker = json.dumps({"state": "in_flight", "fingerprint": fingerprint})
+        return bool(await self.redis.set(key, marker, nx=True, ex=settings.IDEMPOTENCY_LOCK_SECONDS))
+
+    async def get(self, key: str) -> Optional[dict]:
+        record = await self.redis.get(key)
+        return json.loads(record) if record else None
+
+    async def complete(self, key: str, fingerprint: str, status: int, headers: list, body: bytes) -> None:
+        record = json.dumps({
+            "state": "done",
+            "fingerprint": fingerprint,
+            "status": status,
+            "headers": headers,
+            "body": base64.b64encode(body).decode()
+        })
+        await self.redis.set(key, record, ex=settings.IDEMPOTENCY_TTL_SECONDS)
+
+    async def release(self, key: str) -> None:
+        await self.redis.delete(key)
+
+    async def wait(self, key: str, timeout: float) -> Optional[dict]:
+        """Poll until the in-flight request for ``key`` finishes or ``timeout`` passes."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay = 0.05
+        while True:
+            record = await self.get(key)
+            if record is None or record["state"] == "done":
+                return record
+            if loop.time() >= deadline:
+                return record
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
+class IdempotencyMiddleware:
+    """Replay the stored response for retried mutating requests.
+
+    Only requests to ``paths`` that carry an ``Idempotency-Key`` header are
+    handled. Keys are scoped by the bearer token's user (or, without one, the
+    Authorization header), so two users cannot collide and a refreshed token
+    keeps its keys. A duplicate of a completed request is answered from
+    Redis without touching the database; a duplicate of an in-flight request
+    waits for the first one. Only 2xx and 4xx responses are stored: a 5xx can be
+    retried, and a redirect (such as the trailing-slash one) is followed
+    with the same key.
+    """
+
+    def __init__(self, app, paths: Iterable[str], store: Optional[IdempotencyStore] = None):
+        self.app = app
+        self.paths = {path.rstrip("/") for path in paths}
+        self._store = store
+
+    @property
+    def store(self) -> IdempotencyStore:
+        if self._store is None:
+            self._store = IdempotencyStore()
+        return self._store
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("POST", "PUT", "PATCH", "DELETE")
+            or scope["path"].rstrip("/") not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        idempotency_key = headers.get(IDEMPOTENCY_HEADER, b"").decode("latin-1").strip()
+        if not idempotency_key:
+            await self.app(scope, receive, send)
+            return
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            await self._send_json(send, 400, {"detail": "Idempotency-Key is too long"})
+            return
+
+        body = await self._read_body(receive)
+        # By user, so a token refreshed between a request and its retry keeps
+        # the key; anonymous calls fall back to their Authorization header
+        subject = bearer_subject(scope)
+        caller = f"user:{subject}" if subject else hashlib.sha256(headers.get(b"authorization", b"")).hexdigest()[:16]
+        key = f"idempotency:{caller}:{scope['method']}:{scope['path'].rstrip('/')}:{idempotency_key}"
+        fingerprint = hashlib.sha256(body).hexdigest()
+
+        try:
+            started = await self.store.begin(key, fingerprint)
+            record = None if started else await self.store.get(key)
+            if record is not None and record["state"] == "in_flight" and record["fingerprint"] == fingerprint:
+                record = await self.store.wait(key, settings.IDEMPOTENCY_WAIT_SECONDS)
+                if record is None:
+                    # The first request failed and released the key; run this one instead
+                    started = await self.store.begin(key, fingerprint)
+        except Exception as e:
+            logger.error(f"Idempotency store unavailable, processing request normally: {e}")
+            await self.app(scope, self._replay_body(body, receive), send)
+            return
+
+        if not started:
+            if record is None:
+                await self._send_json(send, 409, {"detail": "A request with this Idempotency-Key is in progress"})
+            elif record["fingerprint"] != fingerprint:
+                await self._send_json(send, 422, {"detail": "Idempotency-Key was already used for a different request"})
+            elif record["state"] != "done":
+                await self._send_json(send, 409, {"detail": "A request with this Idempotency-Key is in progress"})
+            else:
+                await self._replay(send, record)
+            return
+
+        await self._run_and_store(scope, self._replay_body(body, receive), send, key, fingerprint)
+
+    async def _run_and_store(self, scope, receive, send, key: str, fingerprint: str):
+        response = {"status": 500, "headers": [], "chunks": [], "size": 0}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = [
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in message.get("headers", [])
+                ]
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                response["size"] += len(chunk)
+                if response["size"] <= MAX_STORED_BODY:
+                    response["chunks"].append(chunk)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            try:
+                # Redirects are not outcomes: the client follows them with the same key
+                stored = 200 <= response["status"] < 300 or 400 <= response["status"] < 500
+                if stored and response["size"] <= MAX_STORED_BODY:
+                    await self.store.complete(
+                        key, fingerprint, response["status"], response["headers"], b"".join(response["chunks"])
+                    )
+                else:
+                    await self.store.release(key)
+            except Exception as e:
+                logger.error(f"Error storing idempotent response: {e}")
+
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        return b"".join(chunks)
+
+    @staticmethod
+    def _replay_body(body: bytes, receive):
+        sent = False
+
+        async def replay():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return replay
+
+    @staticmethod
+    async def _replay(send, record: dict):
+        headers = [
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in record["headers"]
+        ]
+        headers.append((b"idempotent-replayed", b"true"))
+        await send({"type": "http.response.start", "status": record["status"], "headers": headers})
+        await send({"type": "http.response.body", "body": base64.b64decode(record["body"])})
+
+    @staticmethod
+    async def _send_json(send, status: int, content: dict):
+        body = json.dumps(content).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,270 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import bisect
+import glob
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds; the last bucket is everything above
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> float:
+        return self.value
+
+    def state(self) -> Any:
+        return self.value
+
+    def absorb(self, state: Any) -> None:
+        self.inc(state)
+
+class Gauge:
+    """A current value; across workers either summed or the largest is reported."""
+    kind = "gauge"
+
+    def __init__(self, aggregate: str = "sum"):
+        if aggregate not in ("sum", "max"):
+            raise ValueError(f"Unknown gauge aggregate {aggregate}")
+        self.aggregate = aggregate
+        self.value = 0
+        self._absorbed: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.inc(-amount)
+
+    def snapshot(self) -> float:
+        return self.value
+
+    def state(self) -> Any:
+        return self.value
+
+    def absorb(self, state: Any) -> None:
+        with self._lock:
+            if self.aggregate == "sum":
+                self.value += state
+            else:
+                self.value = state if self._absorbed is None else max(self._absorbed, state)
+                self._absorbed = self.value
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+            self.max = max(self.max, value)
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            buckets = {f"le_{bound:g}": count for bound, count in zip(self.buckets, self.counts)}
+            buckets["le_inf"] = self.counts[-1]
+            return {
+                "count": self.count,
+                "sum": round(self.sum, 6),
+                "avg": round(self.sum / self.count, 6) if self.count else 0.0,
+                "max": round(self.max, 6),
+                "buckets": buckets
+            }
+
+    def state(self) -> Any:
+        with self._lock:
+            return {"counts": list(self.counts), "count": self.count, "sum": self.sum, "max": self.max}
+
+    def absorb(self, state: Any) -> None:
+        with self._lock:
+            self.counts = [mine + theirs for mine, theirs in zip(self.counts, state["counts"])]
+            self.count += state["count"]
+            self.sum += state["sum"]
+            self.max = max(self.max, state["max"])
+
+class MetricsRegistry:
+    """In-process metrics for this worker.
+
+    Metrics are created on first use by name plus optional labels, so call
+    sites need no registration step. ``snapshot`` is what ``GET /metrics``
+    returns: this worker's numbers, or with ``share`` those of every worker.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], object] = {}
+        self._lock = threading.Lock()
+        self.shared: Optional["SharedMetrics"] = None
+
+    def _get(self, kind, name: str, labels: Optional[Dict[str, str]], *args):
+        key = (name, tuple(sorted((labels or {}).items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = self._metrics[key] = kind(*args)
+        return metric
+
+    def counter(self, name: str, labels: Optional[Dict[str, str]] = None) -> Counter:
+        return self._get(Counter, name, labels)
+
+    def gauge(self, name: str, labels: Optional[Dict[str, str]] = None, aggregate: str = "sum") -> Gauge:
+        return self._get(Gauge, name, labels, aggregate)
+
+    def histogram(
+        self, name: str, labels: Optional[Dict[str, str]] = None, buckets: Iterable[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get(Histogram, name, labels, buckets)
+
+    def snapshot(self) -> Dict[str, object]:
+        result: Dict[str, object] = {}
+        for (name, labels), metric in sorted(self._metrics.items(), key=lambda item: item[0]):
+            if labels:
+                label_text = ",".join(f"{key}={value}" for key, value in labels)
+                name = f"{name}{{{label_text}}}"
+            result[name] = metric.snapshot()
+        return result
+
+    def export(self) -> List[Dict[str, Any]]:
+        """Raw state of every metric, which ``absorb`` adds to another registry."""
+        entries = []
+        for (name, labels), metric in list(self._metrics.items()):
+            entry = {"name": name, "labels": dict(labels), "kind": metric.kind, "state": metric.state()}
+            if isinstance(metric, Gauge):
+                entry["aggregate"] = metric.aggregate
+            elif isinstance(metric, Histogram):
+                entry["buckets"] = list(metric.buckets)
+            entries.append(entry)
+        return entries
+
+    def absorb(self, entries: Iterable[Dict[str, Any]]) -> None:
+        for entry in entries:
+            if entry["kind"] == "counter":
+                metric = self.counter(entry["name"], entry["labels"])
+            elif entry["kind"] == "gauge":
+                metric = self.gauge(entry["name"], entry["labels"], entry["aggregate"])
+            else:
+                metric = self.histogram(entry["name"], entry["labels"], entry["buckets"])
+            metric.absorb(entry["state"])
+
+    def share(self, directory: str, interval: float) -> None:
+        """Report every worker's metrics from this one; call in each worker after fork."""
+        self.shared = SharedMetrics(self, directory, interval)
+        self.shared.start()
+
+class SharedMetrics:
+    """Metrics of all the workers of a pre-forked server, through files in ``directory``.
+
+    Each worker writes its registry to its own file every ``interval``
+    seconds and when it exits, and any worker can merge the files. When a
+    worker exits, the server folds its counters and histograms into an
+    archive so totals never go backwards, and drops its gauges. Counters
+    and histograms are summed; gauges are summed or maximised as declared.
+    """
+
+    ARCHIVE = "archive.json"
+
+    def __init__(self, registry: MetricsRegistry, directory: str, interval: float):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.write()
+
+    def write(self) -> None:
+        path = worker_path(self.directory, os.getpid())
+        # Write then rename, so readers never see a partial file
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(self.registry.export(), file)
+        os.replace(temp_path, path)
+
+    def collect(self) -> Dict[str, Any]:
+        """Merged metrics of every worker, this one's as of now."""
+        self.write()
+        merged = MetricsRegistry()
+        paths = glob.glob(worker_path(self.directory, "*"))
+        for path in paths + [os.path.join(self.directory, self.ARCHIVE)]:
+            merged.absorb(read_entries(path))
+        return {"workers": len(paths), "metrics": merged.snapshot()}
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.write()
+            except Exception as e:
+                logger.warning(f"Error writing metrics: {e}")
+
+def worker_path(directory: str, pid: Any) -> str:
+    return os.path.join(directory, f"worker-{pid}.json")
+
+def read_entries(path: str) -> List[Dict[str, Any]]:
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        # Missing, or from a worker killed mid-write of its temp file
+        return []
+
+def reset_shared_metrics(directory: str) -> None:
+    """Start a server's metrics from zero; call in the master before forking."""
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "*.json*")):
+        os.unlink(path)
+
+def retire_worker_metrics(directory: str, pid: int) -> None:
+    """Fold an exited worker's counters and histograms into the archive; call in the master."""
+    path = worker_path(directory, pid)
+    entries = [entry for entry in read_entries(path) if entry["kind"] != "gauge"]
+    if entries:
+        archive = MetricsRegistry()
+        archive_path = os.path.join(directory, SharedMetrics.ARCHIVE)
+        archive.absorb(read_entries(archive_path))
+        archive.absorb(entries)
+        temp_path = f"{archive_path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(archive.export(), file)
+        os.replace(temp_path, archive_path)
+    for leftover in (path, f"{path}.tmp"):
+        try:
+            os.unlink(leftover)
+        except FileNotFoundError:
+            pass
+
+metrics = MetricsRegistry()
@@ -0,0 +1,52 @@
+from typing import Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from app.core.database import engine
+import importlib
+import os
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "alembic.ini")
+
+MODEL_MODULES = (
+    "app.models.user",
+    "app.models.points",
+    "app.models.product",
+    "app.models.qr_code",
+    "app.models.order",
+    "app.models.retailer",
+)
+
+class SchemaOutOfDateError(RuntimeError):
+    """The database is not at the latest Alembic revision."""
+
+def import_models() -> None:
+    """Register every table on Base.metadata, for Alembic autogenerate."""
+    for module in MODEL_MODULES:
+        importlib.import_module(module)
+
+def head_revision() -> Optional[str]:
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(Config(ALEMBIC_INI)).get_current_head()
+
+def current_revision() -> Optional[str]:
+    with engine.connect() as connection:
+        try:
+            return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+        except ProgrammingError:
+            return None
+
+def check_schema() -> Tuple[Optional[str], Optional[str]]:
+    """Compare the database revision with the migrations on disk: one query, no DDL.
+
+    Raises SchemaOutOfDateError when they differ; migrations are applied with
+    `alembic upgrade head` before deploying, never by the workers.
+    """
+    current, head = current_revision(), head_revision()
+    if current != head:
+        raise SchemaOutOfDateError(
+            f"Database schema is at revision {current or 'none'}, expected {head}. "
+            "Run `alembic upgrade head` (or `alembic stamp 0001` for a database created by create_all)."
+        )
+    return current, head
@@ -0,0 +1,168 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+from app.core.metrics import metrics
+import logging
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# Statements per request are small integers, not seconds
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+_IN_LIST = re.compile(r"IN \((?:%\(\w+\)s, )*%\(\w+\)s\)")
+# One row of placeholders, which are themselves parenthesised: (%(a__0)s, %(b__0)s)
+_ROW = r"\((?:[^()]|\([^()]*\))*\)"
+_VALUES_ROWS = re.compile(rf"(VALUES {_ROW})(?:, {_ROW})+")
+_WHITESPACE = re.compile(r"\s+")
+
+def statement_shape(statement: str) -> str:
+    """The statement with IN lists and multi-row VALUES collapsed, so that
+    executions differing only in how many values they bind compare equal."""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _IN_LIST.sub("IN (...)", shape)
+    return _VALUES_ROWS.sub(r"\1, ...", shape)
+
+def parameter_shape(parameters: Any) -> str:
+    """Names and types of the bound parameters, never their values."""
+    if isinstance(parameters, (list, tuple)) and parameters and isinstance(parameters[0], (dict, list, tuple)):
+        return f"{len(parameters)} x {parameter_shape(parameters[0])}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{name}: {type(value).__name__}" for name, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+class QueryStats:
+    """Statements, commits and database time of one request or counted block."""
+
+    def __init__(self, label: str, parent: Optional["QueryStats"] = None):
+        self.label = label
+        self.parent = parent
+        self.count = 0
+        self.commits = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, shape: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[shape] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements run at least ``threshold`` times, most frequent first."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# Every engine (primary, replicas, health probe) reports here. Statements run
+# by the request's task, or by threadpool calls it makes, share its context.
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    shape = statement_shape(statement)
+    current = stats = _current.get()
+    while stats is not None:
+        stats.record(shape, elapsed)
+        stats = stats.parent
+
+    if elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS:
+        label = current.label if current is not None else "background"
+        metrics.counter("db_slow_queries").inc()
+        logger.warning(f"Slow query ({elapsed * 1000:.0f}ms, {label}): {shape[:1000]} params {parameter_shape(parameters)}")
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+@event.listens_for(Engine, "commit")
+def _commit(conn):
+    stats = _current.get()
+    while stats is not None:
+        stats.commits += 1
+        stats = stats.parent
+
+class TooManyQueriesError(AssertionError):
+    """A block ran more statements than it was allowed."""
+
+@contextmanager
+def count_queries(label: str = "block") -> Iterator[QueryStats]:
+    """Count the statements run inside the block, in this context.
+
+    Counts still reach the request around the block, if any.
+    """
+    stats = QueryStats(label, parent=_current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+@contextmanager
+def assert_max_queries(limit: int, repeated: Optional[int] = None) -> Iterator[QueryStats]:
+    """Fail with TooManyQueriesError if the block runs more than ``limit``
+    statements, or, with ``repeated``, any one statement that many times.
+
+    For checks and test scripts, e.g. ``with assert_max_queries(2):``.
+    """
+    with count_queries("assert_max_queries") as stats:
+        yield stats
+    problems = []
+    if stats.count > limit:
+        problems.append(f"{stats.count} queries, expected at most {limit}")
+    if repeated is not None:
+        problems.extend(f"{count} x {shape[:200]}" for shape, count in stats.repeated(repeated))
+    if problems:
+        listing = "\n".join(f"  {count} x {shape[:300]}" for shape, count in stats.shapes.most_common())
+        raise TooManyQueriesError("; ".join(problems[:3]) + f"\nStatements:\n{listing}")
+
+class QueryStatsMiddleware:
+    """Attribute database statements to the HTTP request that ran them.
+
+    Records per-route histograms of statements, commits and database time,
+    and logs requests that run one statement shape SQL_REPEATED_QUERY_THRESHOLD
+    times or more, the usual sign of an N+1 loop. Routes are labelled by their
+    path template so that ids do not create a metric per resource.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = QueryStats(f"{scope['method']} {scope['path']}")
+        token = _current.set(stats)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+            self._report(scope, stats)
+
+    @staticmethod
+    def _report(scope, stats: QueryStats) -> None:
+        # Mounted apps such as /uploads have no route
+        route = getattr(scope.get("route"), "path", None) or "other"
+        labels = {"route": f"{scope['method']} {route}"}
+        metrics.histogram("db_queries_per_request", labels, buckets=QUERY_COUNT_BUCKETS).observe(stats.count)
+        metrics.histogram("db_commits_per_request", labels, buckets=QUERY_COUNT_BUCKETS).observe(stats.commits)
+        metrics.histogram("db_seconds_per_request", labels).observe(stats.seconds)
+        repeated = stats.repeated(settings.SQL_REPEATED_QUERY_THRESHOLD)
+        if repeated:
+            metrics.counter("db_repeated_queries", labels).inc()
+            shape, count = repeated[0]
+            logger.warning(
+                f"{stats.label} ran one statement {count} times ({stats.count} in total), likely N+1: {shape[:500]}"
+            )
@@ -0,0 +1,248 @@
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.redis import get_async_redis
+from app.core.security import bearer_subject
+import json
+import logging
+import math
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# Token bucket per key. Refills at ARGV[2] tokens per millisecond up to ARGV[1],
+# first charges ARGV[3] tokens already spent on locally admitted requests (the
+# bucket may go into debt for those), then takes ARGV[4] if available. Uses the
+# Redis clock so every worker agrees. Returns {allowed, tokens left, retry ms}.
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local owed = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - ts, 0) * rate)
+tokens = math.max(tokens - owed, -capacity)
+local allowed = 0
+local retry = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry = math.ceil((cost - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate) + 1000)
+return {allowed, tostring(tokens), retry}
+"""
+
+# Local estimates older than this are refreshed from Redis
+LOCAL_SYNC_SECONDS = 1.0
+
+# Bodies read for a phone number limit; an OTP request is a few dozen bytes
+PHONE_BODY_LIMIT = 4096
+
+class RateLimit:
+    """``burst`` requests at once, refilled at ``rate`` per second, per ``key``.
+
+    ``key`` is "ip" (the client address), "user" (the bearer token's user
+    id; requests without a valid token are not counted) or "phone" (the
+    ``phone_number`` field of a JSON body).
+    """
+
+    def __init__(self, key: str, rate: float, burst: int):
+        if key not in ("ip", "user", "phone"):
+            raise ValueError(f"Unknown rate limit key {key}")
+        self.key = key
+        self.rate = rate
+        self.burst = burst
+        # Requests a worker may admit on its own estimate between Redis syncs
+        self.local_budget = int(burst * settings.RATE_LIMIT_LOCAL_SHARE)
+
+class LocalBuckets:
+    """Each worker's last view of the Redis buckets, plus what it admitted since.
+
+    A request is admitted without Redis only while the last known level is
+    at least half full and the worker has admitted fewer than the limit's
+    local budget since; the next sync charges those requests. Across all
+    workers the bucket can be overdrawn by at most workers x local budget.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    def admit(self, key: str, limit: RateLimit) -> bool:
+        bucket = self._buckets.get(key)
+        if bucket is None or limit.local_budget <= 0:
+            return False
+        tokens, owed, synced_at = bucket
+        if (
+            time.monotonic() - synced_at < LOCAL_SYNC_SECONDS
+            and owed < limit.local_budget
+            and tokens - owed - 1 >= limit.burst / 2
+        ):
+            bucket[1] += 1
+            return True
+        return False
+
+    def owed(self, key: str) -> int:
+        bucket = self._buckets.get(key)
+        return int(bucket[1]) if bucket else 0
+
+    def synced(self, key: str, tokens: float, charged: int) -> None:
+        # Requests admitted locally while the sync was in flight are still owed
+        owed = max(self.owed(key) - charged, 0)
+        self._buckets[key] = [tokens, owed, time.monotonic()]
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.size:
+            self._buckets.popitem(last=False)
+
+class RateLimitMiddleware:
+    """Reject requests over their rate limits with 429, before any endpoint runs.
+
+    ``default`` limits apply to every /api/ request and ``routes`` adds
+    stricter limits for particular paths. Buckets live in Redis and are
+    updated by one atomic script per check; most requests from clients far
+    below their limit are admitted on the worker's local estimate instead.
+    If Redis is unavailable, requests are let through.
+    """
+
+    def __init__(self, app, default: Iterable[RateLimit] = (), routes: Optional[Dict[str, Iterable[RateLimit]]] = None):
+        self.app = app
+        self.default = list(default)
+        self.routes = {path.rstrip("/"): list(limits) for path, limits in (routes or {}).items()}
+        self.local = LocalBuckets(settings.RATE_LIMIT_LOCAL_SIZE)
+        self._script = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"].rstrip("/")
+        route_limits = self.routes.get(path, [])
+        if any(limit.key == "phone" for limit in route_limits):
+            body = await self._read_body(receive, PHONE_BODY_LIMIT)
+            if body is None:
+                metrics.counter("rate_limit", {"policy": path, "result": "too_large"}).inc()
+                await self._respond(send, 413, "Request body too large")
+                return
+            receive = self._replay_body(body, receive)
+        else:
+            body = None
+
+        checks = []
+        for policy, limits in (("default", self.default), (path, route_limits)):
+            for limit in limits:
+                identity = self._identity(limit.key, scope, body)
+                if identity is not None:
+                    checks.append((f"rate_limit:{policy}:{limit.key}:{identity}", limit, policy))
+
+        retry_after = await self._check(checks)
+        if retry_after is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self._respond(
+            send, 429, "Too many requests, please retry later",
+            [(b"retry-after", str(max(math.ceil(retry_after), 1)).encode())]
+        )
+
+    @staticmethod
+    async def _respond(send, status: int, detail: str, headers: Iterable[Tuple[bytes, bytes]] = ()) -> None:
+        content = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(content)).encode()),
+                *headers,
+            ]
+        })
+        await send({"type": "http.response.body", "body": content})
+
+    async def _check(self, checks: List[Tuple[str, RateLimit, str]]) -> Optional[float]:
+        """Seconds until the request could be admitted, or None to admit it now."""
+        remote = []
+        for key, limit, policy in checks:
+            if self.local.admit(key, limit):
+                metrics.counter("rate_limit", {"policy": policy, "result": "local"}).inc()
+            else:
+                remote.append((key, limit, policy))
+        if not remote:
+            return None
+
+        try:
+            if self._script is None:
+                self._script = get_async_redis().register_script(TOKEN_BUCKET_LUA)
+            pipeline = get_async_redis().pipeline(transaction=False)
+            charged = [self.local.owed(key) for key, _, _ in remote]
+            for (key, limit, _), owed in zip(remote, charged):
+                await self._script(keys=[key], args=[limit.burst, limit.rate / 1000, owed, 1], client=pipeline)
+            results = await pipeline.execute()
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable, admitting request: {e}")
+            metrics.counter("rate_limit", {"policy": "all", "result": "unavailable"}).inc()
+            return None
+
+        retry_after = None
+        for (key, limit, policy), owed, (allowed, tokens, retry_ms) in zip(remote, charged, results):
+            self.local.synced(key, float(tokens), owed)
+            if allowed:
+                metrics.counter("rate_limit", {"policy": policy, "result": "allowed"}).inc()
+            else:
+                metrics.counter("rate_limit", {"policy": policy, "result": "rejected"}).inc()
+                retry_after = max(retry_after or 0, int(retry_ms) / 1000)
+        return retry_after
+
+    @staticmethod
+    def _identity(key: str, scope, body: Optional[bytes]) -> Optional[str]:
+        if key == "ip":
+            client = scope.get("client")
+            return client[0] if client else None
+        if key == "user":
+            return bearer_subject(scope)
+        try:
+            phone_number = json.loads(body or b"{}").get("phone_number")
+        except (ValueError, AttributeError):
+            return None
+        if not isinstance(phone_number, str):
+            return None
+        # send_otp adds the "+" itself, so every spelling of a number reaches one handset
+        return re.sub(r"\D", "", phone_number) or None
+
+    @staticmethod
+    async def _read_body(receive, limit: int) -> Optional[bytes]:
+        """The request body, or None as soon as it exceeds ``limit`` bytes."""
+        chunks = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > limit:
+                return None
+            chunks.append(chunk)
+            more_body = message.get("more_body", False)
+        return b"".join(chunks)
+
+    @staticmethod
+    def _replay_body(body: bytes, receive):
+        sent = False
+
+        async def replay():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return replay
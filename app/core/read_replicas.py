@@ -0,0 +1,158 @@
+from typing import Dict, Iterable, Optional, Set
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import metrics
+from app.core.redis import get_redis
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+WRITTEN_USERS_KEY = "written_users"
+
+# Seconds the replica is behind the primary; 0 when it has replayed everything it
+# received (an idle primary would otherwise look like growing lag), NULL before
+# it has replayed anything.
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+def note_user_write(db: Session, user_id: int) -> None:
+    """Send ``user_id``'s reads to the primary for a while after each commit of this session."""
+    db.info.setdefault(WRITTEN_USERS_KEY, set()).add(user_id)
+
+class ReplicaRouter:
+    """Chooses the database a read-only request uses.
+
+    Reads go to a random replica whose measured lag is within ``max_lag``;
+    a daemon thread measures every replica each ``check_interval`` seconds,
+    so choosing costs no query. When no replica qualifies (none configured,
+    unreachable, lagging, or not measured yet) the read uses the primary.
+    A user whose own write committed in the last ``read_your_writes``
+    seconds is also read from the primary, so they see what they just did;
+    the marker lives in Redis to cover every worker. Replica sessions are
+    read-only at the database level.
+    """
+
+    def __init__(
+        self,
+        urls: Iterable[str],
+        max_lag: Optional[float] = None,
+        check_interval: Optional[float] = None,
+        read_your_writes: Optional[float] = None
+    ):
+        self.max_lag = settings.REPLICA_MAX_LAG_SECONDS if max_lag is None else max_lag
+        self.check_interval = check_interval or settings.REPLICA_CHECK_SECONDS
+        self.read_your_writes = (
+            settings.READ_YOUR_WRITES_SECONDS if read_your_writes is None else read_your_writes
+        )
+        self.replicas: Dict[str, sessionmaker] = {}
+        for index, url in enumerate(urls):
+            engine = create_engine(url, pool_pre_ping=True, execution_options={"postgresql_readonly": True})
+            self.replicas[f"replica{index + 1}"] = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        self._lag: Dict[str, Optional[float]] = {name: None for name in self.replicas}
+        self._recent_writes: Dict[int, float] = {}
+        self._monitor: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def session(self, user_id: Optional[int] = None) -> Session:
+        if not self.replicas:
+            return SessionLocal()
+        self._ensure_monitoring()
+
+        if user_id is not None and self.recently_wrote(user_id):
+            return self._primary("read_your_writes")
+        candidates = [
+            name for name, lag in self._lag.items() if lag is not None and lag <= self.max_lag
+        ]
+        if not candidates:
+            return self._primary("replicas_unavailable")
+        name = random.choice(candidates)
+        metrics.counter("db_read_sessions", {"target": name}).inc()
+        return self.replicas[name]()
+
+    def primary_session(self) -> Session:
+        """Primary session for a read the chosen replica could not answer yet."""
+        return self._primary("replica_miss")
+
+    def recently_wrote(self, user_id: int) -> bool:
+        written_at = self._recent_writes.get(user_id)
+        if written_at is not None and time.monotonic() - written_at < self.read_your_writes:
+            return True
+        try:
+            return bool(get_redis().exists(f"recent_write:{user_id}"))
+        except Exception as e:
+            # Without the marker the primary is the safe choice
+            logger.warning(f"Could not check recent writes for user {user_id}: {e}")
+            return True
+
+    def note_writes(self, user_ids: Set[int]) -> None:
+        if not self.replicas or not user_ids:
+            return
+        now = time.monotonic()
+        if len(self._recent_writes) > 10000:
+            self._recent_writes = {
+                user_id: written_at for user_id, written_at in self._recent_writes.items()
+                if now - written_at < self.read_your_writes
+            }
+        for user_id in user_ids:
+            self._recent_writes[user_id] = now
+        try:
+            pipeline = get_redis().pipeline(transaction=False)
+            for user_id in user_ids:
+                pipeline.set(f"recent_write:{user_id}", 1, px=int(self.read_your_writes * 1000))
+            pipeline.execute()
+        except Exception as e:
+            logger.error(f"Error recording recent writes: {e}")
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        return dict(self._lag)
+
+    def _primary(self, reason: str) -> Session:
+        metrics.counter("db_read_sessions", {"target": "primary", "reason": reason}).inc()
+        return SessionLocal()
+
+    def _ensure_monitoring(self) -> None:
+        if self._monitor is not None:
+            return
+        with self._start_lock:
+            if self._monitor is None:
+                self._monitor = threading.Thread(target=self._run_monitor, name="replica-monitor", daemon=True)
+                self._monitor.start()
+
+    def _run_monitor(self) -> None:
+        while True:
+            for name, factory in self.replicas.items():
+                self._lag[name] = self._measure(name, factory)
+            time.sleep(self.check_interval)
+
+    def _measure(self, name: str, factory: sessionmaker) -> Optional[float]:
+        try:
+            with factory() as db:
+                lag = db.execute(REPLICA_LAG_SQL).scalar()
+        except Exception as e:
+            if self._lag[name] is not None:
+                logger.warning(f"Read replica {name} is unavailable: {e}")
+            return None
+        lag = None if lag is None else float(lag)
+        metrics.gauge("db_replica_lag_seconds", {"replica": name}, aggregate="max").set(-1 if lag is None else lag)
+        if lag is not None and lag > self.max_lag and (self._lag[name] or 0) <= self.max_lag:
+            logger.warning(f"Read replica {name} is {lag:.1f}s behind, reading from the primary")
+        return lag
+
+replica_router = ReplicaRouter(settings.DATABASE_REPLICA_URLS)
+
+@event.listens_for(SessionLocal, "after_commit")
+def _note_committed_writes(session: Session):
+    # Kept for the session's life: request sessions may commit more than once
+    user_ids = session.info.get(WRITTEN_USERS_KEY)
+    if user_ids:
+        replica_router.note_writes(user_ids)
@@ -0,0 +1,20 @@
+import redis
+import redis.asyncio as aioredis
+from app.core.config import settings
+
+_redis_client = None
+_async_redis_client = None
+
+def get_redis() -> redis.Redis:
+    """Return the shared Redis client for this process."""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _redis_client
+
+def get_async_redis() -> aioredis.Redis:
+    """Return the shared asyncio Redis client, for code running on the event loop."""
+    global _async_redis_client
+    if _async_redis_client is None:
+        _async_redis_client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _async_redis_client
@@ -0,0 +1,336 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import metrics
+from app.core.read_replicas import WRITTEN_USERS_KEY
+from app.core.redis import get_redis, get_async_redis
+from app.core.security import bearer_subject
+import asyncio
+import base64
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "response_cache_invalidations"
+# Scope versions outlive every cached entry, then expire so idle users leave no keys behind
+VERSION_TTL_SECONDS = 24 * 60 * 60
+
+def per_user(scope: Dict[str, Any]) -> Optional[str]:
+    """Cache key scope for responses that depend on the caller; no valid token means no caching."""
+    user_id = bearer_subject(scope)
+    return f"user:{user_id}" if user_id else None
+
+def shared(scope: Dict[str, Any]) -> Optional[str]:
+    """Cache key scope for responses that are the same for every caller."""
+    return "shared"
+
+class CachedRoute:
+    """How one GET route is cached: for ``ttl`` seconds, per the scope ``key`` returns."""
+
+    def __init__(self, ttl: float, key: Callable[[Dict[str, Any]], Optional[str]] = per_user):
+        self.ttl = ttl
+        self.key = key
+
+def _version_key(cache_scope: str) -> str:
+    return f"response_cache:version:{cache_scope}"
+
+def invalidate(cache_scopes: Iterable[str]) -> None:
+    """Drop every cached response in ``cache_scopes``, in Redis and in every worker."""
+    cache_scopes = list(cache_scopes)
+    if not cache_scopes:
+        return
+    response_cache.local.evict(cache_scopes)
+    pipeline = get_redis().pipeline(transaction=False)
+    for cache_scope in cache_scopes:
+        pipeline.incr(_version_key(cache_scope))
+        pipeline.expire(_version_key(cache_scope), VERSION_TTL_SECONDS)
+    pipeline.publish(INVALIDATION_CHANNEL, json.dumps(cache_scopes))
+    pipeline.execute()
+
+class LocalCache:
+    """Bounded LRU of responses in this worker, evictable by scope."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._scopes: Dict[str, Set[str]] = {}
+        # When each scope was last evicted, so a response computed before that is not kept
+        self._evicted_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, cache_scope, entry = item
+            if time.monotonic() >= expires_at:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, cache_scope: str, entry: Dict[str, Any], ttl: float, computed_since: float) -> None:
+        with self._lock:
+            if self._evicted_at.get(cache_scope, 0.0) >= computed_since:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, cache_scope, entry)
+            self._scopes.setdefault(cache_scope, set()).add(key)
+            while len(self._entries) > self.size:
+                self._remove(next(iter(self._entries)))
+
+    def evict(self, cache_scopes: Iterable[str]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._evicted_at) > self.size:
+                self._evicted_at = {
+                    cache_scope: evicted_at for cache_scope, evicted_at in self._evicted_at.items()
+                    if now - evicted_at < 60
+                }
+            for cache_scope in cache_scopes:
+                self._evicted_at[cache_scope] = now
+                for key in list(self._scopes.get(cache_scope, ())):
+                    self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._scopes.clear()
+
+    def _remove(self, key: str) -> None:
+        _, cache_scope, _ = self._entries.pop(key)
+        keys = self._scopes.get(cache_scope)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._scopes[cache_scope]
+
+class ResponseCache:
+    """Two-tier store of cached responses with per-scope versions.
+
+    Redis holds each response with the version of its scope at the time it
+    was computed; ``invalidate`` bumps the version, so an entry computed
+    from data that changed meanwhile is never served, and announces the
+    scope so every worker drops its local copies. Local entries are only
+    served while this worker's invalidation subscription is up.
+    """
+
+    def __init__(self):
+        self.local = LocalCache(settings.RESPONSE_CACHE_LOCAL_SIZE)
+        self._listener: Optional[asyncio.Task] = None
+        self.subscribed = False
+
+    def ensure_listening(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def lookup(self, key: str, cache_scope: str) -> tuple:
+        """Return the Redis entry if it is current, and the scope's current version."""
+        entry, version = await get_async_redis().mget(key, _version_key(cache_scope))
+        version = int(version or 0)
+        if entry is None:
+            return None, version
+        entry = json.loads(entry)
+        return (entry if entry["version"] == version else None), version
+
+    async def store(self, key: str, entry: Dict[str, Any], ttl: float) -> None:
+        await get_async_redis().set(key, json.dumps(entry), px=int(ttl * 1000))
+
+    def remember(self, key: str, cache_scope: str, entry: Dict[str, Any], ttl: float, since: float) -> None:
+        """Keep a local copy of an entry looked up at ``since``, unless it may be outdated."""
+        if self.subscribed:
+            self.local.put(key, cache_scope, entry, min(ttl, settings.RESPONSE_CACHE_LOCAL_SECONDS), since)
+
+    async def wait(self, key: str, cache_scope: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Poll for the entry another worker is computing, for up to ``timeout`` seconds."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay = 0.02
+        while loop.time() < deadline:
+            await asyncio.sleep(delay)
+            entry, _ = await self.lookup(key, cache_scope)
+            if entry is not None:
+                return entry
+            delay = min(delay * 2, 0.2)
+        return None
+
+    async def _listen(self) -> None:
+        delay = 1.0
+        while True:
+            pubsub = get_async_redis().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                self.subscribed = True
+                delay = 1.0
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.local.evict(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Invalidations may be missed until the next subscription
+                self.subscribed = False
+                self.local.clear()
+                logger.warning(f"Response cache invalidations lost, retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+            finally:
+                self.subscribed = False
+                try:
+                    await pubsub.reset()
+                except Exception:
+                    pass
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+
+response_cache = ResponseCache()
+
+class ResponseCacheMiddleware:
+    """Serve repeated GETs of the configured routes from the response cache.
+
+    Each route in ``routes`` is cached for its TTL under the scope its key
+    function returns; requests it returns no scope for are passed through.
+    Only 200 responses up to RESPONSE_CACHE_MAX_BODY bytes are stored.
+    Concurrent misses for the same key run the endpoint once: within a
+    worker they wait on the first request, across workers on a short Redis
+    lock. Without Redis, requests are passed through.
+    """
+
+    def __init__(self, app, routes: Dict[str, CachedRoute]):
+        self.app = app
+        self.routes = {path.rstrip("/"): route for path, route in routes.items()}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def __call__(self, scope, receive, send):
+        route = None
+        if scope["type"] == "http" and scope["method"] == "GET":
+            route = self.routes.get(scope["path"].rstrip("/"))
+        cache_scope = route.key(scope) if route is not None else None
+        if cache_scope is None:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"].rstrip("/")
+        key = f"response_cache:{cache_scope}:{path}?{scope['query_string'].decode('latin-1')}"
+        response_cache.ensure_listening()
+
+        entry = response_cache.local.get(key) if response_cache.subscribed else None
+        if entry is not None:
+            metrics.counter("response_cache", {"route": path, "result": "local_hit"}).inc()
+            await self._send_entry(send, entry, "HIT")
+            return
+
+        leader = self._inflight.get(key)
+        if leader is not None:
+            entry = await asyncio.shield(leader)
+            if entry is not None:
+                metrics.counter("response_cache", {"route": path, "result": "coalesced"}).inc()
+                await self._send_entry(send, entry, "HIT")
+                return
+            await self.app(scope, receive, send)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        entry = None
+        try:
+            entry = await self._fill(scope, receive, send, route, path, key, cache_scope)
+        finally:
+            del self._inflight[key]
+            future.set_result(entry)
+
+    async def _fill(self, scope, receive, send, route: CachedRoute, path: str, key: str, cache_scope: str):
+        lock_key = f"{key}:filling"
+        started = time.monotonic()
+        try:
+            entry, version = await response_cache.lookup(key, cache_scope)
+            if entry is None and not await get_async_redis().set(
+                lock_key, 1, nx=True, px=int(settings.RESPONSE_CACHE_WAIT_SECONDS * 1000)
+            ):
+                entry = await response_cache.wait(key, cache_scope, settings.RESPONSE_CACHE_WAIT_SECONDS)
+        except Exception as e:
+            logger.warning(f"Response cache unavailable, passing {path} through: {e}")
+            metrics.counter("response_cache", {"route": path, "result": "bypass"}).inc()
+            await self.app(scope, receive, send)
+            return None
+
+        if entry is not None:
+            metrics.counter("response_cache", {"route": path, "result": "hit"}).inc()
+            response_cache.remember(key, cache_scope, entry, route.ttl, started)
+            await self._send_entry(send, entry, "HIT")
+            return entry
+
+        metrics.counter("response_cache", {"route": path, "result": "miss"}).inc()
+        response = {"status": 500, "headers": [], "chunks": [], "size": 0}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = [
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in message.get("headers", [])
+                ]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-cache", b"MISS")]}
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                response["size"] += len(chunk)
+                if response["size"] <= settings.RESPONSE_CACHE_MAX_BODY:
+                    response["chunks"].append(chunk)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            entry = None
+            if response["status"] == 200 and response["size"] <= settings.RESPONSE_CACHE_MAX_BODY:
+                entry = {
+                    # The version read before computing: a change committed meanwhile outdates it
+                    "version": version,
+                    "status": response["status"],
+                    "headers": response["headers"],
+                    "body": base64.b64encode(b"".join(response["chunks"])).decode()
+                }
+            try:
+                if entry is not None:
+                    await response_cache.store(key, entry, route.ttl)
+                    response_cache.remember(key, cache_scope, entry, route.ttl, started)
+                await get_async_redis().delete(lock_key)
+            except Exception as e:
+                logger.error(f"Error storing cached response for {path}: {e}")
+        return entry
+
+    @staticmethod
+    async def _send_entry(send, entry: Dict[str, Any], result: str):
+        headers = [
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in entry["headers"]
+        ]
+        headers.append((b"x-cache", result.encode()))
+        await send({"type": "http.response.start", "status": entry["status"], "headers": headers})
+        await send({"type": "http.response.body", "body": base64.b64decode(entry["body"])})
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_written_users(session: Session):
+    user_ids = session.info.get(WRITTEN_USERS_KEY)
+    if not user_ids:
+        return
+    try:
+        invalidate(f"user:{user_id}" for user_id in user_ids)
+    except Exception as e:
+        # Entries still expire with their TTL
+        logger.error(f"Error invalidating cached responses: {e}")
@@ -7,6 +7,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.config import settings
 from app.models.user import User
 from app.core.database import get_db
+from app.core.read_replicas import replica_router, note_user_write
 from sqlalchemy.orm import Session
 import secrets
 import string
@@ -16,6 +17,8 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # JWT token security
 security = HTTPBearer()
+# Reads the token, if any, only to route reads; authentication is left to get_current_reader
+optional_security = HTTPBearer(auto_error=False)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -52,6 +55,20 @@ def verify_token(token: str) -> dict:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+def bearer_subject(scope: dict) -> Optional[str]:
+    """User id from an ASGI request's bearer token, or None when it is missing or invalid."""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token.strip():
+                return None
+            try:
+                subject = verify_token(token.strip()).get("sub")
+            except HTTPException:
+                return None
+            return str(subject) if subject else None
+    return None
+
 def generate_otp(length: int = 6) -> str:
     """Generate a random OTP"""
     return ''.join(secrets.choice(string.digits) for _ in range(length))
@@ -83,4 +100,58 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return user 
\ No newline at end of file
+    # Whatever this request commits counts as the user's own write
+    note_user_write(db, user.id)
+    return user
+
+def get_read_db(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)):
+    """Session for read-only endpoints: a replica when one is fresh enough, else the primary."""
+    user_id = None
+    if credentials is not None:
+        try:
+            user_id = int(verify_token(credentials.credentials).get("sub"))
+        except (HTTPException, TypeError, ValueError):
+            pass
+    db = replica_router.session(user_id)
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_current_reader(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_read_db)
+) -> User:
+    """get_current_user for read-only endpoints, loading the user through get_read_db."""
+    payload = verify_token(credentials.credentials)
+    user_id: str = payload.get("sub")
+    
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    user = db.query(User).filter(User.id == int(user_id)).first()
+    if user is None and replica_router.replicas:
+        # A user created moments ago may not have reached the replica yet
+        with replica_router.primary_session() as primary:
+            user = primary.query(User).filter(User.id == int(user_id)).first()
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return user
+
+async def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    
+    return current_user
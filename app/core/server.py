@@ -0,0 +1,64 @@
+from typing import Optional
+from types import FrameType
+from gunicorn.arbiter import Arbiter
+from uvicorn.server import Server
+from uvicorn.workers import UvicornWorker
+from app.core.config import settings
+from app.core.health import health_monitor
+import asyncio
+import math
+import os
+import signal
+import sys
+
+def worker_count() -> int:
+    """Worker processes for the production server: WEB_WORKERS, or one per usable CPU core."""
+    if settings.WEB_WORKERS > 0:
+        return settings.WEB_WORKERS
+    try:
+        # Honours CPU affinity and container cpusets, unlike os.cpu_count()
+        return max(len(os.sched_getaffinity(0)), 1)
+    except AttributeError:
+        return os.cpu_count() or 1
+
+class DrainingServer(Server):
+    """Uvicorn server that drains before it stops.
+
+    On the first SIGTERM the worker keeps serving for HEALTH_DRAIN_SECONDS
+    while /health/ready answers "draining", so load balancers stop sending
+    it traffic before it closes its listening socket. Another signal during
+    the drain stops it straight away.
+    """
+
+    def handle_exit(self, sig: int, frame: Optional[FrameType]) -> None:
+        if sig != signal.SIGTERM or health_monitor.draining or settings.HEALTH_DRAIN_SECONDS <= 0:
+            return super().handle_exit(sig, frame)
+        health_monitor.start_draining()
+        asyncio.get_running_loop().call_later(settings.HEALTH_DRAIN_SECONDS, super().handle_exit, sig, frame)
+
+class ProductionWorker(UvicornWorker):
+    """Gunicorn worker running the app on uvloop and httptools.
+
+    Uvicorn's own shutdown waits for every open connection, and event
+    streams never finish by themselves, so a restarting worker would sit
+    there until gunicorn killed it and skipped the app's shutdown hooks.
+    The worker instead stops waiting slightly before gunicorn's
+    graceful_timeout, less the drain period, letting in-flight requests
+    finish and the lifespan shutdown run.
+    """
+
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools"}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        drain = math.ceil(max(settings.HEALTH_DRAIN_SECONDS, 0))
+        self.config.timeout_graceful_shutdown = max(self.cfg.graceful_timeout - drain - 5, 1)
+
+    async def _serve(self) -> None:
+        # UvicornWorker._serve with the draining server
+        self.config.app = self.wsgi
+        server = DrainingServer(config=self.config)
+        self._install_sigquit_handler()
+        await server.serve(sockets=self.sockets)
+        if not server.started:
+            sys.exit(Arbiter.WORKER_BOOT_ERROR)
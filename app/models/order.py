@@ -1,8 +1,12 @@
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, Field
-from bson import ObjectId
-from app.models.user import PyObjectId
+from pydantic import BaseModel, ConfigDict, Field
+from app.models.user import PyObjectId, new_object_id
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Numeric, Text, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.core.database import Base
 
 class OrderItem(BaseModel):
     product_id: str = Field(..., description="Product ID")
@@ -34,6 +38,26 @@ class OrderBase(BaseModel):
 class OrderCreate(OrderBase):
     pass
 
+class OrderItemRequest(BaseModel):
+    product_id: int = Field(..., description="Product ID")
+    quantity: int = Field(..., gt=0, le=1000, description="Quantity ordered")
+
+class OrderPlaceRequest(BaseModel):
+    items: List[OrderItemRequest] = Field(..., min_length=1, max_length=100, description="Products to order")
+    payment_method: Optional[str] = Field(None, description="Payment method used")
+    shipping_address: Optional[dict] = Field(None, description="Shipping address")
+    billing_address: Optional[dict] = Field(None, description="Billing address")
+    notes: Optional[str] = Field(None, description="Order notes")
+    retailer_id: Optional[str] = Field(None, description="Associated retailer ID")
+
+class OrderStatusUpdate(BaseModel):
+    status: str = Field(
+        ...,
+        pattern="^(processing|shipped|delivered|cancelled)$",
+        description="New status: processing, shipped, delivered or cancelled"
+    )
+    tracking_number: Optional[str] = Field(None, description="Shipping tracking number")
+
 class OrderUpdate(BaseModel):
     status: Optional[str] = None
     payment_status: Optional[str] = None
@@ -44,7 +68,7 @@ class OrderUpdate(BaseModel):
     tracking_number: Optional[str] = None
 
 class OrderInDB(OrderBase):
-    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
+    id: PyObjectId = Field(default_factory=new_object_id, alias="_id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     processed_at: Optional[datetime] = Field(None, description="Order processing timestamp")
@@ -55,23 +79,68 @@ class OrderInDB(OrderBase):
     estimated_delivery: Optional[datetime] = Field(None, description="Estimated delivery date")
     actual_delivery: Optional[datetime] = Field(None, description="Actual delivery date")
 
-    class Config:
-        allow_population_by_field_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
+    model_config = ConfigDict(populate_by_name=True)
 
 class OrderResponse(OrderBase):
     id: str = Field(alias="_id")
     created_at: datetime
     updated_at: datetime
-    processed_at: Optional[datetime]
-    shipped_at: Optional[datetime]
-    delivered_at: Optional[datetime]
-    cancelled_at: Optional[datetime]
-    tracking_number: Optional[str]
-    estimated_delivery: Optional[datetime]
-    actual_delivery: Optional[datetime]
+    processed_at: Optional[datetime] = None
+    shipped_at: Optional[datetime] = None
+    delivered_at: Optional[datetime] = None
+    cancelled_at: Optional[datetime] = None
+    tracking_number: Optional[str] = None
+    estimated_delivery: Optional[datetime] = None
+    actual_delivery: Optional[datetime] = None
+
+    model_config = ConfigDict(populate_by_name=True)
+
+class Order(Base):
+    __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_user_id_created_at", "user_id", "created_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    order_number = Column(String, unique=True, index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    retailer_id = Column(String, index=True)
+    subtotal = Column(Numeric(14, 2, asdecimal=False), nullable=False)
+    tax_amount = Column(Numeric(14, 2, asdecimal=False), default=0)
+    discount_amount = Column(Numeric(14, 2, asdecimal=False), default=0)
+    shipping_amount = Column(Numeric(14, 2, asdecimal=False), default=0)
+    total_amount = Column(Numeric(14, 2, asdecimal=False), nullable=False)
+    currency = Column(String, default="PKR")
+    status = Column(String, default="pending")
+    payment_status = Column(String, default="pending")
+    payment_method = Column(String)
+    shipping_address = Column(JSONB)
+    billing_address = Column(JSONB)
+    notes = Column(Text)
+    total_points_earned = Column(Integer, default=0)
+    tracking_number = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    processed_at = Column(DateTime(timezone=True))
+    shipped_at = Column(DateTime(timezone=True))
+    delivered_at = Column(DateTime(timezone=True))
+    cancelled_at = Column(DateTime(timezone=True))
+    estimated_delivery = Column(DateTime(timezone=True))
+    actual_delivery = Column(DateTime(timezone=True))
+
+    # Never lazy-load items; callers choose selectinload or a projection explicitly
+    items = relationship("OrderItemRecord", back_populates="order", order_by="OrderItemRecord.id", lazy="raise")
+
+class OrderItemRecord(Base):
+    __tablename__ = "order_items"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    product_name = Column(String, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    unit_price = Column(Numeric(12, 2, asdecimal=False), nullable=False)
+    total_price = Column(Numeric(14, 2, asdecimal=False), nullable=False)
+    points_earned = Column(Integer, default=0)
 
-    class Config:
-        allow_population_by_field_name = True
-        json_encoders = {ObjectId: str} 
\ No newline at end of file
+    order = relationship("Order", back_populates="items")
@@ -1,9 +1,8 @@
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, Field
-from bson import ObjectId
-from app.models.user import PyObjectId
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from app.models.user import PyObjectId, new_object_id
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, Boolean, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -23,23 +22,18 @@ class PointsTransactionCreate(PointsTransactionBase):
     pass
 
 class PointsTransactionInDB(PointsTransactionBase):
-    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
+    id: PyObjectId = Field(default_factory=new_object_id, alias="_id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
-    class Config:
-        allow_population_by_field_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
+    model_config = ConfigDict(populate_by_name=True)
 
 class PointsTransactionResponse(PointsTransactionBase):
     id: str = Field(alias="_id")
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        allow_population_by_field_name = True
-        json_encoders = {ObjectId: str}
+    model_config = ConfigDict(populate_by_name=True)
 
 class UserPointsSummary(BaseModel):
     user_id: str = Field(..., description="User ID")
@@ -51,10 +45,58 @@ class UserPointsSummary(BaseModel):
     last_updated: datetime = Field(default_factory=datetime.utcnow)
 
 class PointsSummaryResponse(UserPointsSummary):
-    pass 
+    pass
+
+class PointsRedemptionItem(BaseModel):
+    points: int = Field(..., gt=0, description="Points to spend on this item")
+    description: Optional[str] = Field(None, description="What the points are redeemed for")
+    reference_id: Optional[str] = Field(None, description="Reward or voucher ID")
+
+class PointsRedemptionRequest(BaseModel):
+    items: List[PointsRedemptionItem] = Field(..., min_length=1, max_length=50, description="Items to redeem")
+
+class PointsRuleBase(BaseModel):
+    name: str = Field(..., description="Rule name shown to marketing")
+    action: str = Field(..., pattern="^(scan|purchase)$", description="Action the rule applies to: scan, purchase")
+    category: Optional[str] = Field(None, description="Product category, any if empty")
+    retailer_id: Optional[str] = Field(None, description="Retailer ID, any if empty")
+    tier: Optional[str] = Field(None, description="User tier, any if empty")
+    starts_at: Optional[datetime] = Field(None, description="Campaign window start")
+    ends_at: Optional[datetime] = Field(None, description="Campaign window end")
+    multiplier: float = Field(default=1.0, ge=0, description="Multiplier applied to the base points")
+    bonus: int = Field(default=0, description="Flat points added after the multiplier")
+    is_active: bool = Field(default=True, description="Rule status")
+
+class PointsRuleCreate(PointsRuleBase):
+    pass
+
+class PointsRuleUpdate(BaseModel):
+    name: Optional[str] = None
+    category: Optional[str] = None
+    retailer_id: Optional[str] = None
+    tier: Optional[str] = None
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+    multiplier: Optional[float] = Field(None, ge=0)
+    bonus: Optional[int] = None
+    is_active: Optional[bool] = None
+
+class PointsRuleResponse(PointsRuleBase):
+    id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+# Validates and dumps a whole list in pydantic-core instead of one model per row
+points_rules_adapter = TypeAdapter(List[PointsRuleResponse])
 
 class Points(Base):
     __tablename__ = "points"
+    __table_args__ = (
+        # A user's transactions newest first, their count and per-type totals
+        Index("ix_points_user_id_created_at", "user_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -62,5 +104,23 @@ class Points(Base):
     amount = Column(Integer, nullable=False)
     source = Column(String)  # qr_scan, purchase, referral
     reference_id = Column(String)
+    retailer_id = Column(String, index=True)  # retailer the points were earned through
     description = Column(Text)
-    created_at = Column(DateTime(timezone=True), server_default=func.now()) 
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class PointsRule(Base):
+    __tablename__ = "points_rules"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    action = Column(String, nullable=False)  # scan, purchase
+    category = Column(String)
+    retailer_id = Column(String)
+    tier = Column(String)
+    starts_at = Column(DateTime(timezone=True))
+    ends_at = Column(DateTime(timezone=True))
+    multiplier = Column(Float, default=1.0)
+    bonus = Column(Integer, default=0)
+    is_active = Column(Boolean, default=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
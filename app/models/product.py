@@ -1,8 +1,11 @@
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, Field
-from bson import ObjectId
-from app.models.user import PyObjectId
+from pydantic import BaseModel, ConfigDict, Field
+from app.models.user import PyObjectId, new_object_id
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, Float, ForeignKey, Numeric, Text, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.core.database import Base
 
 class ProductBase(BaseModel):
     name: str = Field(..., description="Product name")
@@ -28,6 +31,9 @@ class ProductBase(BaseModel):
     points_reward: int = Field(default=0, description="Points earned on purchase")
     retailer_id: Optional[str] = Field(None, description="Associated retailer ID")
 
+    # model_number is a product field, not in pydantic's model_ namespace
+    model_config = ConfigDict(protected_namespaces=())
+
 class ProductCreate(ProductBase):
     pass
 
@@ -54,8 +60,10 @@ class ProductUpdate(BaseModel):
     warranty_period: Optional[int] = None
     points_reward: Optional[int] = None
 
+    model_config = ConfigDict(protected_namespaces=())
+
 class ProductInDB(ProductBase):
-    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
+    id: PyObjectId = Field(default_factory=new_object_id, alias="_id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     created_by: Optional[str] = Field(None, description="User ID who created the product")
@@ -64,10 +72,11 @@ class ProductInDB(ProductBase):
     average_rating: float = Field(default=0.0, description="Average product rating")
     review_count: int = Field(default=0, description="Number of reviews")
 
-    class Config:
-        allow_population_by_field_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
+    model_config = ConfigDict(populate_by_name=True)
+
+class ProductReviewCreate(BaseModel):
+    rating: int = Field(..., ge=1, le=5, description="Rating from 1 to 5")
+    comment: Optional[str] = Field(None, max_length=2000, description="Review text")
 
 class ProductResponse(ProductBase):
     id: str = Field(alias="_id")
@@ -78,6 +87,66 @@ class ProductResponse(ProductBase):
     average_rating: float
     review_count: int
 
-    class Config:
-        allow_population_by_field_name = True
-        json_encoders = {ObjectId: str} 
\ No newline at end of file
+    model_config = ConfigDict(populate_by_name=True)
+
+class Product(Base):
+    __tablename__ = "products"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    description = Column(Text)
+    category = Column(String, nullable=False, index=True)
+    subcategory = Column(String)
+    brand = Column(String, default="Trison")
+    model_number = Column(String)
+    sku = Column(String, unique=True, index=True, nullable=False)
+    price = Column(Numeric(12, 2, asdecimal=False), nullable=False)
+    original_price = Column(Numeric(12, 2, asdecimal=False))
+    currency = Column(String, default="PKR")
+    stock_quantity = Column(Integer, default=0)
+    min_stock_level = Column(Integer, default=5)
+    weight = Column(Float)
+    dimensions = Column(JSONB)
+    specifications = Column(JSONB)
+    features = Column(JSONB, default=list)
+    images = Column(JSONB, default=list)
+    is_active = Column(Boolean, default=True, index=True)
+    is_featured = Column(Boolean, default=False)
+    warranty_period = Column(Integer)
+    points_reward = Column(Integer, default=0)
+    retailer_id = Column(String, index=True)
+    created_by = Column(String)
+    total_sales = Column(Integer, default=0)
+    total_revenue = Column(Numeric(14, 2, asdecimal=False), default=0)
+    average_rating = Column(Float, default=0.0)
+    review_count = Column(Integer, default=0)
+    # Sum of all ratings, so average_rating can be kept exact incrementally
+    rating_total = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class ProductReview(Base):
+    __tablename__ = "product_reviews"
+    __table_args__ = (
+        UniqueConstraint("product_id", "user_id", name="uq_product_reviews_product_user"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    rating = Column(Integer, nullable=False)
+    comment = Column(Text)
+    verified_purchase = Column(Boolean, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class ProductDailyStats(Base):
+    """Per-product daily rollup of delivered sales and reviews."""
+    __tablename__ = "product_daily_stats"
+    
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    units_sold = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(14, 2, asdecimal=False), nullable=False, default=0)
+    orders = Column(Integer, nullable=False, default=0)
+    reviews = Column(Integer, nullable=False, default=0)
+    rating_total = Column(Integer, nullable=False, default=0)
@@ -1,9 +1,8 @@
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, Field
-from bson import ObjectId
-from app.models.user import PyObjectId
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from pydantic import BaseModel, ConfigDict, Field
+from app.models.user import PyObjectId, new_object_id
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -43,27 +42,22 @@ class QRCodeUpdate(BaseModel):
     tags: Optional[List[str]] = None
 
 class QRCodeInDB(QRCodeBase):
-    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
+    id: PyObjectId = Field(default_factory=new_object_id, alias="_id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     last_scanned_at: Optional[datetime] = Field(None, description="Last scan timestamp")
     total_points_awarded: int = Field(default=0, description="Total points awarded from this QR code")
 
-    class Config:
-        allow_population_by_field_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
+    model_config = ConfigDict(populate_by_name=True)
 
 class QRCodeResponse(QRCodeBase):
     id: str = Field(alias="_id")
     created_at: datetime
     updated_at: datetime
-    last_scanned_at: Optional[datetime]
+    last_scanned_at: Optional[datetime] = None
     total_points_awarded: int
 
-    class Config:
-        allow_population_by_field_name = True
-        json_encoders = {ObjectId: str}
+    model_config = ConfigDict(populate_by_name=True)
 
 class QRCodeScan(BaseModel):
     qr_code_id: str = Field(..., description="QR code ID")
@@ -75,24 +69,38 @@ class QRCodeScan(BaseModel):
     is_valid: bool = Field(default=True, description="Whether the scan was valid")
 
 class QRCodeScanInDB(QRCodeScan):
-    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
+    id: PyObjectId = Field(default_factory=new_object_id, alias="_id")
 
-    class Config:
-        allow_population_by_field_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str} 
+    model_config = ConfigDict(populate_by_name=True)
 
 class QRCode(Base):
     __tablename__ = "qr_codes"
     
     id = Column(Integer, primary_key=True, index=True)
     code = Column(String, unique=True, index=True, nullable=False)
-    product_id = Column(Integer, ForeignKey("products.id"))
+    product_id = Column(Integer, ForeignKey("products.id"), index=True)
     type = Column(String, default="product")
     points_value = Column(Integer, default=0)
     is_active = Column(Boolean, default=True)
     max_scans = Column(Integer, default=1)
     current_scans = Column(Integer, default=0)
+    description = Column(Text)
+    retailer_id = Column(String, index=True)
     valid_from = Column(DateTime(timezone=True), server_default=func.now())
     valid_until = Column(DateTime(timezone=True))
-    created_at = Column(DateTime(timezone=True), server_default=func.now()) 
\ No newline at end of file
+    last_scanned_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class QRScan(Base):
+    __tablename__ = "qr_scans"
+    __table_args__ = (
+        UniqueConstraint("qr_code_id", "user_id", name="uq_qr_scans_qr_code_user"),
+        # A user's scan history newest first, without sorting all their scans
+        Index("ix_qr_scans_user_id_scanned_at", "user_id", "scanned_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    qr_code_id = Column(Integer, ForeignKey("qr_codes.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    points_earned = Column(Integer, default=0)
+    scanned_at = Column(DateTime(timezone=True), server_default=func.now()) 
\ No newline at end of file
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, Numeric
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class RetailerDailyStats(Base):
+    """Per-retailer daily rollup, maintained by RetailerRollupService."""
+    __tablename__ = "retailer_daily_stats"
+    
+    # The primary key index serves the dashboard's (retailer_id, day) range scan
+    retailer_id = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    scans = Column(Integer, nullable=False, default=0)
+    points_awarded = Column(BigInteger, nullable=False, default=0)
+    orders = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(16, 2, asdecimal=False), nullable=False, default=0)
+
+class RollupWatermark(Base):
+    """Highest source row id already folded into a rollup."""
+    __tablename__ = "rollup_watermarks"
+    
+    name = Column(String, primary_key=True)
+    last_id = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
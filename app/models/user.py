@@ -1,10 +1,18 @@
-from pydantic import BaseModel, Field, EmailStr
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, EmailStr
+from typing import Annotated, Optional
 from datetime import datetime
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
 from sqlalchemy.sql import func
+from bson import ObjectId
 from app.core.database import Base
 
+# Id of the document-style schemas, kept as the ObjectId's hex string so that
+# validation and serialization need no custom types or encoders
+PyObjectId = Annotated[str, Field(pattern="^[0-9a-f]{24}$")]
+
+def new_object_id() -> str:
+    return str(ObjectId())
+
 # SQLAlchemy User Model for Database
 class User(Base):
     __tablename__ = "users"
@@ -46,16 +54,14 @@ class UserInDB(UserBase):
     last_login: Optional[datetime] = Field(None, description="Last login time")
     login_count: int = Field(default=0, description="Number of logins")
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class UserResponse(UserBase):
     id: int = Field(..., description="User ID")
     created_at: datetime = Field(..., description="Account creation time")
     last_login: Optional[datetime] = Field(None, description="Last login time")
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class UserUpdate(BaseModel):
     email: Optional[EmailStr] = None
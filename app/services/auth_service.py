@@ -9,21 +9,25 @@ from app.core.security import (
 from app.models.user import UserCreate, UserInDB, UserResponse
 from app.schemas.auth import TokenResponse, RegisterRequest
 from app.core.config import settings
+from app.core.redis import get_redis
+from app.core.read_replicas import replica_router, note_user_write
 import logging
-import redis
-try:
-    from twilio.rest import Client
-    from twilio.base.exceptions import TwilioException
-    TWILIO_AVAILABLE = True
-except ImportError:
-    TWILIO_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+def _load_twilio():
+    """Import Twilio on first use; workers that never send SMS skip its import cost."""
+    try:
+        from twilio.rest import Client
+        from twilio.base.exceptions import TwilioException
+        return Client, TwilioException
+    except ImportError:
+        return None
+
 class AuthService:
     def __init__(self, db: Session):
         self.db = db
-        self.redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        self.redis_client = get_redis()
     
     async def send_otp(self, phone_number: str) -> Dict[str, Any]:
         """Send OTP to phone number."""
@@ -36,7 +40,9 @@ class AuthService:
             self.redis_client.setex(otp_key, 300, otp)
             
             # Send OTP via Twilio SMS
-            if TWILIO_AVAILABLE and settings.TWILIO_ACCOUNT_SID and settings.TWILIO_AUTH_TOKEN:
+            twilio = _load_twilio() if settings.TWILIO_ACCOUNT_SID and settings.TWILIO_AUTH_TOKEN else None
+            if twilio:
+                Client, TwilioException = twilio
                 try:
                     client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
                     message = client.messages.create(
@@ -93,6 +99,7 @@ class AuthService:
                 user.last_login = datetime.utcnow()
                 user.login_count = user.login_count + 1 if user.login_count else 1
                 user.updated_at = datetime.utcnow()
+                note_user_write(self.db, user.id)
                 self.db.commit()
             
             # Generate tokens
@@ -239,7 +246,7 @@ class AuthService:
         try:
             from app.models.user import User
             
-            user_dict = user_data.dict()
+            user_dict = user_data.model_dump()
             user_dict["created_at"] = datetime.utcnow()
             user_dict["updated_at"] = datetime.utcnow()
             user_dict["last_login"] = datetime.utcnow()
@@ -256,6 +263,8 @@ class AuthService:
             self.db.add(user)
             self.db.commit()
             self.db.refresh(user)
+            # The new user's first requests must not miss them on a lagging replica
+            replica_router.note_writes({user.id})
             
             return user
         except Exception as e:
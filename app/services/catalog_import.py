@@ -0,0 +1,300 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TextIO
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.exc import DataError, IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.models.product import ProductCreate
+from app.models.qr_code import QRCodeCreate
+from app.services.catalog_service import notify_catalog_changed
+import csv
+import io
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Per-row errors kept in the report; the counts always cover every row
+MAX_REPORTED_ERRORS = 1000
+
+PRODUCT_COLUMNS = (
+    "name", "description", "category", "subcategory", "brand", "model_number", "sku", "price",
+    "original_price", "currency", "stock_quantity", "min_stock_level", "weight", "dimensions",
+    "specifications", "features", "images", "is_active", "is_featured", "warranty_period",
+    "points_reward", "retailer_id"
+)
+QR_CODE_COLUMNS = (
+    "code", "product_sku", "type", "points_value", "is_active", "max_scans",
+    "valid_from", "valid_until", "description", "retailer_id"
+)
+# CSV cells holding a JSON object, and list cells that may also be written as a|b|c
+JSON_FIELDS = {"dimensions", "specifications"}
+LIST_FIELDS = {"features", "images"}
+
+PRODUCT_STAGING_SQL = """
+    CREATE TEMP TABLE product_import_staging (
+        row_number integer, name text, description text, category text, subcategory text,
+        brand text, model_number text, sku text, price numeric, original_price numeric,
+        currency text, stock_quantity integer, min_stock_level integer, weight double precision,
+        dimensions jsonb, specifications jsonb, features jsonb, images jsonb, is_active boolean,
+        is_featured boolean, warranty_period integer, points_reward integer, retailer_id text
+    ) ON COMMIT DROP
+"""
+
+def product_merge_sql(present: Iterable[str]) -> str:
+    """Upsert from the staging table. New products get every column, with the
+    schema defaults for those the CSV lacks; existing products only have the
+    CSV's columns updated. The last row wins when a batch repeats a SKU;
+    sales and rating counters are kept."""
+    updated = [column for column in PRODUCT_COLUMNS if column in present and column != "sku"]
+    return f"""
+        INSERT INTO products ({", ".join(PRODUCT_COLUMNS)}, created_by, total_sales, total_revenue,
+                              average_rating, review_count, rating_total, created_at)
+        SELECT {", ".join(PRODUCT_COLUMNS)}, :created_by, 0, 0, 0, 0, 0, now()
+        FROM (
+            SELECT DISTINCT ON (sku) * FROM product_import_staging ORDER BY sku, row_number DESC
+        ) latest
+        ON CONFLICT (sku) DO UPDATE
+        SET {"".join(f"{column} = EXCLUDED.{column}, " for column in updated)}updated_at = now()
+        RETURNING (xmax = 0) AS inserted
+    """
+
+QR_CODE_STAGING_SQL = """
+    CREATE TEMP TABLE qr_code_import_staging (
+        row_number integer, code text, product_sku text, type text, points_value integer,
+        is_active boolean, max_scans integer, valid_from timestamptz, valid_until timestamptz,
+        description text, retailer_id text
+    ) ON COMMIT DROP
+"""
+
+QR_CODE_UNKNOWN_SKUS_SQL = """
+    DELETE FROM qr_code_import_staging s
+    WHERE s.product_sku IS NOT NULL
+      AND NOT EXISTS (SELECT 1 FROM products p WHERE p.sku = s.product_sku)
+    RETURNING s.row_number, s.code, s.product_sku
+"""
+
+def qr_code_merge_sql(present: Iterable[str]) -> str:
+    """Upsert from the staging table; existing QR codes only have the CSV's
+    columns updated, product_sku setting product_id."""
+    updated = [
+        "product_id" if column == "product_sku" else column
+        for column in QR_CODE_COLUMNS if column in present and column != "code"
+    ]
+    # A CSV of codes alone still reports existing codes as updated
+    assignments = ", ".join(f"{column} = EXCLUDED.{column}" for column in updated) or "code = EXCLUDED.code"
+    return f"""
+        INSERT INTO qr_codes (code, product_id, type, points_value, is_active, max_scans, current_scans,
+                              valid_from, valid_until, description, retailer_id, created_at)
+        SELECT s.code, p.id, s.type, s.points_value, s.is_active, COALESCE(s.max_scans, 1), 0,
+               COALESCE(s.valid_from, now()), s.valid_until, s.description, s.retailer_id, now()
+        FROM (
+            SELECT DISTINCT ON (code) * FROM qr_code_import_staging ORDER BY code, row_number DESC
+        ) s
+        LEFT JOIN products p ON p.sku = s.product_sku
+        ON CONFLICT (code) DO UPDATE
+        SET {assignments}
+        RETURNING (xmax = 0) AS inserted
+    """
+
+def _parse_cell(field: str, value: str) -> Any:
+    if field in JSON_FIELDS:
+        return json.loads(value)
+    if field in LIST_FIELDS:
+        if value.lstrip().startswith("["):
+            return json.loads(value)
+        return [item.strip() for item in value.split("|") if item.strip()]
+    return value
+
+def _copy_cell(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+class CatalogImportService:
+    """Bulk CSV import of products and QR codes.
+
+    The CSV is read as a stream and handled in batches. Each batch is
+    validated row by row against the API schema, COPYed into a temporary
+    staging table and merged with one INSERT ... ON CONFLICT, all in its own
+    transaction: memory stays bounded and a failing batch does not undo the
+    ones before it. Invalid rows, and rows the database rejects (found by
+    retrying a failed batch row by row), are reported with their line number
+    and skipped. Any other database error stops the import; the report then
+    says where, and covers the batches already committed. Products are matched on ``sku`` and QR codes on ``code``; an
+    existing row is updated with the imported values of the columns the CSV
+    has; the others keep their current values. When a SKU or code
+    repeats within a batch the last row wins. QR codes name their product
+    by ``product_sku``; a blank ``max_scans`` means 1, the table default.
+    """
+
+    def __init__(self, db: Session, batch_size: int = 2000):
+        self.db = db
+        self.batch_size = batch_size
+
+    def import_products(self, stream: TextIO, created_by: Optional[str] = None) -> Dict[str, Any]:
+        report = self._run(stream, ProductCreate, PRODUCT_COLUMNS, "sku", lambda batch, present: self._merge(
+            batch, "sku", PRODUCT_STAGING_SQL, "product_import_staging", PRODUCT_COLUMNS, product_merge_sql(present),
+            {"created_by": created_by}
+        ))
+        if report["inserted"] or report["updated"]:
+            try:
+                notify_catalog_changed()
+            except Exception as e:
+                logger.error(f"Error notifying catalog change: {e}")
+        return report
+
+    def import_qr_codes(self, stream: TextIO) -> Dict[str, Any]:
+        return self._run(stream, QRCodeCreate, QR_CODE_COLUMNS, "code", lambda batch, present: self._merge(
+            batch, "code", QR_CODE_STAGING_SQL, "qr_code_import_staging", QR_CODE_COLUMNS, qr_code_merge_sql(present), {},
+            reject_sql=QR_CODE_UNKNOWN_SKUS_SQL
+        ))
+
+    def _run(self, stream: TextIO, schema, columns: Tuple[str, ...], key: str, merge) -> Dict[str, Any]:
+        started = time.perf_counter()
+        report = {"rows": 0, "valid": 0, "inserted": 0, "updated": 0, "failed": 0, "errors": [], "aborted": None}
+
+        reader = csv.DictReader(stream)
+        missing = [
+            column for column in columns
+            if column in schema.model_fields and schema.model_fields[column].is_required()
+            and column not in (reader.fieldnames or ())
+        ]
+        if missing:
+            raise ValueError(f"CSV is missing required columns: {', '.join(missing)}")
+        present = set(reader.fieldnames or ()) & set(columns)
+
+        for batch, errors in self._batches(reader, schema, columns, key):
+            report["rows"] += len(batch) + len(errors)
+            if batch:
+                try:
+                    inserted, updated, rejected = merge(batch, present)
+                except SQLAlchemyError as e:
+                    # Earlier batches are committed; report them and where the import stopped
+                    logger.error(f"Catalog import aborted at line {batch[0][0]}: {e}")
+                    report["aborted"] = f"Database error, rows from line {batch[0][0]} on may not have been imported"
+                    break
+                report["valid"] += len(batch) - len(rejected)
+                report["inserted"] += inserted
+                report["updated"] += updated
+                errors.extend(rejected)
+            report["failed"] += len(errors)
+            room = MAX_REPORTED_ERRORS - len(report["errors"])
+            report["errors"].extend(errors[:max(room, 0)])
+
+        elapsed = time.perf_counter() - started
+        report["errors_truncated"] = report["failed"] > len(report["errors"])
+        report["elapsed_seconds"] = round(elapsed, 2)
+        report["rows_per_second"] = round(report["rows"] / elapsed) if elapsed > 0 else report["rows"]
+        return report
+
+    def _batches(
+        self, reader: csv.DictReader, schema, columns: Tuple[str, ...], key: str
+    ) -> Iterator[Tuple[List[Tuple[int, Dict[str, Any]]], List[Dict[str, Any]]]]:
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        errors: List[Dict[str, Any]] = []
+        for raw in reader:
+            line = reader.line_num
+            values = {
+                field: value.strip() for field, value in raw.items()
+                if field in columns and value is not None and value.strip() != ""
+            }
+            try:
+                parsed = {field: _parse_cell(field, value) for field, value in values.items()}
+                # Columns the schema does not know, such as a QR code's product_sku
+                extra = {
+                    field: parsed.pop(field) for field in columns
+                    if field not in schema.model_fields and field in parsed
+                }
+                row = {**schema.model_validate(parsed).model_dump(include=set(columns)), **extra}
+                batch.append((line, row))
+            except ValidationError as e:
+                errors.append({
+                    "line": line,
+                    key: values.get(key),
+                    "errors": [
+                        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+                    ]
+                })
+            except ValueError as e:
+                errors.append({"line": line, key: values.get(key), "errors": [f"Invalid JSON: {e}"]})
+
+            if len(batch) + len(errors) >= self.batch_size:
+                yield batch, errors
+                batch, errors = [], []
+        if batch or errors:
+            yield batch, errors
+
+    def _merge(
+        self,
+        batch: List[Tuple[int, Dict[str, Any]]],
+        key: str,
+        staging_sql: str,
+        staging_table: str,
+        columns: Tuple[str, ...],
+        merge_sql: str,
+        params: Dict[str, Any],
+        reject_sql: Optional[str] = None
+    ) -> Tuple[int, int, List[Dict[str, Any]]]:
+        args = (staging_sql, staging_table, columns, merge_sql, params, reject_sql)
+        try:
+            return self._merge_batch(batch, *args)
+        except (DataError, IntegrityError) as e:
+            # Some row the schema accepted the database does not, e.g. a price
+            # overflowing numeric(12,2): find it by merging the batch row by row
+            logger.warning(f"Import batch into {staging_table} rejected, retrying row by row: {e.orig}")
+
+        inserted, updated, rejected = 0, 0, []
+        for line, row in batch:
+            try:
+                row_inserted, row_updated, row_rejected = self._merge_batch([(line, row)], *args)
+            except (DataError, IntegrityError) as e:
+                rejected.append({"line": line, key: row.get(key), "errors": [str(e.orig).splitlines()[0]]})
+                continue
+            inserted += row_inserted
+            updated += row_updated
+            rejected.extend(row_rejected)
+        return inserted, updated, rejected
+
+    def _merge_batch(
+        self,
+        batch: List[Tuple[int, Dict[str, Any]]],
+        staging_sql: str,
+        staging_table: str,
+        columns: Tuple[str, ...],
+        merge_sql: str,
+        params: Dict[str, Any],
+        reject_sql: Optional[str]
+    ) -> Tuple[int, int, List[Dict[str, Any]]]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for line, row in batch:
+            writer.writerow([line, *(_copy_cell(row.get(column)) for column in columns)])
+        buffer.seek(0)
+
+        rejected = []
+        try:
+            self.db.execute(text(staging_sql))
+            cursor = self.db.connection().connection.cursor()
+            try:
+                cursor.copy_expert(
+                    f"COPY {staging_table} (row_number, {', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                    buffer
+                )
+            finally:
+                cursor.close()
+            if reject_sql:
+                for row in self.db.execute(text(reject_sql)):
+                    rejected.append({
+                        "line": row.row_number,
+                        "code": row.code,
+                        "errors": [f"product_sku: no product with SKU {row.product_sku}"]
+                    })
+            results = self.db.execute(text(merge_sql), params).scalars().all()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        inserted = sum(1 for was_inserted in results if was_inserted)
+        return inserted, len(results) - inserted, rejected
@@ -0,0 +1,153 @@
+from typing import Optional, Dict, Any, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.change_notifications import ChangeWatcher, notify_change
+from app.core.compression import precompress
+from app.models.product import Product
+from app.services.product_search import ProductSearchIndex
+import hashlib
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION_KEY = "catalog:version"
+# Bumped by reviews; checked far less often, so reviews do not rebuild the catalog each time
+CATALOG_RATINGS_VERSION_KEY = "catalog:ratings_version"
+
+# Fields published in the catalog. Live counters such as stock_quantity are
+# left out so that every order does not invalidate the snapshot; the rating
+# counters are refreshed in batches (notify_ratings_changed).
+CATALOG_FIELDS = (
+    "id", "name", "description", "category", "subcategory", "brand", "model_number",
+    "sku", "price", "original_price", "currency", "weight", "dimensions",
+    "specifications", "features", "images", "is_featured", "warranty_period",
+    "points_reward", "retailer_id", "average_rating", "review_count"
+)
+
+def _encode(payload: Dict[str, Any]) -> Tuple[bytes, str]:
+    body = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    return body, f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+class CatalogSnapshot:
+    """Immutable, pre-serialized view of the active catalog.
+
+    The list body, every product body and their strong ETags are computed
+    once when the snapshot is built, together with their gzip and brotli
+    encodings and the search index; requests only pick bytes out of it.
+    """
+
+    __slots__ = (
+        "version", "products", "by_id", "body", "etag", "encoded", "product_bodies", "search_index", "built_at"
+    )
+
+    def __init__(self, products: Tuple[Dict[str, Any], ...], version: Optional[str] = None):
+        self.version = version
+        self.products = products
+        self.by_id = {product["id"]: product for product in products}
+        self.body, self.etag = _encode({"success": True, "products": list(products)})
+        self.encoded = precompress(self.body)
+        self.product_bodies = {}
+        for product in products:
+            body, etag = _encode({"success": True, "product": product})
+            self.product_bodies[product["id"]] = (body, etag, precompress(body))
+        self.search_index = ProductSearchIndex(products)
+        self.built_at = time.time()
+
+    @classmethod
+    def from_db(cls, db: Session, version: Optional[str] = None) -> "CatalogSnapshot":
+        rows = (
+            db.query(Product)
+            .filter(Product.is_active == True)
+            .order_by(Product.is_featured.desc(), Product.name, Product.id)
+            .all()
+        )
+        products = tuple(
+            {**{field: getattr(row, field) for field in CATALOG_FIELDS}, "in_stock": (row.stock_quantity or 0) > 0}
+            for row in rows
+        )
+        return cls(products, version)
+
+class CatalogCache:
+    """Per-worker catalog snapshot, rebuilt when the catalog version changes.
+
+    Only a worker's first snapshot is built on the caller's session (or by
+    ``warm`` at startup). After that a background thread checks the version
+    and builds replacements, swapping each in when it is complete, so
+    requests never wait for a rebuild and keep getting the previous snapshot
+    meanwhile. Rating changes are batched: they trigger a rebuild at most
+    once per CATALOG_RATINGS_RELOAD_SECONDS.
+    """
+
+    def __init__(self, reload_interval: Optional[float] = None):
+        self.watcher = ChangeWatcher(
+            CATALOG_VERSION_KEY,
+            settings.CATALOG_RELOAD_SECONDS if reload_interval is None else reload_interval
+        )
+        self.ratings_watcher = ChangeWatcher(CATALOG_RATINGS_VERSION_KEY, settings.CATALOG_RATINGS_RELOAD_SECONDS)
+        self.snapshot = CatalogSnapshot(())
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def current(self, db: Session) -> CatalogSnapshot:
+        if self._thread is None:
+            self.watcher.refresh(lambda version: self._rebuild(db, version))
+            # The first snapshot already has the current ratings
+            self.ratings_watcher.refresh(lambda version: None)
+            self._ensure_started()
+        return self.snapshot
+
+    def warm(self) -> None:
+        """Build the first snapshot before the worker serves, for the lifespan startup."""
+        db = SessionLocal()
+        try:
+            self.current(db)
+        except Exception as e:
+            logger.error(f"Error building catalog snapshot, first request will retry: {e}")
+        finally:
+            db.close()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _rebuild(self, db: Session, version: Optional[str]) -> None:
+        started = time.perf_counter()
+        snapshot = CatalogSnapshot.from_db(db, version)
+        self.snapshot = snapshot
+        logger.info(
+            f"Catalog snapshot built: {len(snapshot.products)} products (version {version}) "
+            f"in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="catalog-refresher", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.watcher.interval):
+            db = SessionLocal()
+            try:
+                if not self.watcher.refresh(lambda version: self._rebuild(db, version)):
+                    self.ratings_watcher.refresh(lambda version: self._rebuild(db, self.watcher.version))
+            except Exception as e:
+                logger.error(f"Error refreshing catalog snapshot: {e}")
+            finally:
+                db.close()
+
+def notify_catalog_changed() -> None:
+    """Tell every worker to rebuild its catalog snapshot on its next check."""
+    notify_change(CATALOG_VERSION_KEY)
+
+def notify_ratings_changed() -> None:
+    """Tell every worker to pick up new ratings within CATALOG_RATINGS_RELOAD_SECONDS."""
+    notify_change(CATALOG_RATINGS_VERSION_KEY)
+
+catalog_cache = CatalogCache()
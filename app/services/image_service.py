@@ -0,0 +1,238 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterable, Dict, Optional
+from app.core.config import settings
+from app.core.metrics import metrics
+import anyio
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Accepted upload types and the extension the original is stored under
+IMAGE_TYPES = {"image/jpeg": "jpg", "image/png": "png", "image/webp": "webp"}
+IMAGE_SIGNATURES = {
+    "jpg": (b"\xff\xd8\xff",),
+    "png": (b"\x89PNG\r\n\x1a\n",),
+    "webp": (b"RIFF",),
+}
+
+# Variants generated for every image: name -> longest side in pixels (None keeps the size)
+IMAGE_VARIANTS = {"thumb": 256, "medium": 1024, "full": None}
+WEBP_QUALITY = 80
+
+class UploadTooLargeError(ValueError):
+    """The upload exceeded MAX_FILE_SIZE."""
+
+class UnsupportedImageError(ValueError):
+    """The upload is not one of the accepted image types."""
+
+class ImageQueueFullError(Exception):
+    """Too many images are waiting for variants on this worker."""
+
+def image_dir(digest: str) -> str:
+    return os.path.join(settings.UPLOAD_DIR, "images", digest[:2], digest)
+
+def image_urls(digest: str, extension: str) -> Dict[str, Any]:
+    base = f"/uploads/images/{digest[:2]}/{digest}"
+    return {
+        "original": f"{base}/original.{extension}",
+        "variants": {name: f"{base}/{name}.webp" for name in IMAGE_VARIANTS}
+    }
+
+def generate_variants(source: str, directory: str) -> Dict[str, str]:
+    """Write the WebP variants of ``source``; runs in a worker process."""
+    from PIL import Image, ImageOps
+
+    # Opening reads only the header, so oversized images are refused before decoding
+    Image.MAX_IMAGE_PIXELS = settings.IMAGE_MAX_PIXELS
+    written = {}
+    with Image.open(source) as image:
+        if image.width * image.height > settings.IMAGE_MAX_PIXELS:
+            raise UnsupportedImageError(f"Image has more than {settings.IMAGE_MAX_PIXELS} pixels")
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        for name, size in IMAGE_VARIANTS.items():
+            variant = image.copy()
+            if size:
+                variant.thumbnail((size, size), Image.LANCZOS)
+            path = os.path.join(directory, f"{name}.webp")
+            # Write then rename, so readers never see a partial file
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            variant.save(temp_path, "WEBP", quality=WEBP_QUALITY, method=4)
+            os.replace(temp_path, path)
+            written[name] = path
+    return written
+
+class ImageService:
+    """Streaming image uploads with variants built off the request path.
+
+    Uploads are written to disk chunk by chunk while being hashed, so memory
+    use does not depend on the file size, and the size limit is enforced as
+    bytes arrive. Files are stored by content hash: uploading the same image
+    again costs no processing. Variants are generated in a process pool; at
+    most ``max_pending`` images wait for it per worker, beyond that uploads
+    are refused up front.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None):
+        self.workers = workers or settings.IMAGE_WORKERS
+        self.max_pending = max_pending or settings.IMAGE_QUEUE_LIMIT
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._pending_gauge = metrics.gauge("image_jobs_pending")
+
+    def check_capacity(self) -> None:
+        if self._pending >= self.max_pending:
+            metrics.counter("image_uploads_rejected", {"reason": "queue_full"}).inc()
+            raise ImageQueueFullError("Image processing queue is full")
+
+    async def store_upload(self, chunks: AsyncIterable[bytes], content_type: Optional[str]) -> Dict[str, Any]:
+        """Stream an upload to disk, dedupe it by hash and queue its variants."""
+        extension = IMAGE_TYPES.get((content_type or "").split(";")[0].strip().lower())
+        if extension is None:
+            raise UnsupportedImageError(f"Unsupported image type, expected one of: {', '.join(IMAGE_TYPES)}")
+        self.check_capacity()
+
+        started = time.perf_counter()
+        incoming = os.path.join(settings.UPLOAD_DIR, "incoming")
+        os.makedirs(incoming, exist_ok=True)
+        temp_path = os.path.join(incoming, uuid.uuid4().hex)
+        digest = hashlib.sha256()
+        size = 0
+        head = b""
+        try:
+            async with await anyio.open_file(temp_path, "wb") as file:
+                async for chunk in chunks:
+                    if not chunk:
+                        continue
+                    size += len(chunk)
+                    if size > settings.MAX_FILE_SIZE:
+                        metrics.counter("image_uploads_rejected", {"reason": "too_large"}).inc()
+                        raise UploadTooLargeError(f"File exceeds {settings.MAX_FILE_SIZE} bytes")
+                    if len(head) < 16:
+                        head += chunk[:16]
+                    digest.update(chunk)
+                    await file.write(chunk)
+            if not head.startswith(IMAGE_SIGNATURES[extension]):
+                metrics.counter("image_uploads_rejected", {"reason": "unsupported"}).inc()
+                raise UnsupportedImageError("File content does not match its image type")
+
+            sha256 = digest.hexdigest()
+            directory = image_dir(sha256)
+            original = os.path.join(directory, f"original.{extension}")
+            os.makedirs(directory, exist_ok=True)
+            try:
+                # Atomic and fails if the file exists, so concurrent duplicates process once
+                os.link(temp_path, original)
+                duplicate = False
+            except FileExistsError:
+                duplicate = True
+        finally:
+            try:
+                os.unlink(temp_path)
+            except FileNotFoundError:
+                pass
+
+        metrics.counter("image_uploads").inc()
+        metrics.counter("image_upload_bytes").inc(size)
+        metrics.histogram("image_upload_seconds").observe(time.perf_counter() - started)
+        if duplicate:
+            metrics.counter("image_uploads_deduplicated").inc()
+        else:
+            self._submit(original, directory)
+
+        return {
+            "sha256": sha256,
+            "size": size,
+            "content_type": content_type,
+            "duplicate": duplicate,
+            **image_urls(sha256, extension),
+            "variants_ready": self.variants_ready(sha256)
+        }
+
+    def variants_ready(self, sha256: str) -> bool:
+        directory = image_dir(sha256)
+        return all(os.path.exists(os.path.join(directory, f"{name}.webp")) for name in IMAGE_VARIANTS)
+
+    def _submit(self, source: str, directory: str) -> None:
+        with self._lock:
+            self._pending += 1
+            self._pending_gauge.set(self._pending)
+        submitted = time.perf_counter()
+        # A pool whose process died stays broken; retry once on a new one
+        for attempt in range(2):
+            pool = self._get_pool()
+            try:
+                future = pool.submit(generate_variants, source, directory)
+                break
+            except BrokenProcessPool:
+                self._discard_pool(pool)
+        else:
+            self._job_done()
+            metrics.counter("image_jobs_failed").inc()
+            # Not processed: drop it so that uploading it again is not deduplicated
+            try:
+                os.unlink(source)
+            except OSError:
+                pass
+            raise ImageQueueFullError("Image processing is unavailable")
+        future.add_done_callback(lambda done: self._finished(done, pool, source, submitted))
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # Forking a worker that runs the refresher and Redis threads could copy a
+                # lock another thread holds; workers start from a clean forkserver instead
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("forkserver")
+                )
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        """Drop a broken pool, unless another caller already replaced it."""
+        with self._lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+        metrics.counter("image_pools_broken").inc()
+        logger.warning("Image worker process died, starting a new pool")
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _job_done(self) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._pending_gauge.set(self._pending)
+
+    def _finished(self, future: Future, pool: ProcessPoolExecutor, source: str, submitted: float) -> None:
+        self._job_done()
+        if future.cancelled():
+            return
+        metrics.histogram("image_job_seconds").observe(time.perf_counter() - submitted)
+        error = future.exception()
+        if isinstance(error, BrokenProcessPool):
+            self._discard_pool(pool)
+        if error is not None:
+            metrics.counter("image_jobs_failed").inc()
+            logger.error(f"Error generating variants for {source}: {error}")
+            # Unreadable image: drop it so that uploading it again is retried instead of deduplicated
+            try:
+                os.unlink(source)
+            except OSError:
+                pass
+        else:
+            metrics.counter("image_jobs_completed").inc()
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+image_service = ImageService()
@@ -0,0 +1,251 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from app.core.redis import get_redis
+from app.models.points import Points
+from app.models.user import User
+import logging
+
+logger = logging.getLogger(__name__)
+
+BOARDS = ("global", "weekly", "monthly")
+
+# Period boards are kept for a while after they close so "last week" stays queryable
+PERIOD_TTL = {
+    "weekly": timedelta(weeks=5),
+    "monthly": timedelta(days=400),
+}
+
+REBUILD_BATCH_SIZE = 1000
+
+# While a rebuild has snapshotted a board (or, for retailer boards, the whole
+# family) but not yet swapped it in, changes to it are also kept in a delta
+# that the swap replays, so they are not overwritten by the older snapshot.
+REBUILDING_KEY = "leaderboard:rebuilding"
+REBUILT_KEY = "leaderboard:rebuilt"
+DELTA_PREFIX = "leaderboard:rebuild-delta:"
+# Bounds how long a rebuild that died keeps changes recorded twice
+REBUILD_STATE_TTL = timedelta(hours=1)
+
+# KEYS: REBUILDING_KEY, REBUILT_KEY, then a (board, delta) pair per board.
+# ARGV: amount, member, delta TTL, then a (TTL or 0, family) pair per board.
+# Adds the amount to every board, and to the delta of boards whose family is
+# being rebuilt and which have not been swapped in yet.
+RECORD_POINTS_LUA = """
+for i = 3, #KEYS, 2 do
+    local board = (i - 1) / 2
+    local ttl = tonumber(ARGV[2 + 2 * board])
+    redis.call('ZINCRBY', KEYS[i], ARGV[1], ARGV[2])
+    if ttl > 0 then
+        redis.call('EXPIRE', KEYS[i], ttl)
+    end
+    if redis.call('SISMEMBER', KEYS[1], ARGV[3 + 2 * board]) == 1
+            and redis.call('SISMEMBER', KEYS[2], KEYS[i]) == 0 then
+        redis.call('ZINCRBY', KEYS[i + 1], ARGV[1], ARGV[2])
+        redis.call('EXPIRE', KEYS[i + 1], ARGV[3])
+    end
+end
+return 1
+"""
+
+class LeaderboardService:
+    """Points leaderboards stored as Redis sorted sets.
+
+    The global board mirrors ``User.total_points``. Retailer and period boards
+    only count earned points, so spending never moves a user down them.
+    """
+
+    def __init__(self, redis_client=None):
+        self.redis = redis_client or get_redis()
+        self._record = self.redis.register_script(RECORD_POINTS_LUA)
+
+    @staticmethod
+    def period_suffix(board: str, at: Optional[datetime] = None) -> str:
+        at = at or datetime.now(timezone.utc)
+        if board == "weekly":
+            year, week, _ = at.isocalendar()
+            return f"{year}-W{week:02d}"
+        if board == "monthly":
+            return f"{at.year}-{at.month:02d}"
+        raise ValueError(f"Unknown period board: {board}")
+
+    @staticmethod
+    def period_start(board: str, at: Optional[datetime] = None) -> datetime:
+        at = at or datetime.now(timezone.utc)
+        day = at.replace(hour=0, minute=0, second=0, microsecond=0)
+        if board == "weekly":
+            return day - timedelta(days=day.weekday())
+        if board == "monthly":
+            return day.replace(day=1)
+        raise ValueError(f"Unknown period board: {board}")
+
+    def board_key(self, board: str = "global", retailer_id: Optional[str] = None,
+                  at: Optional[datetime] = None) -> str:
+        if board not in BOARDS:
+            raise ValueError(f"Unknown leaderboard: {board}")
+        if board == "global":
+            if retailer_id:
+                return f"leaderboard:retailer:{retailer_id}"
+            return "leaderboard:global"
+        if retailer_id:
+            raise ValueError("Retailer leaderboards are only available for all-time points")
+        return f"leaderboard:{board}:{self.period_suffix(board, at)}"
+
+    def record_points(self, user_id: int, amount: int, earned: bool = True,
+                      retailer_id: Optional[str] = None, at: Optional[datetime] = None) -> None:
+        """Apply one ledger change to every board it affects in a single round trip."""
+        if not amount:
+            return
+        global_key = self.board_key("global")
+        # (board, TTL in seconds or 0, the family a rebuild snapshots it with)
+        boards = [(global_key, 0, global_key)]
+        if earned and amount > 0:
+            if retailer_id:
+                boards.append((self.board_key("global", retailer_id), 0, self.board_key("global", "*")))
+            for board, ttl in PERIOD_TTL.items():
+                key = self.board_key(board, at=at)
+                boards.append((key, int(ttl.total_seconds()), key))
+        keys = [REBUILDING_KEY, REBUILT_KEY]
+        args = [amount, str(user_id), int(REBUILD_STATE_TTL.total_seconds())]
+        for key, ttl, family in boards:
+            keys.extend((key, f"{DELTA_PREFIX}{key}"))
+            args.extend((ttl, family))
+        self._record(keys=keys, args=args)
+
+    def top(self, board: str = "global", retailer_id: Optional[str] = None,
+            limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        key = self.board_key(board, retailer_id)
+        rows = self.redis.zrevrange(key, offset, offset + limit - 1, withscores=True)
+        return self._entries(rows, offset)
+
+    def rank(self, user_id: int, board: str = "global",
+             retailer_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Rank and score of one user, 1-based; ``None`` if the user is not on the board."""
+        key = self.board_key(board, retailer_id)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.zrevrank(key, str(user_id))
+        pipe.zscore(key, str(user_id))
+        position, score = pipe.execute()
+        if position is None:
+            return None
+        return {"user_id": int(user_id), "rank": position + 1, "points": int(score)}
+
+    def around(self, user_id: int, board: str = "global", retailer_id: Optional[str] = None,
+               radius: int = 5) -> List[Dict[str, Any]]:
+        """The users ranked directly above and below ``user_id``, including the user."""
+        key = self.board_key(board, retailer_id)
+        position = self.redis.zrevrank(key, str(user_id))
+        if position is None:
+            return []
+        start = max(position - radius, 0)
+        rows = self.redis.zrevrange(key, start, position + radius, withscores=True)
+        return self._entries(rows, start)
+
+    def size(self, board: str = "global", retailer_id: Optional[str] = None) -> int:
+        return self.redis.zcard(self.board_key(board, retailer_id))
+
+    def rebuild(self, db: Session) -> Dict[str, int]:
+        """Recompute every live board from PostgreSQL and swap them in atomically.
+
+        Changes recorded between a board's snapshot and its swap are replayed
+        onto the new board. A change committed just before a snapshot but
+        recorded just after it counts twice until the next rebuild.
+        """
+        self.redis.delete(REBUILDING_KEY, REBUILT_KEY)
+        try:
+            return self._rebuild(db)
+        finally:
+            # Stop recording deltas before dropping those of boards created
+            # after their snapshot, which already hold every change
+            self.redis.delete(REBUILDING_KEY, REBUILT_KEY)
+            for delta in self.redis.scan_iter(match=f"{DELTA_PREFIX}*"):
+                self.redis.delete(delta)
+
+    def _rebuild(self, db: Session) -> Dict[str, int]:
+        counts = {}
+
+        self._snapshotting(self.board_key("global"))
+        global_rows = db.execute(
+            select(User.id, User.total_points)
+            .where(User.total_points > 0)
+            .execution_options(yield_per=REBUILD_BATCH_SIZE)
+        )
+        counts["global"] = self._replace(self.board_key("global"), global_rows)
+
+        self._snapshotting(self.board_key("global", "*"))
+        retailer_rows = db.execute(
+            select(Points.retailer_id, Points.user_id, func.sum(Points.amount))
+            .where(Points.type == "earn", Points.retailer_id.isnot(None))
+            .group_by(Points.retailer_id, Points.user_id)
+            .order_by(Points.retailer_id)
+        )
+        by_retailer: Dict[str, List[Tuple[int, int]]] = {}
+        for retailer_id, user_id, total in retailer_rows:
+            by_retailer.setdefault(retailer_id, []).append((user_id, total))
+        prefix = self.board_key("global", "*")[:-1]
+        counts["retailers"] = len(by_retailer)
+        # Boards with no earned points left are replaced by their delta, if any
+        for existing in self.redis.scan_iter(match=f"{prefix}*"):
+            by_retailer.setdefault(existing[len(prefix):], [])
+        for retailer_id, rows in by_retailer.items():
+            self._replace(self.board_key("global", retailer_id), rows)
+
+        for board, ttl in PERIOD_TTL.items():
+            key = self.board_key(board)
+            self._snapshotting(key)
+            period_rows = db.execute(
+                select(Points.user_id, func.sum(Points.amount))
+                .where(Points.type == "earn", Points.created_at >= self.period_start(board))
+                .group_by(Points.user_id)
+            )
+            counts[board] = self._replace(key, period_rows)
+            self.redis.expire(key, ttl)
+
+        logger.info(f"Leaderboards rebuilt: {counts}")
+        return counts
+
+    def _snapshotting(self, family: str) -> None:
+        """Start keeping deltas for ``family``; call before reading its snapshot."""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.sadd(REBUILDING_KEY, family)
+        pipe.expire(REBUILDING_KEY, REBUILD_STATE_TTL)
+        pipe.execute()
+
+    def _replace(self, key: str, rows: Iterable[Tuple[int, int]]) -> int:
+        tmp_key = f"{key}:rebuild"
+        self.redis.delete(tmp_key)
+        total = 0
+        batch = {}
+        for user_id, points in rows:
+            if not points:
+                continue
+            batch[str(user_id)] = int(points)
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                self.redis.zadd(tmp_key, batch)
+                total += len(batch)
+                batch = {}
+        if batch:
+            self.redis.zadd(tmp_key, batch)
+            total += len(batch)
+        # One transaction, so every change is either in the delta or made to
+        # the new board
+        delta_key = f"{DELTA_PREFIX}{key}"
+        pipe = self.redis.pipeline(transaction=True)
+        if total:
+            pipe.rename(tmp_key, key)
+            pipe.zunionstore(key, [key, delta_key])
+        else:
+            pipe.zunionstore(key, [delta_key])
+        pipe.delete(delta_key)
+        pipe.sadd(REBUILT_KEY, key)
+        pipe.expire(REBUILT_KEY, REBUILD_STATE_TTL)
+        pipe.execute()
+        return total
+
+    @staticmethod
+    def _entries(rows, start: int) -> List[Dict[str, Any]]:
+        return [
+            {"user_id": int(member), "rank": start + i + 1, "points": int(score)}
+            for i, (member, score) in enumerate(rows)
+        ]
@@ -0,0 +1,388 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional, Tuple
+from sqlalchemy import text, insert, select, update, func, tuple_
+from sqlalchemy.orm import Session, selectinload
+from app.core.config import settings
+from app.core.security import generate_user_id
+from app.models.order import Order, OrderItemRecord, OrderPlaceRequest, OrderStatusUpdate
+from app.models.user import User
+from app.services.catalog_service import notify_catalog_changed
+from app.services.points_rules import rules_engine, user_tier
+from app.services.points_service import PointsService
+from app.services.product_stats_service import ProductStatsService
+from app.services.stock_alerts import low_stock_notifier, crossed_low_stock
+from app.services.user_events import queue_user_event
+import base64
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Locks the requested product rows in id order, then reserves stock for all of
+# them in one statement. Rows without enough stock are simply not updated, so
+# the caller compares the returned rows with the request.
+RESERVE_STOCK_SQL = text("""
+    WITH requested AS (
+        SELECT * FROM unnest(CAST(:product_ids AS integer[]), CAST(:quantities AS integer[]))
+            AS r(product_id, quantity)
+    ),
+    locked AS (
+        SELECT p.id
+        FROM products p
+        JOIN requested r ON r.product_id = p.id
+        WHERE p.is_active
+        ORDER BY p.id
+        FOR UPDATE OF p
+    )
+    UPDATE products p
+    SET stock_quantity = p.stock_quantity - r.quantity,
+        updated_at = now()
+    FROM requested r
+    JOIN locked l ON l.id = r.product_id
+    WHERE p.id = r.product_id
+      AND p.stock_quantity >= r.quantity
+    RETURNING p.id, p.name, p.price, p.points_reward, p.category, p.retailer_id,
+              r.quantity, p.stock_quantity, p.min_stock_level
+""")
+
+# Puts the stock of a cancelled order back, locking rows in the same id order as
+# RESERVE_STOCK_SQL so the two cannot deadlock.
+RELEASE_STOCK_SQL = text("""
+    WITH released AS (
+        SELECT product_id, SUM(quantity) AS quantity
+        FROM order_items
+        WHERE order_id = :order_id
+        GROUP BY product_id
+    ),
+    locked AS (
+        SELECT p.id
+        FROM products p
+        JOIN released r ON r.product_id = p.id
+        ORDER BY p.id
+        FOR UPDATE OF p
+    )
+    UPDATE products p
+    SET stock_quantity = p.stock_quantity + r.quantity,
+        updated_at = now()
+    FROM released r
+    JOIN locked l ON l.id = r.product_id
+    WHERE p.id = r.product_id
+    RETURNING p.id, r.quantity, p.stock_quantity
+""")
+
+# Allowed status changes; delivered and cancelled are final
+ORDER_TRANSITIONS = {
+    "pending": ("processing", "cancelled"),
+    "processing": ("shipped", "cancelled"),
+    "shipped": ("delivered",),
+}
+
+# Timestamp column set when an order enters each status
+STATUS_TIMESTAMPS = {
+    "processing": "processed_at",
+    "shipped": "shipped_at",
+    "delivered": "delivered_at",
+    "cancelled": "cancelled_at",
+}
+
+ORDER_TIMESTAMPS = ("processed_at", "shipped_at", "delivered_at", "cancelled_at")
+
+# Columns needed by the order list; everything else is only loaded for the detail view
+ORDER_LIST_COLUMNS = (
+    Order.id, Order.order_number, Order.status, Order.payment_status, Order.total_amount,
+    Order.currency, Order.total_points_earned, Order.created_at,
+    Order.processed_at, Order.shipped_at, Order.delivered_at, Order.cancelled_at
+)
+
+def encode_cursor(created_at: datetime, order_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{order_id}".encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, order_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(order_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+class OutOfStockError(ValueError):
+    """Some requested products are inactive or lack the stock for the order."""
+
+    def __init__(self, product_ids: List[int]):
+        super().__init__(f"Insufficient stock for products: {product_ids}")
+        self.product_ids = product_ids
+
+class InvalidOrderTransitionError(ValueError):
+    """The order's current status does not allow the requested change."""
+
+class OrderService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def place_order(self, user: User, request: OrderPlaceRequest) -> Dict[str, Any]:
+        """Reserve stock, price the order and write it with its items in one transaction."""
+        quantities: Dict[int, int] = {}
+        for item in request.items:
+            quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+        product_ids = sorted(quantities)
+
+        try:
+            reserved = self.db.execute(RESERVE_STOCK_SQL, {
+                "product_ids": product_ids,
+                "quantities": [quantities[product_id] for product_id in product_ids]
+            }).mappings().all()
+
+            if len(reserved) != len(product_ids):
+                missing = sorted(set(product_ids) - {row["id"] for row in reserved})
+                raise OutOfStockError(missing)
+
+            now = datetime.now(timezone.utc)
+            tier = user_tier(user.total_points)
+            items = []
+            for row in sorted(reserved, key=lambda row: row["id"]):
+                unit_price = float(row["price"])
+                base_points = (row["points_reward"] or settings.POINTS_PER_PURCHASE) * row["quantity"]
+                points_earned, _ = rules_engine.evaluate(
+                    self.db,
+                    "purchase",
+                    base_points,
+                    category=row["category"],
+                    retailer_id=request.retailer_id or row["retailer_id"],
+                    tier=tier,
+                    at=now
+                )
+                items.append({
+                    "product_id": row["id"],
+                    "product_name": row["name"],
+                    "quantity": row["quantity"],
+                    "unit_price": unit_price,
+                    "total_price": round(unit_price * row["quantity"], 2),
+                    "points_earned": points_earned
+                })
+
+            subtotal = round(sum(item["total_price"] for item in items), 2)
+            total_points_earned = sum(item["points_earned"] for item in items)
+            order_number = self._order_number()
+            order = Order(
+                order_number=order_number,
+                user_id=user.id,
+                retailer_id=request.retailer_id,
+                subtotal=subtotal,
+                total_amount=subtotal,
+                payment_method=request.payment_method,
+                shipping_address=request.shipping_address,
+                billing_address=request.billing_address,
+                notes=request.notes,
+                total_points_earned=total_points_earned
+            )
+            self.db.add(order)
+            self.db.flush()
+            order_id = order.id
+
+            self.db.execute(insert(OrderItemRecord), [{**item, "order_id": order_id} for item in items])
+            self.db.commit()
+        except OutOfStockError:
+            # An expected outcome the endpoint answers with 409, not a failure
+            self.db.rollback()
+            raise
+        except Exception as e:
+            logger.error(f"Error placing order for user {user.id}: {e}")
+            self.db.rollback()
+            raise e
+
+        if any(row["stock_quantity"] == 0 for row in reserved):
+            self._notify_catalog()
+        self._report_low_stock(reserved)
+
+        return {
+            "id": order_id,
+            "order_number": order_number,
+            "status": "pending",
+            "items": items,
+            "subtotal": subtotal,
+            "total_amount": subtotal,
+            "currency": "PKR",
+            "total_points_earned": total_points_earned
+        }
+
+    def list_orders(self, user_id: int, limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """One page of a user's orders, newest first, in exactly two queries.
+
+        Pages are keyset-paginated on (created_at, id), which the
+        (user_id, created_at) index serves without an offset scan. Item
+        summaries for the whole page come from one IN query.
+        """
+        query = select(*ORDER_LIST_COLUMNS).where(Order.user_id == user_id)
+        if cursor:
+            created_at, order_id = decode_cursor(cursor)
+            query = query.where(tuple_(Order.created_at, Order.id) < tuple_(created_at, order_id))
+        rows = self.db.execute(
+            query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1)
+        ).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        items_by_order: Dict[int, List[Dict[str, Any]]] = {row.id: [] for row in rows}
+        if rows:
+            item_rows = self.db.execute(
+                select(
+                    OrderItemRecord.order_id, OrderItemRecord.product_id,
+                    OrderItemRecord.product_name, OrderItemRecord.quantity
+                )
+                .where(OrderItemRecord.order_id.in_(list(items_by_order)))
+                .order_by(OrderItemRecord.order_id, OrderItemRecord.id)
+            )
+            for item in item_rows:
+                items_by_order[item.order_id].append({
+                    "product_id": item.product_id,
+                    "product_name": item.product_name,
+                    "quantity": item.quantity
+                })
+
+        orders = []
+        for row in rows:
+            order = {
+                "id": row.id,
+                "order_number": row.order_number,
+                "status": row.status,
+                "payment_status": row.payment_status,
+                "total_amount": row.total_amount,
+                "currency": row.currency,
+                "total_points_earned": row.total_points_earned,
+                "created_at": row.created_at,
+                "items": items_by_order[row.id]
+            }
+            for field in ORDER_TIMESTAMPS:
+                order[field] = getattr(row, field)
+            orders.append(order)
+
+        return {
+            "orders": orders,
+            "next_cursor": encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None,
+            "limit": limit
+        }
+
+    def get_order(self, user_id: int, order_id: int) -> Optional[Dict[str, Any]]:
+        """Full order with its items: one query for the order and one selectinload for the items."""
+        order = (
+            self.db.query(Order)
+            .options(selectinload(Order.items))
+            .filter(Order.id == order_id, Order.user_id == user_id)
+            .first()
+        )
+        if order is None:
+            return None
+        data = {column.key: getattr(order, column.key) for column in Order.__table__.columns}
+        data["items"] = [
+            {
+                "product_id": item.product_id,
+                "product_name": item.product_name,
+                "quantity": item.quantity,
+                "unit_price": item.unit_price,
+                "total_price": item.total_price,
+                "points_earned": item.points_earned
+            }
+            for item in order.items
+        ]
+        return data
+
+    def update_status(self, order_id: int, request: OrderStatusUpdate) -> Optional[Dict[str, Any]]:
+        """Move an order to a new status, returning None if it does not exist.
+
+        The status check and the change are one conditional UPDATE, so two
+        concurrent updates cannot both apply. Delivery credits the order's
+        points and adds it to the product sales rollups, cancellation puts its
+        stock back, all in the same transaction.
+        The user is notified once it commits.
+        """
+        new_status = request.status
+        allowed_from = [current for current, targets in ORDER_TRANSITIONS.items() if new_status in targets]
+        if not allowed_from:
+            raise InvalidOrderTransitionError(f"Orders cannot be moved to '{new_status}'")
+
+        values = {"status": new_status, STATUS_TIMESTAMPS[new_status]: func.now(), "updated_at": func.now()}
+        if request.tracking_number is not None:
+            values["tracking_number"] = request.tracking_number
+        if new_status == "delivered":
+            values["actual_delivery"] = func.now()
+
+        restocked = []
+        try:
+            row = self.db.execute(
+                update(Order)
+                .where(Order.id == order_id, Order.status.in_(allowed_from))
+                .values(**values)
+                .returning(
+                    Order.user_id, Order.order_number, Order.retailer_id,
+                    Order.total_points_earned, Order.tracking_number
+                )
+            ).first()
+            if row is None:
+                current = self.db.execute(select(Order.status).where(Order.id == order_id)).scalar_one_or_none()
+                self.db.rollback()
+                if current is None:
+                    return None
+                raise InvalidOrderTransitionError(f"Cannot move an order from '{current}' to '{new_status}'")
+
+            if new_status == "delivered":
+                ProductStatsService(self.db).record_sales(order_id)
+            if new_status == "delivered" and row.total_points_earned:
+                PointsService(self.db).award_points(
+                    row.user_id,
+                    row.total_points_earned,
+                    source="purchase",
+                    reference_id=row.order_number,
+                    retailer_id=row.retailer_id,
+                    description=f"Points for order {row.order_number}",
+                    commit=False
+                )
+            elif new_status == "cancelled":
+                restocked = self.db.execute(RELEASE_STOCK_SQL, {"order_id": order_id}).mappings().all()
+
+            data = {
+                "order_id": order_id,
+                "order_number": row.order_number,
+                "status": new_status,
+                "tracking_number": row.tracking_number,
+                "points_earned": row.total_points_earned if new_status == "delivered" else 0
+            }
+            queue_user_event(self.db, row.user_id, "order_status", data)
+            self.db.commit()
+        except InvalidOrderTransitionError:
+            raise
+        except Exception as e:
+            logger.error(f"Error updating status of order {order_id}: {e}")
+            self.db.rollback()
+            raise e
+
+        # Products that were sold out are back in stock
+        if any(row["stock_quantity"] == row["quantity"] for row in restocked):
+            self._notify_catalog()
+
+        return data
+
+    @staticmethod
+    def _order_number() -> str:
+        return f"TRS-{datetime.utcnow():%Y%m%d}-{generate_user_id(8).upper()}"
+
+    @staticmethod
+    def _report_low_stock(reserved) -> None:
+        # The reservation already returned the new stock levels, so detection costs no query
+        alerts = [
+            {
+                "product_id": row["id"],
+                "name": row["name"],
+                "stock_quantity": row["stock_quantity"],
+                "min_stock_level": row["min_stock_level"]
+            }
+            for row in reserved
+            if crossed_low_stock(row["stock_quantity"], row["min_stock_level"], row["stock_quantity"] + row["quantity"])
+        ]
+        if alerts:
+            low_stock_notifier.report(alerts)
+
+    @staticmethod
+    def _notify_catalog() -> None:
+        # A product went out of or back into stock, which flips its in_stock flag in the catalog
+        try:
+            notify_catalog_changed()
+        except Exception as e:
+            logger.error(f"Error notifying catalog change: {e}")
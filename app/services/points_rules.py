@@ -0,0 +1,186 @@
+from bisect import bisect_right
+from typing import Optional, Iterable, Dict, Tuple, List, Any
+from datetime import datetime
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.change_notifications import ChangeWatcher, notify_change
+from app.models.points import PointsRule
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+RULES_VERSION_KEY = "points_rules:version"
+
+# (multiplier, bonus, applied rule ids) for one stretch of time
+Segment = Tuple[float, int, Tuple[int, ...]]
+NO_RULES: Segment = (1.0, 0, ())
+
+def user_tier(total_points: Optional[int]) -> Optional[str]:
+    """Highest tier whose threshold ``total_points`` reaches."""
+    points = total_points or 0
+    tier = None
+    for name, threshold in sorted(settings.POINTS_TIERS.items(), key=lambda item: item[1]):
+        if points >= threshold:
+            tier = name
+    return tier
+
+class CompiledRules:
+    """Immutable decision table built from the active rules.
+
+    Rules are bucketed by (action, category, retailer_id, tier), with ``None``
+    meaning "any". Within a bucket, the campaign windows are flattened into
+    sorted time boundaries with the combined multiplier and bonus precomputed
+    for each segment. Evaluation is at most eight dict lookups, each followed
+    by one bisect.
+    """
+
+    def __init__(self, rules: Iterable[Any] = ()):
+        windows: Dict[tuple, List[tuple]] = {}
+        count = 0
+        for rule in rules:
+            if not rule.is_active:
+                continue
+            start = rule.starts_at.timestamp() if rule.starts_at else -math.inf
+            end = rule.ends_at.timestamp() if rule.ends_at else math.inf
+            if end <= start:
+                continue
+            key = (rule.action, rule.category or None, rule.retailer_id or None, rule.tier or None)
+            windows.setdefault(key, []).append((start, end, rule.multiplier, rule.bonus or 0, rule.id))
+            count += 1
+
+        self.rule_count = count
+        self.buckets: Dict[tuple, Tuple[List[float], List[Segment]]] = {
+            key: self._compile_bucket(entries) for key, entries in windows.items()
+        }
+        # Only probe the wildcard combinations that some rule actually uses
+        patterns: Dict[str, set] = {}
+        for action, category, retailer_id, tier in self.buckets:
+            patterns.setdefault(action, set()).add((category is not None, retailer_id is not None, tier is not None))
+        self.patterns: Dict[str, Tuple[Tuple[bool, bool, bool], ...]] = {
+            action: tuple(sorted(found)) for action, found in patterns.items()
+        }
+
+    @staticmethod
+    def _compile_bucket(entries: List[tuple]) -> Tuple[List[float], List[Segment]]:
+        # Sweep the window boundaries in order, keeping only the rules active in each segment
+        starting: Dict[float, List[tuple]] = {}
+        ending: Dict[float, List[tuple]] = {}
+        active = {}
+        for entry in entries:
+            start, end = entry[0], entry[1]
+            if math.isfinite(start):
+                starting.setdefault(start, []).append(entry)
+            else:
+                active[entry[4]] = entry
+            if math.isfinite(end):
+                ending.setdefault(end, []).append(entry)
+        boundaries = sorted(starting.keys() | ending.keys())
+
+        def segment() -> Segment:
+            if not active:
+                return NO_RULES
+            multiplier, bonus = 1.0, 0
+            for _, _, rule_multiplier, rule_bonus, _ in active.values():
+                multiplier *= rule_multiplier
+                bonus += rule_bonus
+            return multiplier, bonus, tuple(sorted(active))
+
+        segments: List[Segment] = [segment()]
+        for boundary in boundaries:
+            for entry in ending.get(boundary, ()):
+                active.pop(entry[4], None)
+            for entry in starting.get(boundary, ()):
+                active[entry[4]] = entry
+            segments.append(segment())
+        return boundaries, segments
+
+    def evaluate(
+        self,
+        action: str,
+        base_points: int,
+        category: Optional[str] = None,
+        retailer_id: Optional[str] = None,
+        tier: Optional[str] = None,
+        at: Optional[float] = None
+    ) -> Tuple[int, Tuple[int, ...]]:
+        patterns = self.patterns.get(action)
+        if not patterns:
+            return base_points, ()
+        now = time.time() if at is None else at
+        multiplier, bonus, applied = 1.0, 0, ()
+        buckets = self.buckets
+        for use_category, use_retailer, use_tier in patterns:
+            if (use_category and category is None) or (use_retailer and retailer_id is None) or (use_tier and tier is None):
+                continue
+            bucket = buckets.get((
+                action,
+                category if use_category else None,
+                retailer_id if use_retailer else None,
+                tier if use_tier else None
+            ))
+            if bucket is None:
+                continue
+            boundaries, segments = bucket
+            segment_multiplier, segment_bonus, segment_rules = segments[bisect_right(boundaries, now)]
+            if segment_rules:
+                multiplier *= segment_multiplier
+                bonus += segment_bonus
+                applied += segment_rules
+        if not applied:
+            return base_points, ()
+        return max(int(round(base_points * multiplier)) + bonus, 0), applied
+
+class PointsRulesEngine:
+    """Per-worker holder of the compiled rules, reloaded when the rule version changes.
+
+    Writers bump ``points_rules:version`` in Redis after committing a rule
+    change; workers poll that key at most every ``POINTS_RULES_RELOAD_SECONDS``
+    and recompile from the database when it moved.
+    """
+
+    def __init__(self, reload_interval: Optional[float] = None):
+        self.watcher = ChangeWatcher(
+            RULES_VERSION_KEY,
+            settings.POINTS_RULES_RELOAD_SECONDS if reload_interval is None else reload_interval
+        )
+        self.compiled = CompiledRules()
+
+    def load(self, rules: Iterable[Any]) -> CompiledRules:
+        self.compiled = CompiledRules(rules)
+        return self.compiled
+
+    def ensure_current(self, db: Session) -> None:
+        def reload(version: Optional[str]) -> None:
+            started = time.perf_counter()
+            compiled = self.load(db.query(PointsRule).filter(PointsRule.is_active == True).all())
+            logger.info(
+                f"Compiled {compiled.rule_count} points rules (version {version}) "
+                f"in {(time.perf_counter() - started) * 1000:.1f}ms"
+            )
+
+        self.watcher.refresh(reload)
+
+    def evaluate(
+        self,
+        db: Session,
+        action: str,
+        base_points: int,
+        category: Optional[str] = None,
+        retailer_id: Optional[str] = None,
+        tier: Optional[str] = None,
+        at: Optional[datetime] = None
+    ) -> Tuple[int, Tuple[int, ...]]:
+        """Points to award for ``action`` and the ids of the rules that applied."""
+        self.ensure_current(db)
+        return self.compiled.evaluate(
+            action, base_points, category, retailer_id, tier,
+            at.timestamp() if at else None
+        )
+
+def notify_rules_changed() -> None:
+    """Tell every worker to recompile the rules on its next check."""
+    notify_change(RULES_VERSION_KEY)
+
+rules_engine = PointsRulesEngine()
@@ -0,0 +1,158 @@
+from typing import Optional, List, Dict, Any
+from sqlalchemy import event, update, insert, func
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.models.points import Points
+from app.models.user import User
+from app.services.leaderboard_service import LeaderboardService
+from app.services.user_events import queue_user_event
+import logging
+
+logger = logging.getLogger(__name__)
+
+PENDING_CHANGES_KEY = "points_changes"
+
+class InsufficientPointsError(ValueError):
+    """The user's balance does not cover the requested redemption."""
+
+class PointsService:
+    """Single write path for the points ledger.
+
+    Every ledger insert goes together with the matching ``users.total_points``
+    update in the caller's transaction. Derived state (leaderboards, user event
+    streams) is only touched once that transaction has committed.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def award_points(
+        self,
+        user_id: int,
+        amount: int,
+        source: str,
+        reference_id: Optional[str] = None,
+        retailer_id: Optional[str] = None,
+        description: Optional[str] = None,
+        commit: bool = True
+    ) -> int:
+        """Credit ``amount`` points to a user and return the new balance."""
+        return self._apply(user_id, "earn", amount, source, reference_id, retailer_id, description, commit)
+
+    def redeem_points(self, user_id: int, items: List[Dict[str, Any]], commit: bool = True) -> int:
+        """Debit all ``items`` in one transaction and return the new balance.
+
+        The balance check and the debit are a single conditional UPDATE, so
+        concurrent redemptions never need a row lock held across round trips
+        and can never drive the balance negative. Each item is a dict with
+        ``points`` and optional ``description`` and ``reference_id``.
+        """
+        total = sum(item["points"] for item in items)
+        if not items or total <= 0:
+            raise ValueError("Nothing to redeem")
+
+        try:
+            new_balance = self.db.execute(
+                update(User)
+                .where(User.id == user_id, User.total_points >= total)
+                .values(total_points=User.total_points - total, updated_at=func.now())
+                .returning(User.total_points)
+            ).scalar_one_or_none()
+            if new_balance is None:
+                raise InsufficientPointsError("Insufficient points")
+
+            self.db.execute(insert(Points), [
+                {
+                    "user_id": user_id,
+                    "type": "spend",
+                    "amount": -item["points"],
+                    "source": "redemption",
+                    "reference_id": item.get("reference_id"),
+                    "description": item.get("description")
+                }
+                for item in items
+            ])
+            self.db.info.setdefault(PENDING_CHANGES_KEY, []).append((user_id, -total, False, None))
+            queue_user_event(self.db, user_id, "points", {
+                "amount": -total,
+                "balance": new_balance,
+                "source": "redemption"
+            })
+
+            if commit:
+                self.db.commit()
+            return new_balance
+        except InsufficientPointsError:
+            # An expected outcome the endpoint answers with 409, not a failure
+            self.db.rollback()
+            raise
+        except Exception as e:
+            logger.error(f"Error redeeming points for user {user_id}: {e}")
+            self.db.rollback()
+            raise e
+
+    def _apply(
+        self,
+        user_id: int,
+        transaction_type: str,
+        amount: int,
+        source: str,
+        reference_id: Optional[str],
+        retailer_id: Optional[str],
+        description: Optional[str],
+        commit: bool
+    ) -> int:
+        try:
+            new_balance = self.db.execute(
+                update(User)
+                .where(User.id == user_id)
+                .values(
+                    total_points=func.coalesce(User.total_points, 0) + amount,
+                    updated_at=func.now()
+                )
+                .returning(User.total_points)
+            ).scalar_one()
+
+            self.db.add(Points(
+                user_id=user_id,
+                type=transaction_type,
+                amount=amount,
+                source=source,
+                reference_id=reference_id,
+                retailer_id=retailer_id,
+                description=description
+            ))
+            self.db.info.setdefault(PENDING_CHANGES_KEY, []).append(
+                (user_id, amount, transaction_type == "earn", retailer_id)
+            )
+            queue_user_event(self.db, user_id, "points", {
+                "amount": amount,
+                "balance": new_balance,
+                "source": source,
+                "reference_id": reference_id
+            })
+
+            if commit:
+                self.db.commit()
+            return new_balance
+        except Exception as e:
+            logger.error(f"Error recording points for user {user_id}: {e}")
+            self.db.rollback()
+            raise e
+
+@event.listens_for(SessionLocal, "after_commit")
+def _publish_points_changes(session: Session):
+    changes = session.info.pop(PENDING_CHANGES_KEY, None)
+    if not changes:
+        return
+    try:
+        leaderboard = LeaderboardService()
+        for user_id, amount, earned, retailer_id in changes:
+            leaderboard.record_points(user_id, amount, earned=earned, retailer_id=retailer_id)
+    except Exception as e:
+        # Boards are derived data; `python manage.py rebuild-leaderboard` restores them
+        logger.error(f"Error updating leaderboards: {e}")
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_points_changes(session: Session):
+    session.info.pop(PENDING_CHANGES_KEY, None)
@@ -0,0 +1,141 @@
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+import re
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+UNIT_RE = re.compile(r"^(\d+)([a-z]+)$")
+
+# Longest prefix indexed for typeahead; longer query tokens fall back to a scan of the term list
+MAX_PREFIX = 12
+
+# How much a match in each field counts towards the ranking
+FIELD_WEIGHTS = (
+    ("name", 4),
+    ("model_number", 4),
+    ("sku", 4),
+    ("brand", 2),
+    ("category", 2),
+    ("subcategory", 2),
+    ("specifications", 1),
+    ("features", 1),
+    ("description", 1),
+)
+
+FACET_FIELDS = ("category", "brand")
+
+def tokenize(text: Any) -> List[str]:
+    """Lowercase word tokens; "100W" also yields "100" and "w" so "100 w" and "100w" both match."""
+    tokens = []
+    for token in TOKEN_RE.findall(str(text).lower()):
+        tokens.append(token)
+        unit = UNIT_RE.match(token)
+        if unit:
+            tokens.extend(unit.groups())
+    return tokens
+
+def _field_text(value: Any) -> Iterable[str]:
+    if value is None:
+        return ()
+    if isinstance(value, dict):
+        return [f"{key} {item}" for key, item in value.items()]
+    if isinstance(value, (list, tuple)):
+        return [str(item) for item in value]
+    return [str(value)]
+
+class ProductSearchIndex:
+    """In-memory inverted index over a catalog snapshot.
+
+    Built once per snapshot. Terms map to {product position: weight}, and every
+    term prefix up to ``MAX_PREFIX`` characters is precomputed, so matching a
+    partially typed query is one dict lookup per token. Facet counts are taken
+    from the same match set as the results.
+    """
+
+    def __init__(self, products: Tuple[Dict[str, Any], ...]):
+        self.products = products
+        postings: Dict[str, Dict[int, int]] = {}
+        for position, product in enumerate(products):
+            for field, weight in FIELD_WEIGHTS:
+                for text in _field_text(product.get(field)):
+                    for token in tokenize(text):
+                        entry = postings.setdefault(token, {})
+                        entry[position] = max(entry.get(position, 0), weight)
+        self.postings = postings
+
+        prefixes: Dict[str, Dict[int, int]] = {}
+        for term, entry in postings.items():
+            for length in range(1, min(len(term), MAX_PREFIX) + 1):
+                merged = prefixes.setdefault(term[:length], {})
+                for position, weight in entry.items():
+                    if weight > merged.get(position, 0):
+                        merged[position] = weight
+        self.prefixes = prefixes
+
+        self.facet_values = {
+            field: [product.get(field) for product in products] for field in FACET_FIELDS
+        }
+
+    def _prefix_postings(self, prefix: str) -> Dict[int, int]:
+        if len(prefix) <= MAX_PREFIX:
+            return self.prefixes.get(prefix, {})
+        merged: Dict[int, int] = {}
+        for term, entry in self.postings.items():
+            if term.startswith(prefix):
+                for position, weight in entry.items():
+                    merged[position] = max(merged.get(position, 0), weight)
+        return merged
+
+    def search(
+        self,
+        query: str = "",
+        category: Optional[str] = None,
+        brand: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        tokens = tokenize(query) if query else []
+        scores: Optional[Dict[int, int]] = None
+        for token in tokens:
+            # Every token must match, as a prefix so partially typed words already hit
+            entry = self._prefix_postings(token)
+            if scores is None:
+                scores = dict(entry)
+            else:
+                scores = {position: score + entry[position] for position, score in scores.items() if position in entry}
+            if not scores:
+                break
+        if scores is None:
+            scores = {position: 0 for position in range(len(self.products))}
+
+        filters = {"category": category, "brand": brand}
+
+        def passes(position: int, skip: Optional[str] = None) -> bool:
+            return all(
+                value is None or self.facet_values[field][position] == value
+                for field, value in filters.items() if field != skip
+            )
+
+        # Each facet is counted with the other filters applied but not its own
+        facets = {}
+        for field in FACET_FIELDS:
+            counts: Dict[str, int] = {}
+            for position in scores:
+                if passes(position, skip=field):
+                    value = self.facet_values[field][position]
+                    if value is not None:
+                        counts[value] = counts.get(value, 0) + 1
+            facets[field] = sorted(
+                ({"value": value, "count": count} for value, count in counts.items()),
+                key=lambda facet: (-facet["count"], facet["value"])
+            )
+
+        matches = [position for position in scores if passes(position)]
+        matches.sort(key=lambda position: (
+            -scores[position],
+            not self.products[position].get("is_featured"),
+            self.products[position].get("name") or ""
+        ))
+        return {
+            "total": len(matches),
+            "products": [self.products[position] for position in matches[offset:offset + limit]],
+            "facets": facets
+        }
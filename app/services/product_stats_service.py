@@ -0,0 +1,233 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional
+from sqlalchemy import text, select
+from sqlalchemy.orm import Session
+from app.models.product import Product, ProductDailyStats, ProductReview
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Adds a delivered order to its products' counters and to today's rollup.
+# Product rows are locked in id order, like stock reservation.
+RECORD_SALES_SQL = text("""
+    WITH sold AS (
+        SELECT product_id, SUM(quantity) AS units, SUM(total_price) AS revenue
+        FROM order_items
+        WHERE order_id = :order_id
+        GROUP BY product_id
+    ),
+    locked AS (
+        SELECT p.id
+        FROM products p
+        JOIN sold s ON s.product_id = p.id
+        ORDER BY p.id
+        FOR UPDATE OF p
+    ),
+    counters AS (
+        UPDATE products p
+        SET total_sales = COALESCE(p.total_sales, 0) + s.units,
+            total_revenue = COALESCE(p.total_revenue, 0) + s.revenue
+        FROM sold s
+        JOIN locked l ON l.id = s.product_id
+        WHERE p.id = s.product_id
+        RETURNING p.id
+    )
+    INSERT INTO product_daily_stats (product_id, day, units_sold, revenue, orders, reviews, rating_total)
+    SELECT product_id, CAST(timezone('UTC', now()) AS date), units, revenue, 1, 0, 0
+    FROM sold
+    ON CONFLICT (product_id, day) DO UPDATE
+    SET units_sold = product_daily_stats.units_sold + EXCLUDED.units_sold,
+        revenue = product_daily_stats.revenue + EXCLUDED.revenue,
+        orders = product_daily_stats.orders + 1
+""")
+
+INSERT_REVIEW_SQL = text("""
+    INSERT INTO product_reviews (product_id, user_id, rating, comment, verified_purchase, created_at)
+    SELECT :product_id, :user_id, :rating, :comment, EXISTS (
+        SELECT 1
+        FROM orders o
+        JOIN order_items i ON i.order_id = o.id
+        WHERE o.user_id = :user_id AND o.status = 'delivered' AND i.product_id = :product_id
+    ), now()
+    ON CONFLICT (product_id, user_id) DO NOTHING
+    RETURNING id, verified_purchase
+""")
+
+RECORD_REVIEW_SQL = text("""
+    WITH counters AS (
+        UPDATE products
+        SET review_count = COALESCE(review_count, 0) + 1,
+            rating_total = COALESCE(rating_total, 0) + :rating,
+            average_rating = CAST(COALESCE(rating_total, 0) + :rating AS float) / (COALESCE(review_count, 0) + 1)
+        WHERE id = :product_id
+        RETURNING average_rating, review_count
+    ),
+    daily AS (
+        INSERT INTO product_daily_stats (product_id, day, units_sold, revenue, orders, reviews, rating_total)
+        VALUES (:product_id, CAST(timezone('UTC', now()) AS date), 0, 0, 0, 1, :rating)
+        ON CONFLICT (product_id, day) DO UPDATE
+        SET reviews = product_daily_stats.reviews + 1,
+            rating_total = product_daily_stats.rating_total + EXCLUDED.rating_total
+    )
+    SELECT average_rating, review_count FROM counters
+""")
+
+# Backfill: recompute every product's counters from delivered orders and reviews
+REBUILD_COUNTERS_SQL = text("""
+    UPDATE products p
+    SET total_sales = COALESCE(s.units, 0),
+        total_revenue = COALESCE(s.revenue, 0),
+        review_count = COALESCE(r.reviews, 0),
+        rating_total = COALESCE(r.rating_total, 0),
+        average_rating = COALESCE(CAST(r.rating_total AS float) / NULLIF(r.reviews, 0), 0)
+    FROM products p0
+    LEFT JOIN (
+        SELECT i.product_id, SUM(i.quantity) AS units, SUM(i.total_price) AS revenue
+        FROM order_items i
+        JOIN orders o ON o.id = i.order_id
+        WHERE o.status = 'delivered'
+        GROUP BY i.product_id
+    ) s ON s.product_id = p0.id
+    LEFT JOIN (
+        SELECT product_id, COUNT(*) AS reviews, SUM(rating) AS rating_total
+        FROM product_reviews
+        GROUP BY product_id
+    ) r ON r.product_id = p0.id
+    WHERE p.id = p0.id
+""")
+
+REBUILD_DAILY_SALES_SQL = text("""
+    INSERT INTO product_daily_stats (product_id, day, units_sold, revenue, orders, reviews, rating_total)
+    SELECT i.product_id, CAST(timezone('UTC', o.delivered_at) AS date),
+           SUM(i.quantity), SUM(i.total_price), COUNT(DISTINCT o.id), 0, 0
+    FROM order_items i
+    JOIN orders o ON o.id = i.order_id
+    WHERE o.status = 'delivered' AND o.delivered_at IS NOT NULL
+    GROUP BY 1, 2
+""")
+
+REBUILD_DAILY_REVIEWS_SQL = text("""
+    INSERT INTO product_daily_stats (product_id, day, units_sold, revenue, orders, reviews, rating_total)
+    SELECT product_id, CAST(timezone('UTC', created_at) AS date), 0, 0, 0, COUNT(*), SUM(rating)
+    FROM product_reviews
+    GROUP BY 1, 2
+    ON CONFLICT (product_id, day) DO UPDATE
+    SET reviews = EXCLUDED.reviews,
+        rating_total = EXCLUDED.rating_total
+""")
+
+class ReviewExistsError(ValueError):
+    """The user has already reviewed this product."""
+
+class ProductStatsService:
+    """Incremental sales and rating rollups for products.
+
+    Product counters (total_sales, total_revenue, review_count,
+    average_rating) and the product_daily_stats rows are updated in the same
+    transaction as the delivery or review that changes them, so reads never
+    aggregate orders or reviews. ``rebuild`` recomputes everything from the
+    source tables.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record_sales(self, order_id: int) -> None:
+        """Add a delivered order to the rollups; the caller commits."""
+        self.db.execute(RECORD_SALES_SQL, {"order_id": order_id})
+
+    def add_review(self, user_id: int, product_id: int, rating: int, comment: Optional[str]) -> Dict[str, Any]:
+        params = {"product_id": product_id, "user_id": user_id, "rating": rating, "comment": comment}
+        try:
+            review = self.db.execute(INSERT_REVIEW_SQL, params).first()
+            if review is None:
+                raise ReviewExistsError("You have already reviewed this product")
+            counters = self.db.execute(RECORD_REVIEW_SQL, params).first()
+            self.db.commit()
+        except Exception as e:
+            logger.error(f"Error adding review for product {product_id}: {e}")
+            self.db.rollback()
+            raise e
+        return {
+            "id": review.id,
+            "product_id": product_id,
+            "rating": rating,
+            "comment": comment,
+            "verified_purchase": review.verified_purchase,
+            "average_rating": counters.average_rating,
+            "review_count": counters.review_count
+        }
+
+    def list_reviews(self, product_id: int, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        rows = self.db.execute(
+            select(
+                ProductReview.id, ProductReview.user_id, ProductReview.rating, ProductReview.comment,
+                ProductReview.verified_purchase, ProductReview.created_at
+            )
+            .where(ProductReview.product_id == product_id)
+            .order_by(ProductReview.created_at.desc(), ProductReview.id.desc())
+            .limit(limit)
+            .offset(offset)
+        ).mappings().all()
+        return [dict(row) for row in rows]
+
+    def product_stats(self, product_id: int, days: int = 30) -> Optional[Dict[str, Any]]:
+        """Lifetime counters plus one row per day with activity in the last ``days`` days."""
+        product = self.db.execute(
+            select(
+                Product.id, Product.total_sales, Product.total_revenue,
+                Product.average_rating, Product.review_count
+            ).where(Product.id == product_id)
+        ).mappings().first()
+        if product is None:
+            return None
+        since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+        daily = self.db.execute(
+            select(
+                ProductDailyStats.day, ProductDailyStats.units_sold, ProductDailyStats.revenue,
+                ProductDailyStats.orders, ProductDailyStats.reviews, ProductDailyStats.rating_total
+            )
+            .where(ProductDailyStats.product_id == product_id, ProductDailyStats.day >= since)
+            .order_by(ProductDailyStats.day)
+        ).mappings().all()
+        return {
+            **product,
+            "days": days,
+            "daily": [
+                {
+                    "day": row["day"],
+                    "units_sold": row["units_sold"],
+                    "revenue": row["revenue"],
+                    "orders": row["orders"],
+                    "reviews": row["reviews"],
+                    "average_rating": round(row["rating_total"] / row["reviews"], 2) if row["reviews"] else None
+                }
+                for row in daily
+            ]
+        }
+
+    def rebuild(self) -> Dict[str, Any]:
+        """Recompute all product counters and daily rollups in one transaction.
+
+        Writes to products wait while this runs (including order placement),
+        so that no delivery is counted twice or lost.
+        """
+        started = time.perf_counter()
+        try:
+            self.db.execute(text("LOCK TABLE products, product_daily_stats IN SHARE ROW EXCLUSIVE MODE"))
+            products = self.db.execute(REBUILD_COUNTERS_SQL).rowcount
+            self.db.execute(text("DELETE FROM product_daily_stats"))
+            self.db.execute(REBUILD_DAILY_SALES_SQL)
+            self.db.execute(REBUILD_DAILY_REVIEWS_SQL)
+            days = self.db.execute(text("SELECT COUNT(*) FROM product_daily_stats")).scalar()
+            self.db.commit()
+        except Exception as e:
+            logger.error(f"Error rebuilding product stats: {e}")
+            self.db.rollback()
+            raise e
+        return {
+            "products": products,
+            "daily_rows": days,
+            "elapsed_seconds": round(time.perf_counter() - started, 2)
+        }
@@ -0,0 +1,124 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Tuple
+from sqlalchemy import text
+from app.core.database import SessionLocal
+from app.services.leaderboard_service import LeaderboardService
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Users in the id range whose balance differs from the sum of their ledger rows
+# The ledger side of a chunk is a range scan on ix_points_user_id_created_at
+MISMATCHES_SQL = """
+    WITH ledger AS (
+        SELECT user_id, SUM(amount) AS ledger_points
+        FROM points
+        WHERE user_id BETWEEN :low AND :high
+        GROUP BY user_id
+    )
+    SELECT u.id AS user_id,
+           COALESCE(u.total_points, 0) AS total_points,
+           COALESCE(l.ledger_points, 0) AS ledger_points
+    FROM users u
+    LEFT JOIN ledger l ON l.user_id = u.id
+    WHERE u.id BETWEEN :low AND :high
+      AND COALESCE(u.total_points, 0) <> COALESCE(l.ledger_points, 0)
+"""
+
+# Apply the drift as a delta so awards committed while the chunk runs are kept
+REPAIR_SQL = f"""
+    WITH mismatches AS ({MISMATCHES_SQL})
+    UPDATE users u
+    SET total_points = COALESCE(u.total_points, 0) + (m.ledger_points - m.total_points),
+        updated_at = now()
+    FROM mismatches m
+    WHERE u.id = m.user_id
+    RETURNING u.id, m.total_points, m.ledger_points
+"""
+
+class PointsReconciliationService:
+    """Compare ``users.total_points`` with the points ledger over user-id ranges.
+
+    Each chunk is one aggregate query (or one UPDATE ... FROM when repairing)
+    on its own connection, and chunks run in parallel on a thread pool.
+    """
+
+    def __init__(self, chunk_size: int = 50000, workers: int = 4, session_factory=SessionLocal):
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.session_factory = session_factory
+
+    def run(self, repair: bool = False, sample_limit: int = 50) -> Dict[str, Any]:
+        started = time.perf_counter()
+        ranges = self._ranges()
+        mismatches: List[Tuple[int, int, int]] = []
+        mismatch_count = 0
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self._reconcile_range, low, high, repair) for low, high in ranges]
+            for future in as_completed(futures):
+                rows = future.result()
+                mismatch_count += len(rows)
+                if len(mismatches) < sample_limit:
+                    mismatches.extend(rows[:sample_limit - len(mismatches)])
+
+        elapsed = time.perf_counter() - started
+        report = {
+            "chunks": len(ranges),
+            "user_id_range": [ranges[0][0], ranges[-1][1]] if ranges else None,
+            "mismatches": mismatch_count,
+            "repaired": mismatch_count if repair else 0,
+            "elapsed_seconds": round(elapsed, 2),
+            "sample": [
+                {"user_id": user_id, "total_points": total, "ledger_points": ledger, "drift": total - ledger}
+                for user_id, total, ledger in mismatches
+            ]
+        }
+        logger.info(
+            f"Points reconciliation: {mismatch_count} mismatches over {len(ranges)} chunks "
+            f"in {elapsed:.1f}s (repair={repair})"
+        )
+        return report
+
+    def _ranges(self) -> List[Tuple[int, int]]:
+        db = self.session_factory()
+        try:
+            low, high = db.execute(text("SELECT MIN(id), MAX(id) FROM users")).one()
+        finally:
+            db.close()
+        if low is None:
+            return []
+        return [
+            (start, min(start + self.chunk_size - 1, high))
+            for start in range(low, high + 1, self.chunk_size)
+        ]
+
+    def _reconcile_range(self, low: int, high: int, repair: bool) -> List[Tuple[int, int, int]]:
+        db = self.session_factory()
+        try:
+            params = {"low": low, "high": high}
+            if repair:
+                rows = db.execute(text(REPAIR_SQL), params).all()
+                db.commit()
+                self._sync_leaderboard(rows)
+            else:
+                rows = db.execute(text(MISMATCHES_SQL), params).all()
+            return [tuple(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Error reconciling users {low}-{high}: {e}")
+            db.rollback()
+            raise e
+        finally:
+            db.close()
+
+    @staticmethod
+    def _sync_leaderboard(rows) -> None:
+        if not rows:
+            return
+        try:
+            leaderboard = LeaderboardService()
+            for user_id, total_points, ledger_points in rows:
+                leaderboard.record_points(user_id, ledger_points - total_points, earned=False)
+        except Exception as e:
+            logger.error(f"Error applying reconciliation to leaderboards: {e}")
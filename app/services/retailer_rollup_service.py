@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Optional
+from sqlalchemy import text, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.retailer import RetailerDailyStats
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Each source is an append-only table folded into retailer_daily_stats by id
+# range. "upsert" aggregates the rows in (:low, :high] and adds them to the
+# existing daily rows.
+ROLLUP_SOURCES = {
+    "qr_scans": {
+        "table": "qr_scans",
+        "time_column": "scanned_at",
+        "upsert": """
+            INSERT INTO retailer_daily_stats (retailer_id, day, scans, points_awarded, orders, revenue)
+            SELECT q.retailer_id, CAST(timezone('UTC', s.scanned_at) AS date), COUNT(*), 0, 0, 0
+            FROM qr_scans s
+            JOIN qr_codes q ON q.id = s.qr_code_id
+            WHERE s.id > :low AND s.id <= :high AND q.retailer_id IS NOT NULL
+            GROUP BY 1, 2
+            ON CONFLICT (retailer_id, day) DO UPDATE
+            SET scans = retailer_daily_stats.scans + EXCLUDED.scans
+        """
+    },
+    "points": {
+        "table": "points",
+        "time_column": "created_at",
+        "upsert": """
+            INSERT INTO retailer_daily_stats (retailer_id, day, scans, points_awarded, orders, revenue)
+            SELECT retailer_id, CAST(timezone('UTC', created_at) AS date), 0, SUM(amount), 0, 0
+            FROM points
+            WHERE id > :low AND id <= :high AND type = 'earn' AND retailer_id IS NOT NULL
+            GROUP BY 1, 2
+            ON CONFLICT (retailer_id, day) DO UPDATE
+            SET points_awarded = retailer_daily_stats.points_awarded + EXCLUDED.points_awarded
+        """
+    },
+    "orders": {
+        "table": "orders",
+        "time_column": "created_at",
+        "upsert": """
+            INSERT INTO retailer_daily_stats (retailer_id, day, scans, points_awarded, orders, revenue)
+            SELECT retailer_id, CAST(timezone('UTC', created_at) AS date), 0, 0, COUNT(*), SUM(total_amount)
+            FROM orders
+            WHERE id > :low AND id <= :high AND retailer_id IS NOT NULL
+            GROUP BY 1, 2
+            ON CONFLICT (retailer_id, day) DO UPDATE
+            SET orders = retailer_daily_stats.orders + EXCLUDED.orders,
+                revenue = retailer_daily_stats.revenue + EXCLUDED.revenue
+        """
+    },
+}
+
+class RetailerRollupService:
+    """Incremental per-retailer daily rollups of scans, points and orders.
+
+    Every source keeps a watermark: the highest row id already counted. A run
+    folds the rows above it into retailer_daily_stats in batches, each batch
+    and its watermark update committed together, so rows are counted exactly
+    once even if a run is interrupted or two runs overlap (the watermark row
+    is locked). Rows younger than ``settle_seconds`` are left for the next
+    run, so that a transaction still in flight with a lower id is not
+    skipped. Orders are counted when placed.
+    """
+
+    def __init__(self, db: Session, batch_size: Optional[int] = None, settle_seconds: Optional[int] = None):
+        self.db = db
+        self.batch_size = batch_size or settings.RETAILER_ROLLUP_BATCH_SIZE
+        self.settle_seconds = settings.RETAILER_ROLLUP_SETTLE_SECONDS if settle_seconds is None else settle_seconds
+
+    def run(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        counts = {name: self._run_source(name, source) for name, source in ROLLUP_SOURCES.items()}
+        return {"rows": counts, "elapsed_seconds": round(time.perf_counter() - started, 2)}
+
+    def rebuild(self) -> Dict[str, Any]:
+        """Drop the rollups and recount every source from the beginning."""
+        try:
+            self.db.execute(text("LOCK TABLE rollup_watermarks IN EXCLUSIVE MODE"))
+            self.db.execute(text("DELETE FROM retailer_daily_stats"))
+            self.db.execute(
+                text("DELETE FROM rollup_watermarks WHERE name = ANY(:names)"),
+                {"names": list(ROLLUP_SOURCES)}
+            )
+            self.db.commit()
+        except Exception as e:
+            logger.error(f"Error resetting retailer rollups: {e}")
+            self.db.rollback()
+            raise e
+        return self.run()
+
+    def _run_source(self, name: str, source: Dict[str, str]) -> int:
+        upper_sql = text(f"""
+            SELECT MAX(id), COUNT(*) FROM (
+                SELECT id FROM {source['table']}
+                WHERE id > :low AND {source['time_column']} < now() - make_interval(secs => :settle)
+                ORDER BY id
+                LIMIT :batch
+            ) batch
+        """)
+        upsert_sql = text(source["upsert"])
+        total = 0
+        while True:
+            try:
+                self.db.execute(
+                    text("INSERT INTO rollup_watermarks (name, last_id) VALUES (:name, 0) ON CONFLICT (name) DO NOTHING"),
+                    {"name": name}
+                )
+                low = self.db.execute(
+                    text("SELECT last_id FROM rollup_watermarks WHERE name = :name FOR UPDATE"),
+                    {"name": name}
+                ).scalar_one()
+                high, rows = self.db.execute(
+                    upper_sql, {"low": low, "settle": self.settle_seconds, "batch": self.batch_size}
+                ).one()
+                if high is None:
+                    self.db.rollback()
+                    return total
+                self.db.execute(upsert_sql, {"low": low, "high": high})
+                self.db.execute(
+                    text("UPDATE rollup_watermarks SET last_id = :high, updated_at = now() WHERE name = :name"),
+                    {"name": name, "high": high}
+                )
+                self.db.commit()
+            except Exception as e:
+                logger.error(f"Error rolling up {name}: {e}")
+                self.db.rollback()
+                raise e
+            total += rows
+            if rows < self.batch_size:
+                return total
+
+    def dashboard(self, retailer_id: str, days: int = 90) -> Dict[str, Any]:
+        """Totals and a zero-filled daily series for the last ``days`` days, from one range query."""
+        today = datetime.now(timezone.utc).date()
+        since = today - timedelta(days=days - 1)
+        rows = self.db.execute(
+            select(
+                RetailerDailyStats.day, RetailerDailyStats.scans, RetailerDailyStats.points_awarded,
+                RetailerDailyStats.orders, RetailerDailyStats.revenue
+            )
+            .where(RetailerDailyStats.retailer_id == retailer_id, RetailerDailyStats.day >= since)
+            .order_by(RetailerDailyStats.day)
+        ).all()
+        by_day = {row.day: row for row in rows}
+
+        daily = []
+        totals = {"scans": 0, "points_awarded": 0, "orders": 0, "revenue": 0.0}
+        for offset in range(days):
+            day = since + timedelta(days=offset)
+            row = by_day.get(day)
+            entry = {
+                "day": day,
+                "scans": row.scans if row else 0,
+                "points_awarded": row.points_awarded if row else 0,
+                "orders": row.orders if row else 0,
+                "revenue": row.revenue if row else 0.0
+            }
+            for field in totals:
+                totals[field] += entry[field]
+            daily.append(entry)
+        totals["revenue"] = round(totals["revenue"], 2)
+
+        return {"retailer_id": retailer_id, "from": since, "to": today, "totals": totals, "daily": daily}
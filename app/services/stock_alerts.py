@@ -0,0 +1,156 @@
+from typing import Any, Dict, Iterable, List, Optional
+from app.core.config import settings
+from app.core.redis import get_redis
+import json
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+STOCK_ALERTS_CHANNEL = "stock_alerts"
+# Collect alerts for this long before delivering them as one batch
+BATCH_SECONDS = 2.0
+
+def crossed_low_stock(stock_quantity: int, min_stock_level: Optional[int], previous_quantity: int) -> bool:
+    """True when a stock change moved a product from above to at or below its minimum level."""
+    threshold = min_stock_level or 0
+    return stock_quantity <= threshold < previous_quantity
+
+class LowStockNotifier:
+    """Background delivery of low-stock alerts.
+
+    Callers hand over alerts with ``report``, which never blocks and never
+    touches the database: detection happens where stock changes, using the
+    values the stock UPDATE already returned. A daemon thread coalesces
+    alerts so each product alerts at most once per ``window`` seconds across
+    all workers (a Redis ``SET NX`` per product), then delivers each batch
+    to the log, the ``stock_alerts`` Redis channel and, when configured, by
+    email.
+    """
+
+    def __init__(self, window: Optional[int] = None, queue_size: Optional[int] = None):
+        self.window = window or settings.STOCK_ALERT_WINDOW_SECONDS
+        self._queue: queue.Queue = queue.Queue(queue_size or settings.STOCK_ALERT_QUEUE_SIZE)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        # Local view of recent alerts, so repeats skip the Redis round trip
+        self._recent: Dict[int, float] = {}
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def report(self, alerts: Iterable[Dict[str, Any]]) -> None:
+        self._ensure_started()
+        for alert in alerts:
+            try:
+                self._queue.put_nowait(alert)
+            except queue.Full:
+                self.dropped += 1
+                logger.warning(f"Low-stock alert queue full, dropping alert for product {alert['product_id']}")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Deliver what is queued and stop the thread, for worker shutdown."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="low-stock-notifier", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        running = True
+        while running:
+            alert = self._queue.get()
+            if alert is None:
+                break
+            batch = {alert["product_id"]: alert}
+            deadline = time.monotonic() + BATCH_SECONDS
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    alert = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if alert is None:
+                    running = False
+                    break
+                # Keep the latest stock level per product
+                batch[alert["product_id"]] = alert
+            try:
+                self._deliver(self._coalesce(list(batch.values())))
+            except Exception as e:
+                logger.error(f"Error delivering low-stock alerts: {e}")
+
+    def _coalesce(self, alerts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        fresh = []
+        for alert in alerts:
+            if now - self._recent.get(alert["product_id"], -self.window) < self.window:
+                self.coalesced += 1
+            else:
+                fresh.append(alert)
+        if not fresh:
+            return []
+
+        try:
+            pipeline = get_redis().pipeline(transaction=False)
+            for alert in fresh:
+                pipeline.set(f"stock_alert:{alert['product_id']}", 1, nx=True, ex=self.window)
+            claimed = pipeline.execute()
+        except Exception as e:
+            # Without Redis, fall back to coalescing within this worker only
+            logger.warning(f"Could not coalesce low-stock alerts across workers: {e}")
+            claimed = [True] * len(fresh)
+
+        due = []
+        for alert, is_new in zip(fresh, claimed):
+            self._recent[alert["product_id"]] = now
+            if is_new:
+                due.append(alert)
+            else:
+                self.coalesced += 1
+        return due
+
+    def _deliver(self, alerts: List[Dict[str, Any]]) -> None:
+        if not alerts:
+            return
+        lines = [
+            f"{alert['name']} (#{alert['product_id']}): {alert['stock_quantity']} left, "
+            f"minimum {alert['min_stock_level']}"
+            for alert in alerts
+        ]
+        logger.warning("Low stock: " + "; ".join(lines))
+
+        try:
+            get_redis().publish(STOCK_ALERTS_CHANNEL, json.dumps(alerts))
+        except Exception as e:
+            logger.error(f"Error publishing low-stock alerts: {e}")
+
+        if settings.SENDGRID_API_KEY and settings.STOCK_ALERT_EMAILS:
+            try:
+                # Imported here so that workers only pay for SendGrid once they send mail
+                from sendgrid import SendGridAPIClient
+                from sendgrid.helpers.mail import Mail
+                message = Mail(
+                    from_email=settings.FROM_EMAIL,
+                    to_emails=settings.STOCK_ALERT_EMAILS,
+                    subject=f"Low stock: {len(alerts)} product(s)",
+                    plain_text_content="\n".join(lines)
+                )
+                SendGridAPIClient(settings.SENDGRID_API_KEY).send(message)
+            except Exception as e:
+                logger.error(f"Error emailing low-stock alerts: {e}")
+        self.sent += len(alerts)
+
+low_stock_notifier = LowStockNotifier()
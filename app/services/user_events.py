@@ -0,0 +1,171 @@
+from typing import Any, Dict, List, Optional, Set
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.read_replicas import note_user_write
+from app.core.redis import get_redis, get_async_redis
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+USER_EVENTS_CHANNEL = "user_events"
+PENDING_EVENTS_KEY = "user_events"
+
+# Sent in place of a connection's backlog when it falls behind, or when events
+# may have been lost; the client refetches /orders and /points/balance.
+RESYNC_EVENT = {"type": "resync", "data": {}}
+
+class TooManyConnectionsError(Exception):
+    """This worker is already serving its maximum number of event streams."""
+
+def queue_user_event(db: Session, user_id: int, event_type: str, data: Dict[str, Any]) -> None:
+    """Publish an event to ``user_id`` once the session's transaction commits."""
+    # The event announces a change to the user's data, so their next reads use the primary
+    note_user_write(db, user_id)
+    db.info.setdefault(PENDING_EVENTS_KEY, []).append(
+        {"user_id": user_id, "type": event_type, "data": data}
+    )
+
+def publish_user_events(events: List[Dict[str, Any]]) -> None:
+    pipeline = get_redis().pipeline(transaction=False)
+    for user_event in events:
+        pipeline.publish(USER_EVENTS_CHANNEL, json.dumps(user_event, default=str))
+    pipeline.execute()
+
+def format_sse(event_type: str, data: Dict[str, Any]) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@event.listens_for(SessionLocal, "after_commit")
+def _publish_pending_events(session: Session):
+    events = session.info.pop(PENDING_EVENTS_KEY, None)
+    if not events:
+        return
+    try:
+        publish_user_events(events)
+    except Exception as e:
+        # Clients resync on reconnect, so a lost notification only delays them
+        logger.error(f"Error publishing user events: {e}")
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_pending_events(session: Session):
+    session.info.pop(PENDING_EVENTS_KEY, None)
+
+class UserEventHub:
+    """Per-worker fan-out of user events to open event streams.
+
+    Each worker holds one Redis pub/sub subscription, whatever the number of
+    clients, and routes messages to the queues of the target user's
+    connections. Queues are bounded: a connection that falls behind loses its
+    backlog and gets a single ``resync`` event instead, so one slow client
+    cannot grow the worker's memory. The number of open streams is capped at
+    ``max_connections``.
+    """
+
+    def __init__(self, max_connections: Optional[int] = None, queue_size: Optional[int] = None):
+        self.max_connections = max_connections or settings.EVENT_STREAM_MAX_CONNECTIONS
+        self.queue_size = queue_size or settings.EVENT_STREAM_QUEUE_SIZE
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._connections = 0
+        self._listener: Optional[asyncio.Task] = None
+        self.peak_connections = 0
+        self.rejected = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        if self._connections >= self.max_connections:
+            self.rejected += 1
+            raise TooManyConnectionsError(f"Event stream limit of {self.max_connections} reached")
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        self._connections += 1
+        self.peak_connections = max(self.peak_connections, self._connections)
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(user_id)
+        if not queues or queue not in queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+        self._connections -= 1
+
+    def dispatch(self, message: str) -> None:
+        try:
+            user_event = json.loads(message)
+            queues = self._subscribers.get(user_event["user_id"])
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring malformed user event: {e}")
+            return
+        for queue in queues or ():
+            self._offer(queue, user_event)
+
+    def _offer(self, queue: asyncio.Queue, user_event: Dict[str, Any]) -> None:
+        if queue.full():
+            self.dropped += queue.qsize()
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC_EVENT)
+            return
+        queue.put_nowait(user_event)
+        self.delivered += 1
+
+    async def _listen(self) -> None:
+        delay = 1.0
+        while True:
+            pubsub = get_async_redis().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(USER_EVENTS_CHANNEL)
+                delay = 1.0
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.dispatch(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"User event subscription lost, retrying in {delay:.0f}s: {e}")
+                # Anything published while we were disconnected is gone
+                for queues in list(self._subscribers.values()):
+                    for queue in queues:
+                        self._offer(queue, RESYNC_EVENT)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+            finally:
+                try:
+                    await pubsub.reset()
+                except Exception:
+                    pass
+
+    async def close(self) -> None:
+        """Stop listening and end every open stream, for worker shutdown."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        for queues in self._subscribers.values():
+            for queue in queues:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "connections": self._connections,
+            "peak_connections": self.peak_connections,
+            "max_connections": self.max_connections,
+            "users": len(self._subscribers),
+            "rejected": self.rejected,
+            "delivered": self.delivered,
+            "dropped": self.dropped
+        }
+
+user_event_hub = UserEventHub()
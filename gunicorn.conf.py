@@ -0,0 +1,55 @@
+"""
+Production server configuration
+Usage: gunicorn -c gunicorn.conf.py main:app
+
+Pre-forks one worker per CPU core (WEB_WORKERS), each running uvicorn on
+uvloop/httptools. The app is imported once in the master and shared by the
+workers (WEB_PRELOAD); database and Redis connections are only opened inside
+the workers.
+
+Restarts, with the master's pid in logs/gunicorn.pid:
+  kill -HUP <pid>     replace workers one by one with the same code and config
+  kill -USR2 <pid>    start a new master on the new code next to the old one,
+                      then `kill -TERM <old pid>` once it is serving
+With preloading, HUP re-forks the code already loaded in the master, so deploys
+use USR2. Workers are also recycled after WEB_MAX_REQUESTS requests.
+"""
+
+from app.core.config import settings
+from app.core.metrics import metrics, reset_shared_metrics, retire_worker_metrics
+from app.core.server import worker_count
+
+bind = f"{settings.HOST}:{settings.PORT}"
+workers = worker_count()
+worker_class = "app.core.server.ProductionWorker"
+preload_app = settings.WEB_PRELOAD
+backlog = settings.WEB_BACKLOG
+keepalive = settings.WEB_KEEPALIVE_SECONDS
+timeout = settings.WEB_TIMEOUT_SECONDS
+graceful_timeout = settings.WEB_GRACEFUL_TIMEOUT_SECONDS
+max_requests = settings.WEB_MAX_REQUESTS
+max_requests_jitter = settings.WEB_MAX_REQUESTS_JITTER
+pidfile = "logs/gunicorn.pid"
+accesslog = None
+errorlog = "-"
+loglevel = "info"
+
+def on_starting(server):
+    reset_shared_metrics(settings.METRICS_DIR)
+
+def post_fork(server, worker):
+    # The preloaded engine must not share pooled connections across processes
+    from app.core.database import engine
+    engine.dispose(close=False)
+    # /metrics is served by any one worker and reports all of them
+    metrics.share(settings.METRICS_DIR, settings.METRICS_WRITE_SECONDS)
+
+def worker_exit(server, worker):
+    if metrics.shared is not None:
+        metrics.shared.stop()
+
+def child_exit(server, worker):
+    retire_worker_metrics(settings.METRICS_DIR, worker.pid)
+
+def when_ready(server):
+    server.log.info(f"Serving on {bind} with {workers} workers (preload={preload_app})")
@@ -1,21 +1,44 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from contextlib import asynccontextmanager
 import uvicorn
 from app.core.config import settings
 from app.core.database import init_db
 from app.api.v1.api import api_router
 from app.core.logging import setup_logging
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.response_cache import ResponseCacheMiddleware, CachedRoute, per_user, response_cache
+from app.core.rate_limit import RateLimitMiddleware, RateLimit
+from app.core.compression import CompressionMiddleware
+from app.core.query_stats import QueryStatsMiddleware
+from app.services.user_events import user_event_hub
+from app.services.stock_alerts import low_stock_notifier
+from app.services.image_service import image_service
+from app.services.catalog_service import catalog_cache
+from app.core.metrics import metrics
+from app.core.health import health_monitor
+import hmac
+import os
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await init_db()
     setup_logging()
+    health_monitor.start()
+    await run_in_threadpool(catalog_cache.warm)
     yield
     # Shutdown
-    pass
+    catalog_cache.stop()
+    health_monitor.stop()
+    await response_cache.close()
+    await user_event_hub.close()
+    low_stock_notifier.stop()
+    image_service.shutdown()
 
 app = FastAPI(
     title="Trison Solar API",
@@ -26,6 +49,32 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Statements, commits and database time per route; innermost, so requests
+# answered by the cache or rate limiter are not counted
+app.add_middleware(QueryStatsMiddleware)
+
+# Idempotency-Key support for retried mutating requests
+app.add_middleware(
+    IdempotencyMiddleware,
+    paths=[
+        "/api/v1/qr-codes/scan",
+        "/api/v1/orders",
+        "/api/v1/points/redeem",
+    ]
+)
+
+# Cached responses for the reads every app resume repeats; invalidated when
+# the user's data changes. The product list is served from the in-memory
+# catalog snapshot with an ETag already.
+app.add_middleware(
+    ResponseCacheMiddleware,
+    routes={
+        "/api/v1/auth/me": CachedRoute(ttl=300, key=per_user),
+        "/api/v1/points/balance": CachedRoute(ttl=60, key=per_user),
+        "/api/v1/points/summary": CachedRoute(ttl=60, key=per_user),
+    }
+)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -41,9 +90,32 @@ app.add_middleware(
     allowed_hosts=settings.ALLOWED_HOSTS
 )
 
+# gzip/brotli for larger responses; the catalog is served precompressed
+app.add_middleware(CompressionMiddleware)
+
+# Rate limits, checked before anything else runs. OTP routes are limited per
+# phone number so that one number cannot be spammed or brute-forced.
+otp_limits = [RateLimit("ip", rate=10 / 60, burst=10), RateLimit("phone", rate=5 / 3600, burst=5)]
+app.add_middleware(
+    RateLimitMiddleware,
+    default=[
+        RateLimit("ip", rate=settings.RATE_LIMIT_IP_PER_SECOND, burst=settings.RATE_LIMIT_IP_BURST),
+        RateLimit("user", rate=settings.RATE_LIMIT_USER_PER_SECOND, burst=settings.RATE_LIMIT_USER_BURST),
+    ],
+    routes={
+        "/api/v1/auth/send-otp": [RateLimit("ip", rate=5 / 60, burst=5), RateLimit("phone", rate=3 / 3600, burst=3)],
+        "/api/v1/auth/verify-otp": otp_limits,
+        "/api/v1/auth/login": otp_limits,
+    }
+)
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
+# Uploaded images and their generated variants
+os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
+
 @app.get("/")
 async def root():
     return {
@@ -53,14 +125,37 @@ async def root():
     }
 
 @app.get("/health")
+@app.get("/health/live")
 async def health_check():
+    # Liveness: the worker's event loop is answering
     return {"status": "healthy"}
 
+@app.get("/health/ready")
+async def readiness_check():
+    # Readiness from cached dependency checks; no I/O per probe
+    state = health_monitor.readiness()
+    return JSONResponse(state, status_code=200 if state["ready"] else 503)
+
+@app.get("/metrics")
+async def get_metrics(request: Request):
+    # Not found, rather than unauthorized, for scrapers without the token
+    authorization = request.headers.get("authorization", "")
+    if settings.METRICS_TOKEN:
+        if not hmac.compare_digest(authorization.encode(), f"Bearer {settings.METRICS_TOKEN}".encode()):
+            raise HTTPException(status_code=404, detail="Not Found")
+    elif not settings.DEBUG:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if metrics.shared is not None:
+        # Every gunicorn worker, whichever one answers the scrape
+        return await run_in_threadpool(metrics.shared.collect)
+    return {"pid": os.getpid(), "metrics": metrics.snapshot()}
+
 if __name__ == "__main__":
+    # Development server; production runs gunicorn -c gunicorn.conf.py main:app
     uvicorn.run(
         "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
+        host=settings.HOST,
+        port=settings.PORT,
+        reload=settings.DEBUG,
         log_level="info"
-    ) 
\ No newline at end of file
+    )
\ No newline at end of file
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Management commands for Trison Solar Backend
+Usage: python manage.py <command> [options]
+"""
+
+import argparse
+import sys
+
+def rebuild_leaderboard(args):
+    """Rebuild the Redis leaderboards from PostgreSQL"""
+    from app.core.database import SessionLocal
+    from app.services.leaderboard_service import LeaderboardService
+
+    db = SessionLocal()
+    try:
+        counts = LeaderboardService().rebuild(db)
+        print(f"Global leaderboard: {counts['global']} users")
+        print(f"Retailer leaderboards: {counts['retailers']}")
+        print(f"Weekly leaderboard: {counts['weekly']} users")
+        print(f"Monthly leaderboard: {counts['monthly']} users")
+    finally:
+        db.close()
+
+def reconcile_points(args):
+    """Compare users.total_points with the points ledger"""
+    from app.services.reconciliation_service import PointsReconciliationService
+
+    report = PointsReconciliationService(
+        chunk_size=args.chunk_size, workers=args.workers
+    ).run(repair=args.repair)
+    print(f"Chunks: {report['chunks']} (user ids {report['user_id_range']})")
+    print(f"Mismatches: {report['mismatches']}")
+    if args.repair:
+        print(f"Repaired: {report['repaired']}")
+    for row in report["sample"]:
+        print(f"  user {row['user_id']}: total_points={row['total_points']} "
+              f"ledger={row['ledger_points']} drift={row['drift']:+d}")
+    print(f"Finished in {report['elapsed_seconds']}s")
+    if report["mismatches"] and not args.repair:
+        sys.exit(2)
+
+def rebuild_product_stats(args):
+    """Recompute product sales and rating rollups from orders and reviews"""
+    from app.core.database import SessionLocal
+    from app.services.product_stats_service import ProductStatsService
+
+    db = SessionLocal()
+    try:
+        report = ProductStatsService(db).rebuild()
+        print(f"Products: {report['products']}")
+        print(f"Daily rollup rows: {report['daily_rows']}")
+        print(f"Finished in {report['elapsed_seconds']}s")
+    finally:
+        db.close()
+
+def rollup_retailers(args):
+    """Fold new scans, points and orders into the retailer daily rollups"""
+    from app.core.database import SessionLocal
+    from app.services.retailer_rollup_service import RetailerRollupService
+
+    db = SessionLocal()
+    try:
+        service = RetailerRollupService(db, batch_size=args.batch_size)
+        report = service.rebuild() if args.rebuild else service.run()
+        for source, rows in report["rows"].items():
+            print(f"{source}: {rows} new rows")
+        print(f"Finished in {report['elapsed_seconds']}s")
+    finally:
+        db.close()
+
+def import_catalog(args):
+    """Bulk import products or QR codes from a CSV file"""
+    from app.core.database import SessionLocal
+    from app.services.catalog_import import CatalogImportService
+
+    db = SessionLocal()
+    try:
+        service = CatalogImportService(db, batch_size=args.batch_size)
+        with open(args.path, newline="", encoding="utf-8-sig") as stream:
+            if args.kind == "products":
+                report = service.import_products(stream)
+            else:
+                report = service.import_qr_codes(stream)
+    finally:
+        db.close()
+
+    for error in report["errors"]:
+        print(f"  line {error['line']}: {'; '.join(error['errors'])}")
+    if report["errors_truncated"]:
+        print(f"  ... {report['failed'] - len(report['errors'])} more errors")
+    print(f"Rows: {report['rows']} (valid {report['valid']}, failed {report['failed']})")
+    print(f"Inserted: {report['inserted']}, updated: {report['updated']}")
+    print(f"Finished in {report['elapsed_seconds']}s ({report['rows_per_second']} rows/s)")
+    if report["aborted"]:
+        print(f"Aborted: {report['aborted']}")
+    if report["failed"] or report["aborted"]:
+        sys.exit(2)
+
+def main():
+    parser = argparse.ArgumentParser(description="Trison Solar management commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    parser_leaderboard = subparsers.add_parser(
+        "rebuild-leaderboard", help="Rebuild the points leaderboards from PostgreSQL"
+    )
+    parser_leaderboard.set_defaults(func=rebuild_leaderboard)
+
+    parser_reconcile = subparsers.add_parser(
+        "reconcile-points", help="Check users.total_points against the points ledger"
+    )
+    parser_reconcile.add_argument("--chunk-size", type=int, default=50000, help="User ids per chunk")
+    parser_reconcile.add_argument("--workers", type=int, default=4, help="Chunks processed in parallel")
+    parser_reconcile.add_argument("--repair", action="store_true", help="Fix mismatched balances")
+    parser_reconcile.set_defaults(func=reconcile_points)
+
+    parser_product_stats = subparsers.add_parser(
+        "rebuild-product-stats", help="Rebuild product sales and rating rollups"
+    )
+    parser_product_stats.set_defaults(func=rebuild_product_stats)
+
+    parser_retailers = subparsers.add_parser(
+        "rollup-retailers", help="Update retailer daily rollups from new rows (run from cron)"
+    )
+    parser_retailers.add_argument("--batch-size", type=int, default=None, help="Source rows per batch")
+    parser_retailers.add_argument("--rebuild", action="store_true", help="Recount everything from scratch")
+    parser_retailers.set_defaults(func=rollup_retailers)
+
+    parser_import = subparsers.add_parser(
+        "import-catalog", help="Bulk import products or QR codes from CSV"
+    )
+    parser_import.add_argument("kind", choices=["products", "qr-codes"])
+    parser_import.add_argument("path", help="CSV file with a header row")
+    parser_import.add_argument("--batch-size", type=int, default=2000, help="Rows per COPY and merge")
+    parser_import.set_defaults(func=import_catalog)
+
+    args = parser.parse_args()
+    try:
+        args.func(args)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
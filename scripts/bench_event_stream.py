@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Connection ceiling benchmark for /api/v1/events/stream
+Opens event streams against a running single-worker server in steps, publishes
+one event per stream through Redis at each step and reports delivery latency.
+The highest step whose p99 stays under --max-p99-ms without rejections is the
+measured ceiling; set EVENT_STREAM_MAX_CONNECTIONS at or below it. With --pid,
+the server's resident memory per open stream is reported too.
+Start the server with EVENT_STREAM_MAX_CONNECTIONS above the largest step and
+RATE_LIMIT_ENABLED=false, and raise `ulimit -n` on both sides. Streams use synthetic user ids, so no
+database rows are needed.
+Usage: python scripts/bench_event_stream.py [--url http://localhost:8000] [--steps 500,1000,2000,4000] [--pid <server pid>]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from app.core.security import create_access_token
+from app.services.user_events import publish_user_events
+
+FIRST_USER_ID = 900_000_000
+
+def resident_kb(pid):
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+async def open_stream(client, url, user_id, ready, latencies, rejected):
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+    try:
+        async with client.stream("GET", f"{url}/api/v1/events/stream", headers=headers) as response:
+            if response.status_code != 200:
+                rejected.append(response.status_code)
+                ready.set()
+                return
+            event_type = None
+            async for line in response.aiter_lines():
+                if line.startswith("event: "):
+                    event_type = line[7:]
+                elif line.startswith("data: "):
+                    if event_type == "ready":
+                        ready.set()
+                    elif event_type == "bench":
+                        latencies.append((time.time() - json.loads(line[6:])["sent_at"]) * 1000)
+    except (httpx.HTTPError, asyncio.CancelledError):
+        ready.set()
+
+async def run(args):
+    steps = [int(step) for step in args.steps.split(",")]
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=0)
+    timeout = httpx.Timeout(30.0, read=None)
+    results = []
+    baseline_kb = resident_kb(args.pid) if args.pid else None
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        tasks, latencies, rejected = [], [], []
+        for target in steps:
+            waiting = []
+            while len(tasks) < target:
+                ready = asyncio.Event()
+                tasks.append(asyncio.create_task(
+                    open_stream(client, args.url, FIRST_USER_ID + len(tasks), ready, latencies, rejected)
+                ))
+                waiting.append(ready.wait())
+            await asyncio.wait_for(asyncio.gather(*waiting), timeout=60)
+
+            latencies.clear()
+            open_streams = len(tasks) - len(rejected)
+            publish_user_events([
+                {"user_id": FIRST_USER_ID + i, "type": "bench", "data": {"sent_at": time.time()}}
+                for i in range(len(tasks))
+            ])
+            deadline = time.monotonic() + args.wait
+            while len(latencies) < open_streams and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+
+            received = sorted(latencies)
+            p50 = statistics.median(received) if received else float("inf")
+            p99 = received[int(len(received) * 0.99) - 1] if len(received) >= 100 else (received[-1] if received else float("inf"))
+            passed = not rejected and len(received) == open_streams and p99 <= args.max_p99_ms
+            results.append((target, open_streams, len(rejected), len(received), p50, p99, passed))
+            memory = ""
+            if baseline_kb is not None:
+                rss_kb = resident_kb(args.pid)
+                memory = f", server RSS {rss_kb / 1024:.0f}MB ({(rss_kb - baseline_kb) / max(open_streams, 1):.1f}KB per stream)"
+            print(
+                f"{'✅' if passed else '❌'} {target} streams: {open_streams} open, {len(rejected)} rejected, "
+                f"{len(received)} delivered, p50 {p50:.1f}ms, p99 {p99:.1f}ms{memory}"
+            )
+            if not passed:
+                break
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    ceiling = max((step for step, *_, passed in results if passed), default=0)
+    print(f"\nMeasured ceiling: {ceiling} streams per worker (p99 <= {args.max_p99_ms:.0f}ms)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--steps", default="500,1000,2000,4000", help="Comma-separated stream counts")
+    parser.add_argument("--max-p99-ms", type=float, default=250.0)
+    parser.add_argument("--wait", type=float, default=10.0, help="Seconds to wait for deliveries per step")
+    parser.add_argument("--pid", type=int, help="Server worker pid, to report its memory (same host only)")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the compiled points rules engine
+Usage: python scripts/bench_points_rules.py [--rules 5000] [--evaluations 200000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.points_rules import CompiledRules
+
+CATEGORIES = [f"category-{i}" for i in range(20)]
+RETAILERS = [f"retailer-{i}" for i in range(200)]
+TIERS = ["bronze", "silver", "gold", "platinum"]
+
+def make_rules(count: int, now: datetime):
+    """Random mix of permanent, campaign-window and wildcard rules"""
+    rules = []
+    for rule_id in range(1, count + 1):
+        starts_at = ends_at = None
+        if random.random() < 0.7:
+            starts_at = now + timedelta(days=random.randint(-60, 30))
+            ends_at = starts_at + timedelta(days=random.randint(1, 45))
+        rules.append(SimpleNamespace(
+            id=rule_id,
+            action=random.choice(["scan", "purchase"]),
+            category=random.choice(CATEGORIES) if random.random() < 0.6 else None,
+            retailer_id=random.choice(RETAILERS) if random.random() < 0.5 else None,
+            tier=random.choice(TIERS) if random.random() < 0.3 else None,
+            starts_at=starts_at,
+            ends_at=ends_at,
+            multiplier=random.choice([1.0, 1.1, 1.25, 1.5, 2.0]),
+            bonus=random.choice([0, 0, 5, 10]),
+            is_active=True
+        ))
+    return rules
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rules", type=int, default=5000)
+    parser.add_argument("--evaluations", type=int, default=200000)
+    args = parser.parse_args()
+
+    random.seed(42)
+    now = datetime.now(timezone.utc)
+    rules = make_rules(args.rules, now)
+
+    started = time.perf_counter()
+    compiled = CompiledRules(rules)
+    compile_ms = (time.perf_counter() - started) * 1000
+
+    contexts = [
+        (
+            random.choice(["scan", "purchase"]),
+            random.randint(10, 500),
+            random.choice(CATEGORIES),
+            random.choice(RETAILERS),
+            random.choice(TIERS),
+            (now + timedelta(days=random.randint(-30, 30))).timestamp()
+        )
+        for _ in range(min(args.evaluations, 10000))
+    ]
+
+    matched = 0
+    started = time.perf_counter()
+    for i in range(args.evaluations):
+        points, applied = compiled.evaluate(*contexts[i % len(contexts)])
+        if applied:
+            matched += 1
+    elapsed = time.perf_counter() - started
+
+    print(f"Active rules:        {compiled.rule_count}")
+    print(f"Decision buckets:    {len(compiled.buckets)}")
+    print(f"Compile time:        {compile_ms:.1f} ms")
+    print(f"Evaluations:         {args.evaluations}")
+    print(f"Evaluations matched: {matched}")
+    print(f"Per evaluation:      {elapsed / args.evaluations * 1e6:.2f} us")
+    print(f"Throughput:          {args.evaluations / elapsed:,.0f} evaluations/s")
+
+if __name__ == "__main__":
+    main()
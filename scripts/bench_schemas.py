@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Schema validation and serialization benchmark
+Measures, in a fresh interpreter, the schemas the API runs per request: the
+OrderPlaceRequest and PointsRedemptionRequest bodies validated from dicts and
+from JSON, and the GET /points-rules page of 50 rules validated from ORM rows
+and dumped, once one model per row and once through points_rules_adapter as
+the endpoint does. With --baseline, the same is measured for a git revision
+exported to a temporary directory, to compare before and after.
+Usage: python scripts/bench_schemas.py [--seconds 0.5] [--baseline <git-ref>]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_startup import ROOT, export_revision
+
+PROBE = """
+import json, time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import List
+from pydantic import TypeAdapter
+from app.models.order import OrderPlaceRequest
+from app.models.points import PointsRedemptionRequest, PointsRuleResponse
+
+try:
+    from app.models.points import points_rules_adapter
+except ImportError:
+    points_rules_adapter = None
+
+BODIES = {{
+    "OrderPlaceRequest": (OrderPlaceRequest, {{
+        "items": [{{"product_id": n, "quantity": n}} for n in range(1, 6)],
+        "payment_method": "cod", "shipping_address": {{"city": "Lahore", "line1": "12 Mall Road"}},
+        "notes": "Call before delivery", "retailer_id": "R-19"
+    }}),
+    "PointsRedemptionRequest": (PointsRedemptionRequest, {{
+        "items": [{{"points": 500, "description": f"Voucher {{n}}", "reference_id": f"V-{{n}}"}} for n in range(3)]
+    }}),
+}}
+
+# What the query returns for GET /points-rules
+RULES = [
+    SimpleNamespace(
+        id=n, name=f"Rule {{n}}", action="scan" if n % 2 else "purchase", category="Solar Panels",
+        retailer_id=None, tier="gold", starts_at=datetime(2026, 3, 1), ends_at=datetime(2026, 4, 1),
+        multiplier=1.5, bonus=10, is_active=True, created_at=datetime(2026, 2, 1), updated_at=None
+    )
+    for n in range(50)
+]
+
+def rate(operation, seconds={seconds}, items=1):
+    calls = 0
+    deadline = time.perf_counter() + seconds
+    started = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            operation()
+        calls += 100
+    return calls * items / (time.perf_counter() - started)
+
+results = {{}}
+for name, (model, payload) in BODIES.items():
+    raw = json.dumps(payload)
+    results[name] = {{
+        "validate": rate(lambda: model.model_validate(payload)),
+        "validate_json": rate(lambda: model.model_validate_json(raw)),
+    }}
+
+results["PointsRuleResponse page"] = {{
+    "per_row": rate(lambda: [PointsRuleResponse.model_validate(rule).model_dump() for rule in RULES], items=50),
+}}
+if points_rules_adapter is not None:
+    results["PointsRuleResponse page"]["adapter"] = rate(
+        lambda: points_rules_adapter.dump_python(points_rules_adapter.validate_python(RULES, from_attributes=True)),
+        items=50
+    )
+print("BENCH " + json.dumps(results))
+"""
+
+def measure(tree: str, seconds: float) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(seconds=seconds)],
+        cwd=tree, capture_output=True, text=True
+    )
+    line = next((line for line in result.stdout.splitlines() if line.startswith("BENCH ")), None)
+    if line is None:
+        raise RuntimeError(f"Benchmark failed in {tree}:\n{result.stderr[-2000:]}")
+    return json.loads(line[6:])
+
+def report(label: str, results: dict) -> None:
+    print(f"{label} (objects per second)")
+    for name, rates in results.items():
+        print(f"  {name}")
+        for operation, value in rates.items():
+            print(f"    {operation:<15}{value:>12,.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=0.5, help="Time spent on each measurement")
+    parser.add_argument("--baseline", help="Git revision to compare against, e.g. HEAD~1")
+    args = parser.parse_args()
+
+    current = measure(ROOT, args.seconds)
+    report("working tree", current)
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as directory:
+            export_revision(args.baseline, directory)
+            baseline = measure(directory, args.seconds)
+        report(args.baseline, baseline)
+        print("change")
+        for name, rates in current.items():
+            for operation, value in rates.items():
+                before = baseline.get(name, {}).get(operation)
+                if before is None:
+                    continue
+                print(f"  {name}.{operation}: {before:,.0f} -> {value:,.0f} ({(value / before - 1) * 100:+.0f}%)")
+
+if __name__ == "__main__":
+    main()
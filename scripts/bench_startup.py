@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Worker startup benchmark
+Measures, in fresh interpreters, how long `import main` takes and how long the
+app's lifespan startup (schema check, or create_all on older revisions) takes
+until the worker could serve requests. With --baseline, the same is measured
+for a git revision exported to a temporary directory, to compare before and
+after. Lifespan startup talks to the configured DATABASE_URL.
+Usage: python scripts/bench_startup.py [--runs 5] [--baseline <git-ref>] [--no-lifespan]
+"""
+
+import argparse
+import io
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+ready = imported
+if {lifespan}:
+    async def startup():
+        async with main.app.router.lifespan_context(main.app):
+            return time.perf_counter()
+    ready = asyncio.run(startup())
+print("BENCH " + json.dumps({{"import": imported - started, "ready": ready - started}}))
+"""
+
+def export_revision(ref: str, directory: str) -> None:
+    archive = subprocess.run(["git", "archive", ref], cwd=ROOT, check=True, capture_output=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(directory)
+    # Same configuration for both trees
+    if os.path.exists(os.path.join(ROOT, ".env")):
+        shutil.copy(os.path.join(ROOT, ".env"), directory)
+
+def measure(tree: str, runs: int, lifespan: bool) -> dict:
+    samples = {"import": [], "ready": []}
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE.format(lifespan=lifespan)],
+            cwd=tree, capture_output=True, text=True
+        )
+        line = next((line for line in result.stdout.splitlines() if line.startswith("BENCH ")), None)
+        if line is None:
+            raise RuntimeError(f"Startup failed in {tree}:\n{result.stderr[-2000:]}")
+        for key, value in json.loads(line[6:]).items():
+            samples[key].append(value * 1000)
+    return {key: statistics.median(values) for key, values in samples.items()}
+
+def slowest_imports(tree: str, limit: int = 10) -> list:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=tree, capture_output=True, text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = [part.strip() for part in line[len("import time:"):].split("|")]
+        # Top-level packages only, so nested imports are not counted twice
+        if "." not in module.strip():
+            rows.append((int(cumulative) / 1000, module.strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+def report(label: str, tree: str, args) -> dict:
+    timings = measure(tree, args.runs, not args.no_lifespan)
+    print(f"{label}: import main {timings['import']:.0f}ms, ready {timings['ready']:.0f}ms (median of {args.runs})")
+    for millis, module in slowest_imports(tree):
+        print(f"  {millis:8.1f}ms  {module}")
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--baseline", help="Git revision to compare against, e.g. HEAD~1")
+    parser.add_argument("--no-lifespan", action="store_true", help="Only measure imports")
+    args = parser.parse_args()
+
+    current = report("working tree", ROOT, args)
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as directory:
+            export_revision(args.baseline, directory)
+            baseline = report(args.baseline, directory, args)
+        for key in ("import", "ready"):
+            change = current[key] - baseline[key]
+            print(f"{key}: {baseline[key]:.0f}ms -> {current[key]:.0f}ms ({change:+.0f}ms)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Worker scaling benchmark for the production server
+Starts `gunicorn -c gunicorn.conf.py main:app` with 1, 2, 4... workers on a
+spare port, drives the read flows (health check, product list, product
+search) from several load processes and reports requests per second and how
+close each step comes to linear scaling over one worker. Run it on the
+machine that will serve traffic; the load processes share its cores, so keep
+--clients well below the core count being measured.
+Usage: python scripts/bench_workers.py [--workers 1,2,4] [--seconds 15] [--clients 2] [--concurrency 64]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FLOWS = [
+    "/health",
+    "/api/v1/products/",
+    "/api/v1/products/search?q=solar",
+]
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_until_ready(url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not become ready")
+
+async def drive(url: str, seconds: float, concurrency: int) -> tuple:
+    done = 0
+    failed = 0
+    deadline = time.monotonic() + seconds
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async def user(client, index):
+        nonlocal done, failed
+        while time.monotonic() < deadline:
+            try:
+                response = await client.get(FLOWS[(done + index) % len(FLOWS)])
+                if response.status_code < 400:
+                    done += 1
+                else:
+                    failed += 1
+            except httpx.HTTPError:
+                failed += 1
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=10.0) as client:
+        await asyncio.gather(*(user(client, index) for index in range(concurrency)))
+    return done, failed
+
+def load_process(url: str, seconds: float, concurrency: int, results) -> None:
+    results.put(asyncio.run(drive(url, seconds, concurrency)))
+
+def measure(workers: int, args) -> tuple:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    # All load comes from one address, which the per-IP rate limit would throttle
+    env = {
+        **os.environ, "WEB_WORKERS": str(workers), "PORT": str(port), "HOST": "127.0.0.1",
+        "RATE_LIMIT_ENABLED": "false"
+    }
+    # Own pidfile, so a server already running from this checkout is left alone
+    pidfile = os.path.join(tempfile.gettempdir(), f"bench_workers_{port}.pid")
+    server = subprocess.Popen(
+        ["gunicorn", "-c", "gunicorn.conf.py", "--pid", pidfile, "main:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_ready(url)
+        # Warm the catalog snapshot in every worker before measuring
+        asyncio.run(drive(url, 2.0, args.concurrency))
+
+        results = multiprocessing.Queue()
+        clients = [
+            multiprocessing.Process(target=load_process, args=(url, args.seconds, args.concurrency, results))
+            for _ in range(args.clients)
+        ]
+        for client in clients:
+            client.start()
+        totals = [results.get() for _ in clients]
+        for client in clients:
+            client.join()
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+    done = sum(result[0] for result in totals)
+    failed = sum(result[1] for result in totals)
+    return done / args.seconds, failed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--seconds", type=float, default=15.0)
+    parser.add_argument("--clients", type=int, default=2, help="Load generating processes")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent requests per load process")
+    args = parser.parse_args()
+
+    baseline = None
+    ok = True
+    for workers in [int(step) for step in args.workers.split(",")]:
+        rate, failed = measure(workers, args)
+        baseline = baseline or rate
+        efficiency = rate / (baseline * workers)
+        marker = "✅" if efficiency >= 0.7 and not failed else "❌"
+        ok = ok and marker == "✅"
+        print(f"{marker} {workers} workers: {rate:,.0f} req/s, {efficiency:.0%} of linear, {failed} failed")
+
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
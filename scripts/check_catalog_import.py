@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Catalog import check
+Seeds a throwaway product and QR code in the configured DATABASE_URL, then
+re-imports them from CSVs that only have some of the columns, and asserts
+that the columns the CSVs lack keep their values, and that a row the
+database rejects is reported without failing the rest. Seed rows are
+removed afterwards.
+Usage: python scripts/check_catalog_import.py
+"""
+
+import io
+import os
+import sys
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.models.product import Product
+from app.models.qr_code import QRCode
+from app.services.catalog_import import CatalogImportService
+
+def main():
+    db = SessionLocal()
+    suffix = uuid.uuid4().hex[:12]
+    sku, code = f"IC-{suffix}", f"IC-QR-{suffix}"
+    product = Product(
+        name="Import check panel", category="Solar Panels", sku=sku, price=100, stock_quantity=5,
+        specifications={"watts": 500}, retailer_id="R-IC", points_reward=250, is_active=False
+    )
+    db.add(product)
+    db.flush()
+    db.add(QRCode(code=code, product_id=product.id, points_value=10, retailer_id="R-IC", max_scans=3))
+    db.commit()
+
+    results = []
+    try:
+        service = CatalogImportService(db)
+        report = service.import_products(io.StringIO(
+            "name,category,brand,sku,price,stock_quantity\n"
+            f"Import check panel v2,Solar Panels,Trison,{sku},120,7\n"
+        ))
+        results.append(("partial product CSV updates the row", report["updated"] == 1, report))
+        db.expire_all()
+        product = db.query(Product).filter(Product.sku == sku).one()
+        results.append(("imported columns are updated", (product.name, product.price, product.stock_quantity) == (
+            "Import check panel v2", 120, 7
+        ), (product.name, product.price, product.stock_quantity)))
+        results.append(("columns the CSV lacks are kept", (
+            product.specifications, product.retailer_id, product.points_reward, product.is_active
+        ) == ({"watts": 500}, "R-IC", 250, False), (
+            product.specifications, product.retailer_id, product.points_reward, product.is_active
+        )))
+
+        # The schema accepts this price, numeric(12,2) does not
+        report = service.import_products(io.StringIO(
+            "name,category,sku,price\n"
+            f"Import check A,Solar Panels,{sku}-A,10\n"
+            f"Import check B,Solar Panels,{sku}-B,99999999999\n"
+            f"Import check C,Solar Panels,{sku}-C,30\n"
+        ))
+        results.append(("row the database rejects is reported", (
+            report["inserted"], report["failed"], [error["line"] for error in report["errors"]], report["aborted"]
+        ) == (2, 1, [3], None), report))
+
+        report = service.import_qr_codes(io.StringIO(f"code,points_value\n{code},20\n"))
+        results.append(("partial QR code CSV updates the row", report["updated"] == 1, report))
+        db.expire_all()
+        qr_code = db.query(QRCode).filter(QRCode.code == code).one()
+        results.append(("QR code keeps product, retailer and max_scans", (
+            qr_code.points_value, qr_code.product_id, qr_code.retailer_id, qr_code.max_scans
+        ) == (20, product.id, "R-IC", 3), (
+            qr_code.points_value, qr_code.product_id, qr_code.retailer_id, qr_code.max_scans
+        )))
+    finally:
+        db.rollback()
+        db.query(QRCode).filter(QRCode.code.like(f"IC-QR-{suffix}%")).delete(synchronize_session=False)
+        db.query(Product).filter(Product.sku.like(f"IC-{suffix}%")).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+    failed = False
+    for name, passed, detail in results:
+        failed = failed or not passed
+        print(f"{'✅' if passed else '❌'} {name}" + ("" if passed else f": {detail}"))
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Leaderboard rebuild check
+Creates a throwaway user with a balance in the configured DATABASE_URL,
+rebuilds the leaderboards in the configured Redis while points are recorded
+between the global board's snapshot and its swap, and asserts that those
+points survive the swap, that points recorded after it count once and that
+no rebuild state is left behind. The rebuild replaces the live boards, as
+`python manage.py rebuild-leaderboard` does; the user is removed afterwards.
+Usage: python scripts/check_leaderboard_rebuild.py
+"""
+
+import os
+import sys
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.models.user import User
+from app.services.leaderboard_service import (
+    DELTA_PREFIX, REBUILDING_KEY, REBUILT_KEY, LeaderboardService
+)
+
+class RacingLeaderboardService(LeaderboardService):
+    """Records points for ``user_id`` after each board's snapshot is taken, before it is swapped in."""
+
+    def __init__(self, user_id: int, amount: int):
+        super().__init__()
+        self.user_id = user_id
+        self.amount = amount
+
+    def _replace(self, key, rows):
+        rows = list(rows)
+        if key == self.board_key("global"):
+            self.record_points(self.user_id, self.amount, earned=False)
+        return super()._replace(key, rows)
+
+def main():
+    db = SessionLocal()
+    user = User(phone_number=f"leaderboard-check-{uuid.uuid4().hex[:12]}", total_points=100)
+    db.add(user)
+    db.commit()
+    user_id = user.id
+
+    results = []
+    leaderboard = RacingLeaderboardService(user_id, 5)
+    try:
+        leaderboard.rebuild(db)
+        entry = leaderboard.rank(user_id)
+        results.append(("points recorded during the rebuild survive the swap",
+                        entry is not None and entry["points"] == 105, entry))
+
+        leaderboard.record_points(user_id, 7, earned=False)
+        entry = leaderboard.rank(user_id)
+        results.append(("points recorded after the rebuild count once",
+                        entry is not None and entry["points"] == 112, entry))
+
+        leftovers = [REBUILDING_KEY, REBUILT_KEY] + list(leaderboard.redis.scan_iter(match=f"{DELTA_PREFIX}*"))
+        leftovers = [key for key in leftovers if leaderboard.redis.exists(key)]
+        results.append(("no rebuild state is left behind", not leftovers, leftovers))
+    finally:
+        leaderboard.redis.zrem(leaderboard.board_key("global"), str(user_id))
+        db.rollback()
+        db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+    failed = False
+    for name, passed, detail in results:
+        failed = failed or not passed
+        print(f"{'✅' if passed else '❌'} {name}" + ("" if passed else f": {detail}"))
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
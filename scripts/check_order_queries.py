@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Query-count check for the order history endpoints
+Seeds a throwaway user with orders in the configured DATABASE_URL and asserts
+that listing a page costs the same number of queries whatever its size, and
+that the order detail is loaded with a fixed number of queries. Seed rows are
+removed afterwards.
+Usage: python scripts/check_order_queries.py [--orders 60] [--items 4]
+"""
+
+import argparse
+import os
+import sys
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from app.core.database import SessionLocal
+from app.core.query_stats import count_queries
+from app.models.order import Order, OrderItemRecord
+from app.models.product import Product
+from app.models.user import User
+from app.services.order_service import OrderService
+
+LIST_QUERIES = 2  # page of orders + item summaries for the page
+DETAIL_QUERIES = 2  # order + selectinload of its items
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=60)
+    parser.add_argument("--items", type=int, default=4, help="Items per order")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    suffix = uuid.uuid4().hex[:12]
+    user = User(phone_number=f"query-check-{suffix}")
+    product = Product(name="Query check panel", category="Solar Panels", sku=f"QC-{suffix}", price=100)
+    db.add_all([user, product])
+    db.flush()
+    order_ids = db.execute(
+        insert(Order).returning(Order.id),
+        [
+            {"order_number": f"QC-{suffix}-{i}", "user_id": user.id, "subtotal": 100, "total_amount": 100}
+            for i in range(args.orders)
+        ]
+    ).scalars().all()
+    db.execute(insert(OrderItemRecord), [
+        {
+            "order_id": order_id, "product_id": product.id, "product_name": product.name,
+            "quantity": 1, "unit_price": 100, "total_price": 100
+        }
+        for order_id in order_ids for _ in range(args.items)
+    ])
+    db.commit()
+    user_id, product_id = user.id, product.id
+
+    results = []
+    try:
+        service = OrderService(db)
+        for limit in (5, 20, 50):
+            db.expire_all()
+            with count_queries() as counter:
+                page = service.list_orders(user_id, limit=limit)
+            results.append((f"list {limit} orders", counter.count, LIST_QUERIES))
+
+            if page["next_cursor"]:
+                with count_queries() as counter:
+                    service.list_orders(user_id, limit=limit, cursor=page["next_cursor"])
+                results.append((f"list {limit} orders (next page)", counter.count, LIST_QUERIES))
+
+        db.expire_all()
+        with count_queries() as counter:
+            order = service.get_order(user_id, order_ids[0])
+        results.append((f"order detail ({len(order['items'])} items)", counter.count, DETAIL_QUERIES))
+    finally:
+        db.rollback()
+        db.query(OrderItemRecord).filter(OrderItemRecord.order_id.in_(order_ids)).delete(synchronize_session=False)
+        db.query(Order).filter(Order.user_id == user_id).delete(synchronize_session=False)
+        db.query(Product).filter(Product.id == product_id).delete(synchronize_session=False)
+        db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+    failed = False
+    for name, count, expected in results:
+        passed = count == expected
+        failed = failed or not passed
+        print(f"{'✅' if passed else '❌'} {name}: {count} queries (expected {expected})")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Query-plan check for the hot queries
+Migrates a scratch schema in a local Postgres to the latest revision, seeds it
+with realistic cardinalities and asserts, with EXPLAIN, that every hot query
+uses its expected index, never scans a seeded table sequentially and stays
+under its cost bound. The scratch schema is dropped afterwards, so any
+database will do, but point it at a local one: seeding writes a few hundred
+thousand rows.
+Usage: python scripts/check_query_plans.py --database-url postgresql://localhost/trison_dev [--users 20000] [--keep]
+       (or set PLAN_CHECK_DATABASE_URL)
+"""
+
+import argparse
+import os
+import sys
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.pool import NullPool
+from app.core.migrations import ALEMBIC_INI
+from app.models.order import Order
+from app.models.points import Points
+from app.models.qr_code import QRCode, QRScan
+from app.models.user import User
+from app.services.order_service import ORDER_LIST_COLUMNS
+from app.services.reconciliation_service import MISMATCHES_SQL
+
+SEEDED_TABLES = ("users", "qr_codes", "qr_scans", "points", "orders")
+
+# Users get 1-8 scans, 5-44 points transactions and 0-5 orders each
+SEED_SQL = (
+    """
+    INSERT INTO users (id, phone_number, role, is_verified, total_points, login_count, created_at)
+    SELECT u, '+92300' || lpad(u::text, 7, '0'), 'client', true, 0, 1, now() - u * interval '1 minute'
+    FROM generate_series(1, :users) u
+    """,
+    """
+    INSERT INTO qr_codes (id, code, type, points_value, is_active, max_scans, current_scans, created_at)
+    SELECT q, 'TRS-QR-' || lpad(q::text, 8, '0'), 'product', 10, q % 50 <> 0, 1, 0, now()
+    FROM generate_series(1, :users) q
+    """,
+    """
+    INSERT INTO qr_scans (qr_code_id, user_id, points_earned, scanned_at)
+    SELECT ((u * 37) % :users + k) % :users + 1, u, 10, now() - k * interval '1 day' - (u % 1440) * interval '1 minute'
+    FROM generate_series(1, :users) u, generate_series(0, u % 8) k
+    """,
+    """
+    INSERT INTO points (user_id, type, amount, source, reference_id, description, created_at)
+    SELECT u, CASE WHEN k % 7 = 0 THEN 'spend' ELSE 'earn' END, CASE WHEN k % 7 = 0 THEN -50 ELSE 10 END,
+           'qr_scan', k::text, 'Seeded transaction', now() - k * interval '1 day' - (u % 1440) * interval '1 minute'
+    FROM generate_series(1, :users) u, generate_series(1, 5 + u % 40) k
+    """,
+    """
+    INSERT INTO orders (order_number, user_id, subtotal, total_amount, currency, status, payment_status,
+                        total_points_earned, created_at)
+    SELECT 'PC-' || u || '-' || k, u, 1000, 1000, 'PKR', 'delivered', 'paid', 100,
+           now() - k * interval '7 days' - (u % 1440) * interval '1 minute'
+    FROM generate_series(1, :users) u, generate_series(1, u % 6) k
+    """,
+)
+
+# A seeded user with the most rows in every per-user table
+HEAVY_USER = 119
+
+# Users per reconciliation chunk; a small share of the seeded users, as in production
+RECONCILE_CHUNK = 1000
+
+def hot_queries(users: int):
+    """(name, statement, expected index, maximum planner cost), mirroring the endpoints."""
+    phone_number = "+92300" + str(HEAVY_USER).zfill(7)
+    qr_code = "TRS-QR-" + str(users // 2 + 1).zfill(8)
+    qr_code_id = (HEAVY_USER * 37) % users + 1
+    return [
+        ("user by phone number (auth)",
+         select(User).where(User.phone_number == phone_number).limit(1),
+         "ix_users_phone_number", 20),
+        ("QR code by code (scan)",
+         select(QRCode).where(QRCode.code == qr_code, QRCode.is_active == True).limit(1),
+         "ix_qr_codes_code", 20),
+        ("duplicate scan check (scan)",
+         select(QRScan.id).where(QRScan.qr_code_id == qr_code_id, QRScan.user_id == HEAVY_USER).limit(1),
+         "uq_qr_scans_qr_code_user", 20),
+        ("scan history page (qr-codes/history)",
+         select(QRScan.qr_code_id, QRScan.points_earned, QRScan.scanned_at, QRCode.code, QRCode.description)
+         .join(QRCode, QRCode.id == QRScan.qr_code_id)
+         .where(QRScan.user_id == HEAVY_USER)
+         .order_by(QRScan.scanned_at.desc())
+         .offset(0).limit(20),
+         "ix_qr_scans_user_id_scanned_at", 300),
+        ("scan count (qr-codes/history)",
+         select(func.count()).select_from(QRScan).where(QRScan.user_id == HEAVY_USER),
+         "ix_qr_scans_user_id_scanned_at", 50),
+        ("points transactions page (points/transactions)",
+         select(Points).where(Points.user_id == HEAVY_USER).order_by(Points.created_at.desc()).offset(0).limit(20),
+         "ix_points_user_id_created_at", 150),
+        ("points transactions count (points/transactions)",
+         select(func.count()).select_from(Points).where(Points.user_id == HEAVY_USER),
+         "ix_points_user_id_created_at", 150),
+        ("points summary (points/summary)",
+         select(Points.type, func.sum(Points.amount), func.count(Points.id))
+         .where(Points.user_id == HEAVY_USER)
+         .group_by(Points.type),
+         "ix_points_user_id_created_at", 300),
+        ("order history page (orders)",
+         select(*ORDER_LIST_COLUMNS).where(Order.user_id == HEAVY_USER)
+         .order_by(Order.created_at.desc(), Order.id.desc()).limit(21),
+         "ix_orders_user_id_created_at", 100),
+        ("reconciliation chunk (manage.py reconcile-points)",
+         text(MISMATCHES_SQL).bindparams(low=HEAVY_USER, high=HEAVY_USER + RECONCILE_CHUNK - 1),
+         "ix_points_user_id_created_at", 8000),
+    ]
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+def describe(node: dict) -> str:
+    parts = [node["Node Type"]]
+    if "Index Name" in node:
+        parts.append(f"using {node['Index Name']}")
+    if "Relation Name" in node:
+        parts.append(f"on {node['Relation Name']}")
+    return " ".join(parts)
+
+def check(connection, name: str, statement, index: str, max_cost: float):
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()[0]["Plan"]
+    nodes = list(plan_nodes(plan))
+    problems = []
+    if not any(node.get("Index Name") == index for node in nodes):
+        problems.append(f"does not use {index}")
+    for node in nodes:
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in SEEDED_TABLES:
+            problems.append(f"scans {node['Relation Name']} sequentially")
+    if plan["Total Cost"] > max_cost:
+        problems.append(f"costs {plan['Total Cost']:.0f} (at most {max_cost})")
+    scans = ", ".join(describe(node) for node in nodes if "Relation Name" in node)
+    return name, plan["Total Cost"], scans, problems
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", default=os.getenv("PLAN_CHECK_DATABASE_URL"))
+    parser.add_argument("--users", type=int, default=20000, help="Seeded users; other tables scale with it")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch schema for inspection")
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("--database-url or PLAN_CHECK_DATABASE_URL is required")
+    if args.users < HEAVY_USER + RECONCILE_CHUNK * 10:
+        parser.error(f"--users must be at least {HEAVY_USER + RECONCILE_CHUNK * 10}")
+
+    schema = f"plan_check_{uuid.uuid4().hex[:12]}"
+    admin = create_engine(args.database_url, poolclass=NullPool, isolation_level="AUTOCOMMIT")
+    with admin.connect() as connection:
+        connection.execute(text(f"CREATE SCHEMA {schema}"))
+    scratch = create_engine(
+        args.database_url, poolclass=NullPool, connect_args={"options": f"-csearch_path={schema}"}
+    )
+
+    results = []
+    try:
+        config = Config(ALEMBIC_INI)
+        with scratch.connect() as connection:
+            config.attributes["connection"] = connection
+            command.upgrade(config, "head")
+            connection.commit()
+        print(f"Migrated {schema} to head, seeding {args.users} users...")
+
+        with scratch.begin() as connection:
+            for statement in SEED_SQL:
+                connection.execute(text(statement), {"users": args.users})
+        with scratch.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            # Fresh statistics and visibility map, as a long-lived table would have
+            for table in SEEDED_TABLES:
+                connection.execute(text(f"VACUUM ANALYZE {table}"))
+
+        with scratch.connect() as connection:
+            for name, statement, index, max_cost in hot_queries(args.users):
+                results.append(check(connection, name, statement, index, max_cost))
+    finally:
+        scratch.dispose()
+        if args.keep:
+            print(f"Kept schema {schema}")
+        else:
+            with admin.connect() as connection:
+                connection.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        admin.dispose()
+
+    failed = False
+    for name, cost, scans, problems in results:
+        failed = failed or bool(problems)
+        print(f"{'❌' if problems else '✅'} {name}: cost {cost:.0f}, {scans}")
+        for problem in problems:
+            print(f"     {problem}")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Concurrent redemption check for the points ledger
+Creates a throwaway user in the configured DATABASE_URL, hammers
+PointsService.redeem_points from many threads, then verifies that the balance
+never went negative and still matches the ledger. The user and its ledger rows
+are removed afterwards.
+Usage: python scripts/stress_redemption.py [--threads 16] [--attempts 200] [--balance 5000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func
+from app.core.database import SessionLocal
+from app.models.points import Points
+from app.models.user import User
+from app.services.leaderboard_service import LeaderboardService
+from app.services.points_service import PointsService, InsufficientPointsError
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--attempts", type=int, default=200, help="Redemptions per thread")
+    parser.add_argument("--balance", type=int, default=5000, help="Starting balance")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    user = User(phone_number=f"stress-{uuid.uuid4().hex[:12]}", total_points=0)
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    PointsService(db).award_points(user_id, args.balance, source="bonus", description="Redemption stress test")
+    db.close()
+
+    lock = threading.Lock()
+    stats = {"redeemed": 0, "points": 0, "rejected": 0, "errors": 0, "negative": 0}
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        session = SessionLocal()
+        try:
+            for _ in range(args.attempts):
+                items = [{"points": rng.randint(1, 20), "description": "stress"} for _ in range(rng.randint(1, 3))]
+                try:
+                    balance = PointsService(session).redeem_points(user_id, items)
+                    with lock:
+                        stats["redeemed"] += 1
+                        stats["points"] += sum(item["points"] for item in items)
+                        if balance < 0:
+                            stats["negative"] += 1
+                except InsufficientPointsError:
+                    with lock:
+                        stats["rejected"] += 1
+                except Exception as e:
+                    print(f"Unexpected error: {e}")
+                    with lock:
+                        stats["errors"] += 1
+        finally:
+            session.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        list(executor.map(worker, range(args.threads)))
+    elapsed = time.perf_counter() - started
+
+    db = SessionLocal()
+    try:
+        final_balance = db.query(User.total_points).filter(User.id == user_id).scalar()
+        ledger_balance = db.query(func.sum(Points.amount)).filter(Points.user_id == user_id).scalar()
+        attempts = args.threads * args.attempts
+
+        print(f"Attempts:        {attempts} in {elapsed:.2f}s ({attempts / elapsed:,.0f}/s)")
+        print(f"Redeemed:        {stats['redeemed']} ({stats['points']} points)")
+        print(f"Rejected:        {stats['rejected']} (insufficient points)")
+        print(f"Errors:          {stats['errors']}")
+        print(f"Final balance:   {final_balance}")
+        print(f"Ledger balance:  {ledger_balance}")
+
+        checks = {
+            "no unexpected errors": stats["errors"] == 0,
+            "balance never negative": stats["negative"] == 0 and final_balance >= 0,
+            "balance matches redemptions": final_balance == args.balance - stats["points"],
+            "balance matches ledger": final_balance == ledger_balance,
+        }
+        for name, passed in checks.items():
+            print(f"{'✅' if passed else '❌'} {name}")
+    finally:
+        db.query(Points).filter(Points.user_id == user_id).delete()
+        db.query(User).filter(User.id == user_id).delete()
+        db.commit()
+        db.close()
+        try:
+            leaderboard = LeaderboardService()
+            for board in ("global", "weekly", "monthly"):
+                leaderboard.redis.zrem(leaderboard.board_key(board), str(user_id))
+        except Exception as e:
+            print(f"Could not remove test user from the leaderboard: {e}")
+
+    sys.exit(0 if all(checks.values()) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,10 @@ source venv/bin/activate
 echo "📥 Installing Python dependencies..."
 pip install -r requirements.txt
 
+# Bring the database schema up to date
+echo "🗄️  Applying database migrations..."
+alembic upgrade head || exit 1
+
 # Check if Redis is running
 echo "🔍 Checking Redis status..."
 if ! pgrep -x "redis-server" > /dev/null; then
@@ -33,8 +37,13 @@ echo "   API will be available at: http://localhost:8000"
 echo "   API documentation at: http://localhost:8000/docs"
 echo ""
 
-# Run FastAPI in background
-python main.py &
+# Run FastAPI in background: the auto-reloading development server, or
+# gunicorn with one worker per CPU core when DEBUG=false
+if [ "$DEBUG" = "false" ]; then
+    gunicorn -c gunicorn.conf.py main:app &
+else
+    python main.py &
+fi
 FASTAPI_PID=$!
 
 # Wait a moment for FastAPI to start